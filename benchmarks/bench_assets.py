@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import tracemalloc
+
+from harness import ASSETS_DIR, benchmark
+
+from sh1106_framework import SH1106Framework, AssetCache
+from sh1106_framework.graphics.assets import compile_json, write_asset_file
+
+# Loading the fonts and images under useful-assets/output, both as the JSON the generators
+# write and compiled to packed asset files, which are written to a temporary directory
+FONT_NAME = "benchmark"
+_FILES = {
+    "font": os.path.join(ASSETS_DIR, "default-font.json"),
+    "images": os.path.join(ASSETS_DIR, "example-images.json"),
+}
+_compiled_dir = None
+
+
+def _compiled(kind: str) -> str:
+    global _compiled_dir
+    if _compiled_dir is None:
+        _compiled_dir = tempfile.TemporaryDirectory(prefix="sh1106-benchmarks-")
+    filepath = os.path.join(_compiled_dir.name, kind + ".sh1106")
+    if not os.path.exists(filepath):
+        with open(_FILES[kind], 'r') as f:
+            write_asset_file(filepath, compile_json(json.load(f)))
+    return filepath
+
+
+def _load(kind: str, filepath: str, decode: bool):
+    # Registering only indexes a file, so decoding every glyph or image is measured separately
+    with open(_FILES[kind], 'r') as f:
+        names = list(json.load(f))
+    
+    def load():
+        if kind == "font":
+            SH1106Framework.register_font(FONT_NAME, filepath)
+        else:
+            SH1106Framework.register_images(filepath)
+        if decode:
+            AssetCache.clear()
+            if kind == "font":
+                SH1106Framework.preload_assets(fonts=[FONT_NAME])
+            else:
+                SH1106Framework.preload_assets(images=names)
+    
+    def extra():
+        # The memory the loaded assets keep once loading is done, from a clean cache
+        AssetCache.clear()
+        tracemalloc.start()
+        try:
+            load()
+            resident, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {
+            "file_bytes": os.path.getsize(filepath),
+            "loaded_bytes": resident,
+            "cache_bytes": AssetCache.get_stats()["resident_bytes"],
+        }
+    
+    load.extra = extra
+    return load
+
+
+for _kind in _FILES:
+    for _format in ("json", "packed"):
+        for _decode in (False, True):
+            _name = "assets.{}_{}[{}]".format("load" if _decode else "register", _kind, _format)
+            
+            def _setup(kind=_kind, format=_format, decode=_decode):
+                filepath = _FILES[kind] if format == "json" else _compiled(kind)
+                return _load(kind, filepath, decode)
+            benchmark(_name)(_setup)
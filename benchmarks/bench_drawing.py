@@ -0,0 +1,97 @@
+import os
+
+from harness import ASSETS_DIR, benchmark
+
+from sh1106_framework import SH1106Framework, Drawing, VirtualDevice
+
+# numpy is optional, so its backend is only benchmarked when it's installed
+try:
+    import numpy
+    BACKENDS = ("python", "numpy")
+except ImportError:
+    BACKENDS = ("python",)
+
+_registered = False
+
+
+def register_assets() -> None:
+    # The font and images under useful-assets/output are registered once, for every benchmark that draws them
+    global _registered
+    if not _registered:
+        SH1106Framework.register_font("default", os.path.join(ASSETS_DIR, "default-font.json"))
+        SH1106Framework.register_images(os.path.join(ASSETS_DIR, "example-images.json"))
+        _registered = True
+
+
+def create_drawing(backend: str) -> Drawing:
+    # A display that keeps no frames and doesn't wait for the emulated bus, so only the framework's own work is measured
+    register_assets()
+    return Drawing(device=VirtualDevice(max_frames=0), backend=backend)
+
+
+def _primitive(name: str, draw) -> None:
+    # Registers a benchmark of one call of a primitive for each backend
+    for backend in BACKENDS:
+        def setup(backend=backend):
+            drawing = create_drawing(backend)
+            return lambda: draw(drawing)
+        benchmark("drawing.{}[{}]".format(name, backend))(setup)
+
+
+_primitive("clear", lambda d: d.clear())
+_primitive("set_pixel", lambda d: d.set_pixel(64, 32, 1))
+_primitive("draw_rect", lambda d: d.draw_rect(10, 5, 100, 50))
+_primitive("draw_rect_small", lambda d: d.draw_rect(10, 5, 8, 8))
+_primitive("draw_outlined_rect", lambda d: d.draw_outlined_rect(10, 5, 100, 50))
+_primitive("draw_line_horizontal", lambda d: d.draw_line(0, 30, 127, 30))
+_primitive("draw_line_diagonal", lambda d: d.draw_line(0, 0, 127, 63))
+_primitive("draw_line_thick", lambda d: d.draw_line(0, 0, 127, 63, thickness=3))
+_primitive("draw_circle_filled", lambda d: d.draw_circle(64, 32, 20, filled=True))
+_primitive("draw_text", lambda d: d.draw_text("Hello, world!", 4, 4))
+_primitive("draw_text_centered", lambda d: d.draw_text("Hello, world!", 64, 4, centered=True))
+_primitive("draw_text_scale2", lambda d: d.draw_text("12:34", 4, 20, scale=2))
+_primitive("draw_text_scale3_centered", lambda d: d.draw_text("12:34", 64, 20, scale=3, centered=True))
+_primitive("draw_image", lambda d: d.draw_image("weather-sun", 10, 10))
+_primitive("draw_image_scale2", lambda d: d.draw_image("weather-sun", 10, 10, scale=2))
+_primitive("draw_image_centered", lambda d: d.draw_image("happy-face", 64, 32, centered_horizontal=True, centered_vertical=True))
+
+
+def _text_changing(backend: str):
+    # Text that's different every call, so it's laid out and rendered each time rather than coming from the TextCache
+    drawing = create_drawing(backend)
+    count = [0]
+    
+    def draw():
+        count[0] += 1
+        drawing.draw_text(str(count[0]), 4, 4)
+    return draw
+
+
+def _render(backend: str, mode: str):
+    drawing = create_drawing(backend)
+    drawing.draw_rect(10, 10, 60, 30)
+    drawing._render()
+    
+    if mode == "full":
+        # The whole frame is sent every time, as after the display was reset
+        def render():
+            drawing.invalidate()
+            drawing._render()
+    elif mode == "changed":
+        # One pixel changes every frame, so only part of a page is sent
+        pixel = [0]
+        
+        def render():
+            pixel[0] ^= 1
+            drawing.set_pixel(100, 50, pixel[0])
+            drawing._render()
+    else:
+        # Nothing changed, so the frame is only compared with the last one
+        render = drawing._render
+    return render
+
+
+for _backend in BACKENDS:
+    benchmark("drawing.draw_text_uncached[{}]".format(_backend))(lambda backend=_backend: _text_changing(backend))
+    for _mode in ("full", "changed", "unchanged"):
+        benchmark("render.{}[{}]".format(_mode, _backend))(lambda backend=_backend, mode=_mode: _render(backend, mode))
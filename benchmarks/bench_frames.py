@@ -0,0 +1,140 @@
+from bench_drawing import BACKENDS, create_drawing
+from harness import benchmark
+
+from sh1106_framework import Drawing, StateManager, State, RetainedState, Transition
+from sh1106_framework import TextNode, ImageNode, RectNode
+
+# Whole frames of states like the ones apps are made of: updated, rendered, and sent to the display
+DT = 1 / 60
+
+
+class MenuState(State):
+    # A list of options, with the selected one highlighted, and the selection moving every few frames
+    OPTIONS = ["Weather", "Clock", "Timer", "Settings", "About"]
+    
+    def init(self) -> None:
+        self.elapsed = 0.0
+        self.selected = 0
+    
+    def enter(self) -> None:
+        pass
+    
+    def update(self, dt: float) -> None:
+        self.elapsed += dt
+        self.selected = int(self.elapsed * 4) % len(self.OPTIONS)
+    
+    def render(self) -> None:
+        for i, option in enumerate(self.OPTIONS):
+            y = 2 + i * 12
+            if i == self.selected:
+                Drawing.draw_rect(0, y - 1, 128, 11)
+                Drawing.draw_text(option, 4, y, color=0)
+            else:
+                Drawing.draw_text(option, 4, y)
+
+
+class DashboardState(State):
+    # Icons, a large clock that changes every second, and a graph that scrolls every frame
+    def init(self) -> None:
+        self.elapsed = 0.0
+        self.samples = [(i * 7) % 20 for i in range(64)]
+    
+    def enter(self) -> None:
+        pass
+    
+    def update(self, dt: float) -> None:
+        self.elapsed += dt
+        self.samples = self.samples[1:] + self.samples[:1]
+    
+    def render(self) -> None:
+        Drawing.draw_image("weather-sun", 0, 0)
+        Drawing.draw_image("weather-rain", 24, 0)
+        seconds = int(self.elapsed)
+        Drawing.draw_text("{:02}:{:02}".format(seconds // 60, seconds % 60), 96, 2, scale=2, centered=True)
+        Drawing.draw_outlined_rect(0, 30, 128, 34)
+        for x in range(1, len(self.samples)):
+            Drawing.draw_line(x * 2 - 2, 62 - self.samples[x - 1], x * 2, 62 - self.samples[x])
+
+
+class PongState(State):
+    # A ball bouncing between two paddles, with the score drawn large
+    def init(self) -> None:
+        self.x, self.y = 64.0, 32.0
+        self.vx, self.vy = 90.0, 60.0
+    
+    def enter(self) -> None:
+        pass
+    
+    def update(self, dt: float) -> None:
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        if not 6 <= self.x <= 118:
+            self.vx = -self.vx
+        if not 0 <= self.y <= 60:
+            self.vy = -self.vy
+    
+    def render(self) -> None:
+        Drawing.draw_text("3 2", 64, 2, scale=2, centered=True)
+        Drawing.draw_rect(2, int(self.y) - 6, 3, 14)
+        Drawing.draw_rect(123, int(self.y) - 6, 3, 14)
+        Drawing.draw_circle(int(self.x), int(self.y), 3, filled=True)
+
+
+class RetainedDashboardState(RetainedState):
+    # The dashboard's icons and clock as a scene, where only the clock changes, once a second
+    def init(self) -> None:
+        self.elapsed = 0.0
+        self.clock = TextNode("00:00", 96, 2, scale=2, centered=True)
+        self.scene.add(ImageNode("weather-sun", 0, 0))
+        self.scene.add(ImageNode("weather-rain", 24, 0))
+        self.scene.add(RectNode(0, 30, 128, 34, filled=False))
+        self.scene.add(self.clock)
+    
+    def enter(self) -> None:
+        pass
+    
+    def update(self, dt: float) -> None:
+        self.elapsed += dt
+        seconds = int(self.elapsed)
+        self.clock.text = "{:02}:{:02}".format(seconds // 60, seconds % 60)
+
+
+_STATES = {
+    "menu": MenuState,
+    "dashboard": DashboardState,
+    "pong": PongState,
+    "retained_dashboard": RetainedDashboardState,
+}
+
+
+def _frames(backend: str, route: str):
+    manager = StateManager(create_drawing(backend))
+    manager.register_routes(route, {route: _STATES[route]()})
+    
+    def frame():
+        manager._update(DT)
+        manager._render()
+    return frame
+
+
+def _transition(backend: str):
+    # A slide back and forth between two states, started again every time one finishes
+    manager = StateManager(create_drawing(backend))
+    manager.register_routes("menu", {"menu": MenuState(), "pong": PongState()})
+    routes = ["pong", "menu"]
+    count = [0]
+    
+    def frame():
+        count[0] += 1
+        if count[0] % 20 == 0:
+            routes.reverse()
+            manager.set_route(routes[0], Transition("slide", duration=0.25))
+        manager._update(DT)
+        manager._render()
+    return frame
+
+
+for _backend in BACKENDS:
+    for _route in _STATES:
+        benchmark("frame.{}[{}]".format(_route, _backend))(lambda backend=_backend, route=_route: _frames(backend, route))
+    benchmark("frame.slide_transition[{}]".format(_backend))(lambda backend=_backend: _transition(backend))
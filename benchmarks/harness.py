@@ -0,0 +1,289 @@
+import contextlib
+import gc
+import json
+import os
+import platform
+import re
+import sys
+import time
+import tracemalloc
+
+# Where the framework's package and assets are, so the benchmarks run from a checkout without installing it
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSETS_DIR = os.path.join(REPO_ROOT, "useful-assets", "output")
+sys.path.insert(0, os.path.join(REPO_ROOT, "src"))
+
+BASELINE_VERSION = 1
+
+
+class Benchmark:
+    """
+    A single benchmark. Its setup function is called once before it's measured, and
+    returns the function that's timed, so setting up isn't part of the measurement.
+    
+    Parameters
+    ----------
+    name: str
+        The name it's reported and saved under, such as "drawing.draw_rect[python]".
+    setup: Callable[[], Callable[[], None]]
+        Sets up the benchmark, and returns the function to time.
+    """
+    
+    def __init__(self, name: str, setup) -> None:
+        self.name = name
+        self.setup = setup
+
+
+_benchmarks: list[Benchmark] = []
+
+
+def benchmark(name: str):
+    """
+    Registers a benchmark under a name. It decorates a setup function, which returns
+    the function to time.
+    
+    Parameters
+    ----------
+    name: str
+        The name the benchmark is reported and saved under.
+    """
+    def decorator(setup):
+        _benchmarks.append(Benchmark(name, setup))
+        return setup
+    return decorator
+
+
+def get_benchmarks(pattern: str = None) -> list[Benchmark]:
+    """
+    Returns the registered benchmarks, in the order they were registered.
+    
+    Parameters
+    ----------
+    pattern: str
+        Only returns the benchmarks whose names match this regular expression.
+    """
+    if pattern is None:
+        return list(_benchmarks)
+    return [bench for bench in _benchmarks if re.search(pattern, bench.name)]
+
+
+def measure(function, min_time: float = 0.2, repeat: int = 5) -> dict:
+    """
+    Measures how fast a function runs, and how much memory each call allocates.
+    
+    The function is called in batches that each take at least min_time / repeat seconds,
+    and the fastest batch is used, as the slower ones were only slowed down by something
+    else running. Allocations are then measured separately with tracemalloc, since
+    tracing slows every allocation down.
+    
+    Parameters
+    ----------
+    function: Callable[[], None]
+        The function to measure.
+    min_time: float
+        Roughly how long to spend timing it, in seconds.
+    repeat: int
+        The number of batches to time.
+    
+    Returns
+    -------
+    dict
+        ops_per_sec: the number of calls per second, from the fastest batch.
+        mean_us: the mean time per call across every batch, in microseconds.
+        peak_bytes: the most memory a single call had allocated at once.
+        retained_bytes: the memory still allocated after each call, on average, such as by caches filling up.
+    """
+    # Works out how many calls make a batch long enough to time accurately
+    number = 1
+    batch_time = min_time / repeat
+    while True:
+        elapsed = _time_batch(function, number)
+        if elapsed >= batch_time or number >= 1 << 24:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(batch_time / elapsed) + 1))
+    
+    batches = [_time_batch(function, number) for _ in range(repeat)]
+    best = min(batches)
+    
+    calls = min(number, 100)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start_bytes, _ = tracemalloc.get_traced_memory()
+        peak = 0
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            function()
+            _, call_peak = tracemalloc.get_traced_memory()
+            peak = max(peak, call_peak - before)
+        end_bytes, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        "ops_per_sec": number / best if best > 0 else float("inf"),
+        "mean_us": sum(batches) / (number * repeat) * 1e6,
+        "peak_bytes": peak,
+        "retained_bytes": max(end_bytes - start_bytes, 0) // calls,
+    }
+
+
+def _time_batch(function, number: int) -> float:
+    # The garbage collector is paused, so a collection doesn't land in one batch and not another
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        return time.perf_counter() - start
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def run(benchmarks: list[Benchmark], min_time: float = 0.2, repeat: int = 5, progress=None) -> dict[str, dict]:
+    """
+    Sets up and measures benchmarks one after another. Anything they print, such as
+    the framework reporting the assets it registered, is hidden.
+    
+    Parameters
+    ----------
+    benchmarks: list[Benchmark]
+        The benchmarks to run.
+    min_time: float
+        Roughly how long to spend timing each benchmark, in seconds.
+    repeat: int
+        The number of batches each benchmark is timed in.
+    progress: Callable[[str, dict], None]
+        Called with each benchmark's name and results as soon as it's measured.
+    
+    Returns
+    -------
+    dict[str, dict]
+        The results of each benchmark, as returned by measure, by name.
+    """
+    results = {}
+    for bench in benchmarks:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            function = bench.setup()
+            result = measure(function, min_time, repeat)
+            # Benchmarks can report measurements of their own, such as the memory a file takes once loaded
+            extra = getattr(function, "extra", None)
+            if extra is not None:
+                result.update(extra())
+        results[bench.name] = result
+        if progress is not None:
+            progress(bench.name, result)
+    return results
+
+
+def default_baseline_path() -> str:
+    """
+    Returns the path baselines are saved to by default. Timings only compare between
+    runs on the same machine, so each machine has its own baseline.
+    """
+    return os.path.join(REPO_ROOT, "benchmarks", "baselines", "{}.json".format(platform.node() or "default"))
+
+
+def load_baseline(filepath: str) -> dict[str, dict]:
+    """
+    Loads the results saved with save_baseline, or returns None if there aren't any.
+    
+    Parameters
+    ----------
+    filepath: str
+        The path of the baseline.
+    """
+    if not os.path.exists(filepath):
+        return None
+    
+    with open(filepath, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get("version") != BASELINE_VERSION:
+        raise ValueError("{} is a baseline of unsupported version {}".format(filepath, baseline.get("version")))
+    return baseline["results"]
+
+
+def save_baseline(filepath: str, results: dict[str, dict]) -> None:
+    """
+    Saves results as the baseline later runs are compared with. Results for benchmarks
+    that weren't run are kept from the existing baseline.
+    
+    Parameters
+    ----------
+    filepath: str
+        The path of the baseline.
+    results: dict[str, dict]
+        The results, as returned by run.
+    """
+    merged = dict(load_baseline(filepath) or {})
+    merged.update(results)
+    
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    with open(filepath, 'w') as f:
+        json.dump({
+            "version": BASELINE_VERSION,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": merged,
+        }, f, indent=2, sort_keys=True)
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], threshold: float = 0.1) -> dict[str, list[str]]:
+    """
+    Compares results with a baseline, and flags the benchmarks that got slower, or
+    allocate more, by more than the threshold.
+    
+    Parameters
+    ----------
+    results: dict[str, dict]
+        The results, as returned by run.
+    baseline: dict[str, dict]
+        The baseline, as returned by load_baseline.
+    threshold: float
+        How much worse a benchmark can get before it's flagged, as a fraction.
+    
+    Returns
+    -------
+    dict[str, list[str]]
+        What got worse for each flagged benchmark, by name.
+    """
+    flagged = {}
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        
+        problems = []
+        if result["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold):
+            problems.append("{:.1%} slower".format(1 - result["ops_per_sec"] / base["ops_per_sec"]))
+        # Small allocations vary from run to run, so only differences of over 1 KiB count
+        for key in ("peak_bytes", "retained_bytes"):
+            if result[key] > base[key] * (1 + threshold) + 1024:
+                problems.append("{} up from {} to {}".format(key, base[key], result[key]))
+        if problems:
+            flagged[name] = problems
+    return flagged
+
+
+def format_result(name: str, result: dict, base: dict = None) -> str:
+    """
+    Formats a benchmark's results as a line of a report, with the change in speed from
+    the baseline when there is one.
+    
+    Parameters
+    ----------
+    name: str
+        The name of the benchmark.
+    result: dict
+        Its results, as returned by measure.
+    base: dict
+        Its results in the baseline.
+    """
+    line = "{:<44} {:>14,.0f} ops/s {:>11.2f} us {:>10,} B peak {:>9,} B kept".format(
+        name, result["ops_per_sec"], result["mean_us"], result["peak_bytes"], result["retained_bytes"])
+    if base is not None:
+        line += " {:>+8.1%}".format(result["ops_per_sec"] / base["ops_per_sec"] - 1)
+    return line
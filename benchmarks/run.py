@@ -0,0 +1,63 @@
+import argparse
+import sys
+
+import harness
+
+# Importing the benchmark modules registers their benchmarks
+import bench_drawing
+import bench_frames
+import bench_assets
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks the framework's drawing primitives, frames and asset loading against a virtual display, and compares the results with a saved baseline.")
+    parser.add_argument("-k", "--filter", help="only run the benchmarks whose names match this regular expression")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks without running them")
+    parser.add_argument("--min-time", type=float, default=0.2, help="roughly how long to time each benchmark for, in seconds (default 0.2)")
+    parser.add_argument("--repeat", type=int, default=5, help="the number of batches each benchmark is timed in (default 5)")
+    parser.add_argument("--baseline", default=harness.default_baseline_path(), help="the baseline to compare with and save to (default benchmarks/baselines/<hostname>.json)")
+    parser.add_argument("--save", action="store_true", help="save the results as the baseline, instead of comparing with it")
+    parser.add_argument("--threshold", type=float, default=0.1, help="how much slower, or how much more memory, a benchmark can take before it's flagged, as a fraction (default 0.1)")
+    args = parser.parse_args()
+    
+    benchmarks = harness.get_benchmarks(args.filter)
+    if args.list:
+        for bench in benchmarks:
+            print(bench.name)
+        return 0
+    if not benchmarks:
+        print("No benchmarks match \"{}\"".format(args.filter), file=sys.stderr)
+        return 2
+    
+    baseline = None if args.save else harness.load_baseline(args.baseline)
+    
+    def report(name, result):
+        print(harness.format_result(name, result, baseline.get(name) if baseline else None), flush=True)
+        extras = {key: value for key, value in result.items() if key not in ("ops_per_sec", "mean_us", "peak_bytes", "retained_bytes")}
+        if extras:
+            print("    " + ", ".join("{} {:,}".format(key, value) for key, value in extras.items()))
+    
+    results = harness.run(benchmarks, args.min_time, args.repeat, report)
+    
+    if args.save:
+        harness.save_baseline(args.baseline, results)
+        print("Saved the baseline to {}".format(args.baseline))
+        return 0
+    
+    if baseline is None:
+        print("There's no baseline at {} yet, save one with --save".format(args.baseline))
+        return 0
+    
+    flagged = harness.compare(results, baseline, args.threshold)
+    if not flagged:
+        print("No benchmarks got worse than the baseline by more than {:.0%}".format(args.threshold))
+        return 0
+    
+    print("\n{} benchmarks got worse than the baseline:".format(len(flagged)))
+    for name, problems in flagged.items():
+        print("  {}: {}".format(name, ", ".join(problems)))
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,7 +16,9 @@ setup(
     entry_points={
         'console_scripts': [
             'sh1106_image_generator=sh1106_framework.sh1106_image_generator:main',
-            'sh1106_font_generator=sh1106_framework.sh1106_font_generator:main'
+            'sh1106_font_generator=sh1106_framework.sh1106_font_generator:main',
+            'sh1106_asset_compiler=sh1106_framework.sh1106_asset_compiler:main',
+            'sh1106_asset_generator=sh1106_framework.sh1106_asset_generator:main'
         ]
     },
     packages=find_packages(exclude=['.gitignore', 'sh1106_framework.egg-info', '__pycache__', '*.pyc', 'tests', 'useful-assets']),
@@ -2,12 +2,57 @@
 
 from .sh1106_framework import SH1106Framework
 from .graphics.drawing import Drawing
+from .graphics.canvas import Canvas
 from .framework.states.state_manager import StateManager
 from .framework.states.state import State
+from .framework.states.retained_state import RetainedState
+from .framework.states.transition import Transition
+from .graphics.scene import Scene, Node, TextNode, ImageNode, RectNode, LineNode, Group
+from .graphics.text_cache import TextCache
+from .graphics.asset_cache import AssetCache
+from .graphics.text_layout import TextLayout, Layout, LayoutLine
+from .graphics.marquee import Marquee
+from .graphics.bitmap import Bitmap
+from .graphics.devices import Device, LumaDevice, VirtualDevice
+from .framework.scheduler import FrameScheduler
+from .framework.profiler import Profiler
+from .framework.recorder import Recorder
+from .framework.input import Input, InputEvent, InputSource, Button, RotaryEncoder, GPIOButton, GPIORotaryEncoder, SimulatedInput
 
 __all__ = [
     "SH1106Framework",
     "Drawing",
+    "Canvas",
     "StateManager",
-    "State"
+    "State",
+    "RetainedState",
+    "Transition",
+    "Scene",
+    "Node",
+    "TextNode",
+    "ImageNode",
+    "RectNode",
+    "LineNode",
+    "Group",
+    "TextCache",
+    "AssetCache",
+    "TextLayout",
+    "Layout",
+    "LayoutLine",
+    "Marquee",
+    "Bitmap",
+    "Device",
+    "LumaDevice",
+    "VirtualDevice",
+    "FrameScheduler",
+    "Profiler",
+    "Recorder",
+    "Input",
+    "InputEvent",
+    "InputSource",
+    "Button",
+    "RotaryEncoder",
+    "GPIOButton",
+    "GPIORotaryEncoder",
+    "SimulatedInput"
 ]
\ No newline at end of file
@@ -0,0 +1,464 @@
+from abc import ABC, abstractmethod
+from queue import SimpleQueue, Empty
+from typing import Callable, Iterable, Iterator
+import threading
+import time
+
+# Quadrature transitions of a rotary encoder, indexed by (previous A, previous B, A, B).
+# Valid transitions move one step either way, and anything else is contact bounce.
+_ENCODER_STEPS = (0, -1, 1, 0, 1, 0, 0, -1, -1, 0, 0, 1, 0, 1, -1, 0)
+
+
+class InputEvent:
+    """
+    A single input, such as a button being pressed or an encoder being turned.
+    
+    Attributes
+    ----------
+    source: str
+        The name of the input source it came from.
+    
+    type: str
+        "press" or "release" for buttons, and "rotate" for rotary encoders.
+    
+    value: int
+        1 for a press, 0 for a release, and the number of steps turned for a rotation,
+        positive for clockwise.
+    
+    timestamp: float
+        When the input happened, on the time.monotonic clock.
+    """
+    
+    __slots__ = ('source', 'type', 'value', 'timestamp')
+    
+    def __init__(self, source: str, type: str, value: int, timestamp: float = None) -> None:
+        self.source = source
+        self.type = type
+        self.value = value
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+    
+    def __repr__(self) -> str:
+        return "InputEvent({!r}, {!r}, {})".format(self.source, self.type, self.value)
+
+
+class InputSource(ABC):
+    """
+    The base class for input sources. Sources are polled on the input thread, never on
+    the thread that runs the states.
+    
+    Attributes
+    ----------
+    name: str
+        The name events from this source are given.
+    """
+    
+    name = None
+    
+    @abstractmethod
+    def poll(self, now: float) -> Iterable[InputEvent]:
+        """
+        Reads the source, and returns the events that happened since it was last polled.
+        
+        Parameters
+        ----------
+        now: float
+            The current time on the time.monotonic clock.
+        """
+        pass
+    
+    def close(self) -> None:
+        """
+        Gets called when the source is removed with Input.remove_source.
+        """
+        pass
+
+
+class Button(InputSource):
+    """
+    A button read through a function, such as one that reads a GPIO pin. Its state has
+    to stay the same for the debounce time before a press or release is reported, so
+    contact bounce doesn't cause extra events.
+    
+    Parameters
+    ----------
+    name: str
+        The name events from this button are given.
+    
+    read: Callable[[], bool]
+        A function that returns whether the button is currently held down.
+    
+    debounce: float
+        How long the button's state has to stay the same, in seconds, before it counts.
+    """
+    
+    def __init__(self, name: str, read: Callable[[], bool], debounce: float = 0.02) -> None:
+        self.name = name
+        self.debounce = debounce
+        self.pressed = False
+        
+        self._read = read
+        self.__reading = False
+        self.__changed_at = 0.0
+    
+    def poll(self, now: float) -> Iterable[InputEvent]:
+        reading = bool(self._read())
+        if reading != self.__reading:
+            self.__reading = reading
+            self.__changed_at = now
+            return ()
+        
+        if reading != self.pressed and now - self.__changed_at >= self.debounce:
+            self.pressed = reading
+            return (InputEvent(self.name, "press" if reading else "release", int(reading), now),)
+        return ()
+
+
+class RotaryEncoder(InputSource):
+    """
+    A quadrature rotary encoder read through two functions, such as ones that read GPIO
+    pins. Transitions that skip a step, which are caused by contact bounce, are ignored.
+    
+    Parameters
+    ----------
+    name: str
+        The name events from this encoder are given.
+    
+    read_a: Callable[[], bool]
+        A function that returns the state of the encoder's A output.
+    
+    read_b: Callable[[], bool]
+        A function that returns the state of the encoder's B output.
+    
+    steps_per_detent: int
+        The number of transitions between two clicks of the encoder. Most encoders have 4.
+    """
+    
+    def __init__(self, name: str, read_a: Callable[[], bool], read_b: Callable[[], bool], steps_per_detent: int = 4) -> None:
+        self.name = name
+        self.steps_per_detent = steps_per_detent
+        
+        self._read_a = read_a
+        self._read_b = read_b
+        self.__state = None
+        self.__steps = 0
+    
+    def poll(self, now: float) -> Iterable[InputEvent]:
+        state = (bool(self._read_a()) << 1) | bool(self._read_b())
+        if self.__state is None:
+            self.__state = state
+        if state == self.__state:
+            return ()
+        
+        self.__steps += _ENCODER_STEPS[(self.__state << 2) | state]
+        self.__state = state
+        
+        detents = int(self.__steps / self.steps_per_detent)
+        if not detents:
+            return ()
+        self.__steps -= detents * self.steps_per_detent
+        return (InputEvent(self.name, "rotate", detents, now),)
+
+
+class GPIOButton(Button):
+    """
+    A button wired to a Raspberry Pi GPIO pin, read through the RPi.GPIO package.
+    
+    Parameters
+    ----------
+    name: str
+        The name events from this button are given.
+    
+    pin: int
+        The BCM number of the pin the button is connected to.
+    
+    active_low: bool
+        Whether the button connects the pin to ground when pressed, in which case the
+        pin's internal pull-up resistor is enabled. Otherwise the pull-down is enabled.
+    
+    debounce: float
+        How long the button's state has to stay the same, in seconds, before it counts.
+    """
+    
+    def __init__(self, name: str, pin: int, active_low: bool = True, debounce: float = 0.02) -> None:
+        import RPi.GPIO as GPIO
+        
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP if active_low else GPIO.PUD_DOWN)
+        self.pin = pin
+        self.__gpio = GPIO
+        
+        super().__init__(name, lambda: GPIO.input(pin) != active_low, debounce)
+    
+    def close(self) -> None:
+        self.__gpio.cleanup(self.pin)
+
+
+class GPIORotaryEncoder(RotaryEncoder):
+    """
+    A rotary encoder wired to two Raspberry Pi GPIO pins, read through the RPi.GPIO
+    package. The pins' internal pull-up resistors are enabled.
+    
+    Parameters
+    ----------
+    name: str
+        The name events from this encoder are given.
+    
+    pin_a: int
+        The BCM number of the pin the encoder's A output is connected to.
+    
+    pin_b: int
+        The BCM number of the pin the encoder's B output is connected to.
+    
+    steps_per_detent: int
+        The number of transitions between two clicks of the encoder. Most encoders have 4.
+    """
+    
+    def __init__(self, name: str, pin_a: int, pin_b: int, steps_per_detent: int = 4) -> None:
+        import RPi.GPIO as GPIO
+        
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(pin_a, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        GPIO.setup(pin_b, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        self.pins = (pin_a, pin_b)
+        self.__gpio = GPIO
+        
+        super().__init__(name, lambda: GPIO.input(pin_a), lambda: GPIO.input(pin_b), steps_per_detent)
+    
+    def close(self) -> None:
+        self.__gpio.cleanup(self.pins)
+
+
+class SimulatedInput(InputSource):
+    """
+    An input source that's driven from code instead of hardware, for testing and for
+    running without any buttons. Its methods can be called from any thread.
+    
+    Parameters
+    ----------
+    name: str
+        The name events from this source are given, unless another name is passed to its methods.
+    """
+    
+    def __init__(self, name: str = "simulated") -> None:
+        self.name = name
+    
+    def poll(self, now: float) -> Iterable[InputEvent]:
+        # Simulated events skip polling and go straight into the queue
+        return ()
+    
+    def press(self, name: str = None) -> None:
+        """
+        Reports a button being pressed.
+        
+        Parameters
+        ----------
+        name: str
+            The name of the button. Defaults to the source's name.
+        """
+        Input._post(InputEvent(name or self.name, "press", 1))
+    
+    def release(self, name: str = None) -> None:
+        """
+        Reports a button being released.
+        
+        Parameters
+        ----------
+        name: str
+            The name of the button. Defaults to the source's name.
+        """
+        Input._post(InputEvent(name or self.name, "release", 0))
+    
+    def click(self, name: str = None) -> None:
+        """
+        Reports a button being pressed and released.
+        
+        Parameters
+        ----------
+        name: str
+            The name of the button. Defaults to the source's name.
+        """
+        self.press(name)
+        self.release(name)
+    
+    def rotate(self, steps: int, name: str = None) -> None:
+        """
+        Reports a rotary encoder being turned.
+        
+        Parameters
+        ----------
+        steps: int
+            The number of clicks turned, positive for clockwise.
+        name: str
+            The name of the encoder. Defaults to the source's name.
+        """
+        Input._post(InputEvent(name or self.name, "rotate", steps))
+
+
+class Input:
+    """
+    The input subsystem. Input sources are polled on a background thread, independently
+    of the frame rate, and the events they produce are queued until the start of the next
+    frame. Then, before the current state's update method runs, each event is passed to
+    the state's on_input method.
+    
+    Methods
+    -------
+    add_source(source: InputSource)
+        Adds a source of input events.
+    
+    remove_source(source: InputSource)
+        Removes a source that was added with add_source.
+    
+    set_poll_interval(interval: float)
+        Sets how often the sources are polled.
+    
+    is_pressed(name: str)
+        Returns whether a button is currently held down.
+    """
+    
+    __sources: list[InputSource] = []
+    __queue: SimpleQueue = SimpleQueue()
+    __pressed: set[str] = set()
+    __poll_interval = 0.002
+    
+    __thread: threading.Thread = None
+    __stopping = threading.Event()
+    __on_event: Callable[[], None] = None
+    __error: Exception = None
+    
+    @staticmethod
+    def add_source(source: InputSource) -> InputSource:
+        """
+        Adds a source of input events. It starts being polled straight away if the
+        framework is running, or once it starts otherwise.
+        
+        Parameters
+        ----------
+        source: InputSource
+            The source to add, such as a Button, RotaryEncoder, or SimulatedInput.
+        
+        Returns
+        -------
+        InputSource
+            The source that was added.
+        """
+        # The list is replaced rather than changed, so the input thread never sees it half-updated
+        Input.__sources = Input.__sources + [source]
+        return source
+    
+    @staticmethod
+    def remove_source(source: InputSource) -> None:
+        """
+        Removes a source that was added with add_source.
+        
+        Parameters
+        ----------
+        source: InputSource
+            The source to remove.
+        """
+        Input.__sources = [s for s in Input.__sources if s is not source]
+        source.close()
+    
+    @staticmethod
+    def set_poll_interval(interval: float) -> None:
+        """
+        Sets how often the sources are polled. Shorter intervals lower the input latency,
+        but cost more CPU time.
+        
+        Parameters
+        ----------
+        interval: float
+            The time between polls in seconds. Defaults to 0.002.
+        """
+        Input.__poll_interval = interval
+    
+    @staticmethod
+    def is_pressed(name: str) -> bool:
+        """
+        Returns whether a button is currently held down, according to the events that have
+        been passed to the states so far.
+        
+        Parameters
+        ----------
+        name: str
+            The name of the button.
+        """
+        return name in Input.__pressed
+    
+    @staticmethod
+    def _start(on_event: Callable[[], None] = None) -> None:
+        # Starts polling the sources on a background thread. on_event is called from that
+        # thread whenever an event is queued, such as to wake an idle frame scheduler
+        Input.__on_event = on_event
+        if Input.__thread is not None:
+            return
+        
+        Input.__stopping.clear()
+        Input.__thread = threading.Thread(target=Input.__run, name="sh1106-input", daemon=True)
+        Input.__thread.start()
+    
+    @staticmethod
+    def _stop() -> None:
+        if Input.__thread is None:
+            return
+        
+        Input.__stopping.set()
+        Input.__thread.join()
+        Input.__thread = None
+        Input.__on_event = None
+    
+    @staticmethod
+    def _post(event: InputEvent) -> None:
+        Input.__queue.put(event)
+        if Input.__on_event is not None:
+            Input.__on_event()
+    
+    @staticmethod
+    def _clear() -> None:
+        # Drops the events still queued, and forgets which buttons are held down, such as
+        # before a recording is replayed
+        while True:
+            try:
+                Input.__queue.get_nowait()
+            except Empty:
+                break
+        Input.__pressed.clear()
+        Input.__error = None
+    
+    @staticmethod
+    def _get_events() -> Iterator[InputEvent]:
+        # Takes the events queued so far, one at a time so is_pressed is up to date with each.
+        # Events that arrive while they're being handled wait for the next frame, so a
+        # stream of input can't hold up a frame forever. An error a source raised while
+        # it was polled is raised again here, on the thread that runs the states
+        if Input.__error is not None:
+            error, Input.__error = Input.__error, None
+            raise error
+        
+        for _ in range(Input.__queue.qsize()):
+            try:
+                event = Input.__queue.get_nowait()
+            except Empty:
+                return
+            
+            if event.type == "press":
+                Input.__pressed.add(event.source)
+            elif event.type == "release":
+                Input.__pressed.discard(event.source)
+            yield event
+    
+    @staticmethod
+    def __run() -> None:
+        while not Input.__stopping.wait(Input.__poll_interval):
+            now = time.monotonic()
+            for source in Input.__sources:
+                # A source that fails doesn't stop the others from being polled
+                try:
+                    events = source.poll(now)
+                    for event in events:
+                        Input._post(event)
+                except Exception as e:
+                    if Input.__error is None:
+                        Input.__error = e
+                    if Input.__on_event is not None:
+                        Input.__on_event()
@@ -0,0 +1,23 @@
+from types import MethodType
+
+
+class panelmethod:
+    """
+    A method of a class that has one instance per display, such as Drawing and StateManager.
+    
+    Called on an instance, it's bound to that instance, like any other method. Called on the
+    class, it's bound to the class's current instance, which is the display being updated,
+    so code written against the class draws to whichever display it's running for.
+    
+    The class must have a _current attribute holding its current instance.
+    """
+    
+    def __init__(self, func) -> None:
+        self.__func__ = func
+        self.__name__ = func.__name__
+        self.__doc__ = func.__doc__
+    
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            instance = owner._current
+        return MethodType(self.__func__, instance)
@@ -0,0 +1,254 @@
+from collections import deque
+from typing import Callable
+import json
+import time
+
+# How many frames are written between flushes of a file export, so the main loop doesn't
+# wait on the disk every frame
+_FLUSH_INTERVAL = 300
+
+
+class _FileExport:
+    # The hook export_to_file adds, which writes each frame to a file until it's removed or closed
+    
+    def __init__(self, filepath: str) -> None:
+        self.__file = open(filepath, 'a')
+        self.__frames = 0
+    
+    def __call__(self, frame: dict) -> None:
+        if self.__file is None:
+            return
+        
+        self.__file.write(json.dumps(frame) + "\n")
+        self.__frames += 1
+        if self.__frames % _FLUSH_INTERVAL == 0:
+            self.__file.flush()
+    
+    def close(self) -> None:
+        """
+        Stops writing to the file, and closes it. Removing the hook with
+        Profiler.remove_hook closes it too.
+        """
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+
+class Profiler:
+    """
+    Built-in instrumentation for the framework's main loop. When enabled, it times each
+    phase of every frame, keeps a rolling window of frame times for percentiles, counts
+    frames that missed their deadline, and can pass each frame's measurements on to hooks.
+    
+    The phases are:
+    
+    - input: passing input events to the current state's on_input method
+    - update: the current state's update method
+    - clear: clearing the framebuffer
+    - render: the current state's render method
+    - pack: working out which parts of the frame changed and need to be sent
+    - transfer: writing the changed parts to the display
+    
+    When frames are pipelined, the transfer happens on the transmitter thread, and its time
+    is counted towards the frame that's being drawn when it finishes.
+    
+    It's disabled by default, and costs a single attribute check per phase while disabled.
+    
+    Methods
+    -------
+    enable(window: int, overlay: bool, overlay_font: str)
+        Starts recording frame measurements.
+    
+    disable()
+        Stops recording frame measurements.
+    
+    get_stats()
+        Returns statistics about the recorded frames.
+    
+    add_hook(hook: Callable[[dict], None])
+        Adds a function to be called with every frame's measurements.
+    
+    remove_hook(hook: Callable[[dict], None])
+        Removes a hook that was added with add_hook.
+    
+    export_to_file(filepath: str)
+        Writes every frame's measurements to a file, as one JSON object per line.
+    """
+    
+    _enabled = False
+    _overlay = False
+    _overlay_font = "default"
+    
+    __frame_times: deque = deque(maxlen=600)
+    __frame_intervals: deque = deque(maxlen=600)
+    __phases: dict[str, float] = {}
+    __phase_totals: dict[str, float] = {}
+    __hooks: list = []
+    
+    __frame_start = 0.0
+    __frame_count = 0
+    __missed_deadlines = 0
+    
+    @staticmethod
+    def enable(window: int = 600, overlay: bool = False, overlay_font: str = "default") -> None:
+        """
+        Starts recording frame measurements, and clears any that were recorded before.
+        
+        Parameters
+        ----------
+        window: int
+            The number of most recent frames to calculate percentiles over.
+        
+        overlay: bool
+            Whether to draw the frame rate and frame time in the top-right corner of the screen.
+        
+        overlay_font: str
+            The name of the font to draw the overlay with.
+        """
+        Profiler.__frame_times = deque(maxlen=window)
+        Profiler.__frame_intervals = deque(maxlen=window)
+        Profiler.__frame_start = 0.0
+        Profiler.__phases = {}
+        Profiler.__phase_totals = {}
+        Profiler.__frame_count = 0
+        Profiler.__missed_deadlines = 0
+        
+        Profiler._overlay = overlay
+        Profiler._overlay_font = overlay_font
+        Profiler._enabled = True
+    
+    @staticmethod
+    def disable() -> None:
+        """
+        Stops recording frame measurements. The ones already recorded are kept.
+        """
+        Profiler._enabled = False
+        Profiler._overlay = False
+    
+    @staticmethod
+    def add_hook(hook: Callable[[dict], None]) -> None:
+        """
+        Adds a function to be called with every frame's measurements, after the frame ends.
+        
+        Parameters
+        ----------
+        hook: Callable[[dict], None]
+            The function to call. It's given a dictionary with the frame's number, its
+            total time and the time of each phase in seconds, and whether it missed its deadline.
+        """
+        Profiler.__hooks.append(hook)
+    
+    @staticmethod
+    def remove_hook(hook: Callable[[dict], None]) -> None:
+        """
+        Removes a hook that was added with add_hook. Removing the hook returned by
+        export_to_file also closes its file.
+        
+        Parameters
+        ----------
+        hook: Callable[[dict], None]
+            The function to remove.
+        """
+        Profiler.__hooks.remove(hook)
+        if isinstance(hook, _FileExport):
+            hook.close()
+    
+    @staticmethod
+    def export_to_file(filepath: str) -> Callable[[dict], None]:
+        """
+        Writes every frame's measurements to a file from now on, as one JSON object per line.
+        Frames are flushed to the file in batches, and when it's closed.
+        
+        Parameters
+        ----------
+        filepath: str
+            The path of the file to append to.
+        
+        Returns
+        -------
+        Callable[[dict], None]
+            The hook that writes to the file. Passing it to remove_hook stops writing and
+            closes the file, as does calling its close method.
+        """
+        export = _FileExport(filepath)
+        Profiler.add_hook(export)
+        return export
+    
+    @staticmethod
+    def get_stats() -> dict:
+        """
+        Returns statistics about the recorded frames.
+        
+        Returns
+        -------
+        dict
+            frames: the number of frames recorded since the profiler was enabled.
+            missed_deadlines: the number of those frames that took longer than their frame budget.
+            fps: the average frame rate over the rolling window, from the time between the starts of frames.
+            p50, p95, p99: percentiles over the rolling window of the time spent on each frame, in seconds.
+            phases: the average time of each phase per frame, in seconds.
+        """
+        frame_times = sorted(Profiler.__frame_times)
+        count = Profiler.__frame_count
+        
+        def percentile(p: float) -> float:
+            if not frame_times:
+                return 0.0
+            return frame_times[min(len(frame_times) - 1, int(p / 100 * len(frame_times)))]
+        
+        intervals = Profiler.__frame_intervals
+        average_interval = sum(intervals) / len(intervals) if intervals else 0.0
+        return {
+            "frames": count,
+            "missed_deadlines": Profiler.__missed_deadlines,
+            "fps": 1 / average_interval if average_interval else 0.0,
+            "p50": percentile(50),
+            "p95": percentile(95),
+            "p99": percentile(99),
+            "phases": {name: total / count for name, total in Profiler.__phase_totals.items()} if count else {},
+        }
+    
+    @staticmethod
+    def _get_overlay_text() -> str:
+        frame_times = list(Profiler.__frame_times)[-30:]
+        intervals = list(Profiler.__frame_intervals)[-30:]
+        if not frame_times or not intervals:
+            return "-- FPS"
+        
+        average_interval = sum(intervals) / len(intervals)
+        average_time = sum(frame_times) / len(frame_times)
+        return "{} FPS {:.1f}ms".format(round(1 / average_interval) if average_interval else 0, average_time * 1000)
+    
+    @staticmethod
+    def _start_frame() -> None:
+        now = time.perf_counter()
+        if Profiler.__frame_start:
+            Profiler.__frame_intervals.append(now - Profiler.__frame_start)
+        Profiler.__frame_start = now
+        Profiler.__phases = {}
+    
+    @staticmethod
+    def _record(phase: str, duration: float) -> None:
+        Profiler.__phases[phase] = Profiler.__phases.get(phase, 0.0) + duration
+    
+    @staticmethod
+    def _end_frame(frame_budget: float) -> None:
+        frame_time = time.perf_counter() - Profiler.__frame_start
+        missed = frame_time > frame_budget
+        
+        Profiler.__frame_times.append(frame_time)
+        Profiler.__frame_count += 1
+        if missed:
+            Profiler.__missed_deadlines += 1
+        for phase, duration in Profiler.__phases.items():
+            Profiler.__phase_totals[phase] = Profiler.__phase_totals.get(phase, 0.0) + duration
+        
+        if Profiler.__hooks:
+            frame = {
+                "frame": Profiler.__frame_count,
+                "frame_time": frame_time,
+                "phases": dict(Profiler.__phases),
+                "missed_deadline": missed,
+            }
+            for hook in Profiler.__hooks:
+                hook(frame)
@@ -0,0 +1,272 @@
+from hashlib import blake2b
+import gzip
+import json
+import time
+
+from .input import Input, InputEvent
+
+# Recordings are gzipped JSON lines: a header, then one line per frame with the keys
+#
+#   t: the time the frame took to handle input, update and render, in microseconds
+#   s: the delta times passed to update, left out when they're the same as the previous frame's
+#   e: the input events, as [source, type, value, microseconds since the frame started], left out when there are none
+#   h: a hash of each display's framebuffer, left out when none of them changed since the previous frame
+FORMAT_VERSION = 1
+
+# How many frames are recorded between flushes, so a recording that's cut off loses at most this many
+_FLUSH_INTERVAL = 300
+
+
+def _hash(display) -> str:
+    return blake2b(display.get_drawing().to_bitmap().data, digest_size=8).hexdigest()
+
+
+class Recorder:
+    """
+    Records what the framework does every frame, and replays it to check that the same
+    frames come out, and how long they take to draw.
+    
+    For each frame, a recording keeps the input events that were handled, the delta
+    times the states were updated with, how long the frame took, and a hash of what was
+    drawn on each display. Replaying it runs the same states without the input thread or
+    the frame scheduler, feeding them the recorded events and delta times, so a session
+    recorded on a device can be replayed headlessly, such as on a VirtualDevice, to find
+    which change made a screen slower or changed what it draws.
+    
+    States are only replayed exactly when they're deterministic: they should take the time
+    from the delta times they're given, rather than from the clock.
+    
+    Methods
+    -------
+    start(filepath: str)
+        Starts recording every frame to a file.
+    
+    stop()
+        Stops recording, and finishes writing the file.
+    
+    replay(filepath: str, displays: list[StateManager])
+        Replays a recording, and compares the frames with the recorded ones.
+    
+    replay_async(filepath: str, displays: list[StateManager])
+        Replays a recording as a coroutine, for states whose methods are coroutines.
+    """
+    
+    _recording = False
+    
+    __file = None
+    __frame_start = 0.0
+    __frame_clock = 0.0
+    __frame_events: list = []
+    __frame_steps: list = []
+    __previous_steps: list = None
+    __previous_hashes: list = None
+    __frame_count = 0
+    
+    @staticmethod
+    def start(filepath: str) -> None:
+        """
+        Starts recording every frame the framework runs to a file, replacing the file if
+        it exists. Any recording that was already running is stopped first.
+        
+        Parameters
+        ----------
+        filepath: str
+            The path of the file to record to.
+        """
+        Recorder.stop()
+        
+        Recorder.__file = gzip.open(filepath, 'wt', encoding='utf-8')
+        Recorder.__file.write(json.dumps({"version": FORMAT_VERSION}) + "\n")
+        Recorder.__previous_steps = None
+        Recorder.__previous_hashes = None
+        Recorder.__frame_count = 0
+        Recorder._start_frame()
+        Recorder._recording = True
+    
+    @staticmethod
+    def stop() -> None:
+        """
+        Stops recording, and finishes writing the file. Nothing happens if nothing is being recorded.
+        """
+        Recorder._recording = False
+        if Recorder.__file is not None:
+            Recorder.__file.close()
+            Recorder.__file = None
+    
+    @staticmethod
+    def replay(filepath: str, displays: list = None) -> dict:
+        """
+        Replays a recording on displays that have been set up the same way as when it was
+        recorded, with the same routes registered, and compares each frame with the
+        recorded one. Nothing is slept between frames, so it runs as fast as it can. Input
+        events that are still queued from before are dropped first.
+        
+        States whose methods are coroutines can't be replayed this way, and raise a
+        TypeError. They're replayed with replay_async instead.
+        
+        Parameters
+        ----------
+        filepath: str
+            The path of the recording.
+        displays: list[StateManager]
+            The displays to replay the recording on, in the same order as when it was
+            recorded, such as ones drawing to a VirtualDevice. Defaults to the display
+            whose routes were registered with SH1106Framework.register_routes.
+        
+        Returns
+        -------
+        dict
+            frames: the number of frames replayed.
+            mismatched_frames: the numbers of the frames, from 0, whose pixels differed from the recording.
+            recorded_time: the total time the frames took when they were recorded, in seconds.
+            replayed_time: the total time the frames took to replay, in seconds.
+            frame_times: a (recorded, replayed) pair of times in seconds for every frame.
+        """
+        # Imported here, since the state manager records through this module
+        from .states.state_manager import StateManager
+        
+        if displays is None:
+            displays = [StateManager._current]
+        
+        # Events left queued from before would otherwise be handled in the first frame
+        Input._clear()
+        
+        # Coroutine init and enter methods of the initial routes were called when they were registered
+        StateManager._check_hooks()
+        
+        comparison = _Comparison()
+        for number, frame in enumerate(Recorder.__read_frames(filepath)):
+            steps = comparison.start_frame(frame)
+            StateManager._handle_input(displays)
+            for step in steps:
+                for display in displays:
+                    display._update(step)
+            for display in displays:
+                display._render()
+            StateManager._check_hooks()
+            comparison.end_frame(number, frame, displays)
+        return comparison.get_results()
+    
+    @staticmethod
+    async def replay_async(filepath: str, displays: list = None) -> dict:
+        """
+        Replays a recording like replay, as a coroutine, awaiting the methods of states
+        that are coroutines the same way SH1106Framework.run does. Frames are sent to the
+        displays on the event loop's thread.
+        
+        The parameters and results are the same as replay's.
+        """
+        from .states.state_manager import StateManager
+        
+        if displays is None:
+            displays = [StateManager._current]
+        
+        Input._clear()
+        await StateManager._await_hooks()
+        
+        comparison = _Comparison()
+        for number, frame in enumerate(Recorder.__read_frames(filepath)):
+            steps = comparison.start_frame(frame)
+            await StateManager._handle_input_async(displays)
+            for step in steps:
+                for display in displays:
+                    await display._update_async(step)
+            for display in displays:
+                if await display._draw_async():
+                    display.get_drawing()._render()
+            comparison.end_frame(number, frame, displays)
+        return comparison.get_results()
+    
+    @staticmethod
+    def __read_frames(filepath: str):
+        # Yields each frame of a recording. A recording that was cut off, such as by the
+        # process being killed, is read up to its last whole frame
+        with gzip.open(filepath, 'rt', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            if header.get("version") != FORMAT_VERSION:
+                raise ValueError("{} is a recording of unsupported version {}".format(filepath, header.get("version")))
+            
+            try:
+                for line in f:
+                    if not line.endswith("\n"):
+                        return
+                    yield json.loads(line)
+            except EOFError:
+                return
+    
+    @staticmethod
+    def _start_frame() -> None:
+        Recorder.__frame_start = time.perf_counter()
+        Recorder.__frame_clock = time.monotonic()
+        Recorder.__frame_events = []
+        Recorder.__frame_steps = []
+    
+    @staticmethod
+    def _record_events(events):
+        # Passes events through as they're handled, recording when each happened relative to the frame
+        for event in events:
+            offset = round((event.timestamp - Recorder.__frame_clock) * 1e6)
+            Recorder.__frame_events.append([event.source, event.type, event.value, offset])
+            yield event
+    
+    @staticmethod
+    def _record_step(dt: float) -> None:
+        Recorder.__frame_steps.append(dt)
+    
+    @staticmethod
+    def _end_frame(displays: list) -> None:
+        frame = {"t": round((time.perf_counter() - Recorder.__frame_start) * 1e6)}
+        
+        # Only what changed since the previous frame is written
+        if Recorder.__frame_steps != Recorder.__previous_steps:
+            frame["s"] = Recorder.__frame_steps
+            Recorder.__previous_steps = Recorder.__frame_steps
+        if Recorder.__frame_events:
+            frame["e"] = Recorder.__frame_events
+        hashes = [_hash(display) for display in displays]
+        if hashes != Recorder.__previous_hashes:
+            frame["h"] = hashes
+            Recorder.__previous_hashes = hashes
+        
+        Recorder.__file.write(json.dumps(frame, separators=(',', ':')) + "\n")
+        Recorder.__frame_count += 1
+        if Recorder.__frame_count % _FLUSH_INTERVAL == 0:
+            Recorder.__file.flush()
+
+
+class _Comparison:
+    # Feeds a recording's events to the input queue frame by frame, and compares what was
+    # drawn and how long it took with the recording
+    
+    def __init__(self) -> None:
+        self.mismatched = []
+        self.frame_times = []
+        self.steps = []
+        self.previous_hashes = None
+        self.start = 0.0
+    
+    def start_frame(self, frame: dict) -> list:
+        # Queues the frame's events, and returns the delta times to update the states with
+        self.steps = frame.get("s", self.steps)
+        self.start = time.perf_counter()
+        clock = time.monotonic()
+        for source, type, value, offset in frame.get("e", ()):
+            Input._post(InputEvent(source, type, value, clock + offset / 1e6))
+        return self.steps
+    
+    def end_frame(self, number: int, frame: dict, displays: list) -> None:
+        replayed = time.perf_counter() - self.start
+        hashes = [_hash(display) for display in displays]
+        if hashes != frame.get("h", self.previous_hashes):
+            self.mismatched.append(number)
+        self.previous_hashes = frame.get("h", self.previous_hashes)
+        self.frame_times.append((frame["t"] / 1e6, replayed))
+    
+    def get_results(self) -> dict:
+        return {
+            "frames": len(self.frame_times),
+            "mismatched_frames": self.mismatched,
+            "recorded_time": sum(recorded for recorded, _ in self.frame_times),
+            "replayed_time": sum(replayed for _, replayed in self.frame_times),
+            "frame_times": self.frame_times,
+        }
@@ -0,0 +1,333 @@
+import asyncio
+import math
+import threading
+import time
+
+from .constants import Constants
+
+# The adaptive frame rate drops when frames take longer than this fraction of their budget,
+# and rises again when they'd take less than this fraction of the faster frame rate's budget
+_LOWER_THRESHOLD = 0.9
+_RAISE_THRESHOLD = 0.7
+
+# How much each frame's cost moves the average that the adaptive frame rate follows
+_COST_SMOOTHING = 0.1
+
+
+class FrameScheduler:
+    """
+    Paces the framework's main loop. Between frames it sleeps until the next frame's
+    deadline on a monotonic clock, rather than repeatedly checking the time, so the CPU
+    stays idle while waiting.
+    
+    Parameters
+    ----------
+    fps: float
+        The target number of frames per second.
+    
+    frame_budget: float
+        The target time per frame in seconds. If it's given, fps is ignored.
+    
+    late_policy: str
+        What to do when a frame runs past the next frame's deadline. "drop" skips the
+        deadlines that were missed and carries on from the next one, and "catch_up" runs
+        the missed frames back to back until the loop is on schedule again.
+    
+    max_catch_up: int
+        The most frames the loop can fall behind by with the "catch_up" policy before the
+        missed frames are dropped anyway.
+    
+    idle_fps: float
+        The frame rate to drop to when the screen hasn't changed for idle_after seconds.
+        Defaults to never dropping the frame rate.
+    
+    idle_after: float
+        How long the screen has to stay unchanged, in seconds, before switching to idle_fps.
+    
+    spin_threshold: float
+        How long before each deadline, in seconds, to stop sleeping and wait for it by
+        checking the clock instead. This trades a little CPU time for more precise frame
+        pacing on systems with a coarse sleep.
+    
+    adaptive: bool
+        Whether to lower the frame rate automatically when frames take longer than their
+        budget, such as when the CPU is loaded or the display's bus can't keep up, and to
+        raise it again when they get faster. The frame rate moves between whole fractions
+        of fps (fps / 2, fps / 3, and so on), so frames stay evenly spaced.
+    
+    min_fps: float
+        The lowest frame rate the adaptive frame rate can drop to.
+    
+    raise_after: float
+        How long frames have to stay fast enough, in seconds, before the adaptive frame
+        rate is raised again.
+    
+    update_rate: float
+        The number of times per second to update the current state, independently of how
+        often frames are drawn. Each frame, the state is updated as many times as needed to
+        keep up, with a fixed delta time of 1 / update_rate, so game logic runs at the same
+        rate even when the frame rate drops. Defaults to updating once per frame with the
+        frame's delta time.
+    
+    max_updates: int
+        The most times the state can be updated in one frame with a fixed update_rate.
+        Past this, the updates that are behind are skipped, so a slow frame doesn't lead to
+        ever more updates.
+    """
+    
+    def __init__(self, fps: float = Constants.FPS, frame_budget: float = None, late_policy: str = "drop", max_catch_up: int = 5, idle_fps: float = None, idle_after: float = 1.0, spin_threshold: float = 0.0, adaptive: bool = False, min_fps: float = 10, raise_after: float = 1.0, update_rate: float = None, max_updates: int = 5) -> None:
+        if late_policy not in ("drop", "catch_up"):
+            raise ValueError("late_policy must be \"drop\" or \"catch_up\"")
+        
+        self.frame_budget = frame_budget if frame_budget is not None else 1 / fps
+        self.late_policy = late_policy
+        self.max_catch_up = max_catch_up
+        self.idle_budget = 1 / idle_fps if idle_fps else None
+        self.idle_after = idle_after
+        self.spin_threshold = spin_threshold
+        self.adaptive = adaptive
+        self.min_fps = min_fps
+        self.raise_after = raise_after
+        self.update_step = 1 / update_rate if update_rate else None
+        self.max_updates = max_updates
+        
+        self.idle = False
+        self.frame_count = 0
+        self.late_frames = 0
+        self.dropped_frames = 0
+        self.skipped_updates = 0
+        
+        # The adaptive frame rate is the full frame rate divided by __divisor
+        self.__base_budget = self.frame_budget
+        self.__divisor = 1
+        self.__average_cost = None
+        self.__divisor_changed = 0.0
+        self.__update_time = 0.0
+        
+        self.__deadline = None
+        self.__last_frame_start = None
+        self.__last_change = None
+        self.__woken = threading.Event()
+        self.__loop = None
+        self.__async_woken = None
+    
+    def get_fps(self) -> float:
+        """
+        Returns the target number of frames per second, which is lower while idle.
+        """
+        return 1 / self.__current_budget()
+    
+    def set_fps(self, fps: float) -> None:
+        """
+        Changes the target number of frames per second from the next frame on. With an
+        adaptive frame rate, this is the highest it can go.
+        
+        Parameters
+        ----------
+        fps: float
+            The target number of frames per second.
+        """
+        self.frame_budget = 1 / fps
+        self.__base_budget = self.frame_budget
+        self.__divisor = 1
+    
+    def wake(self) -> None:
+        """
+        Leaves idle mode, so the next frame runs straight away and at the full frame rate.
+        This can be called from any thread, such as one handling input.
+        """
+        self.__last_change = time.monotonic()
+        if self.idle:
+            self.__woken.set()
+            loop = self.__loop
+            if loop is not None and not loop.is_closed():
+                loop.call_soon_threadsafe(self.__async_woken.set)
+    
+    def __current_budget(self) -> float:
+        return self.idle_budget if self.idle else self.frame_budget
+    
+    def wait(self) -> float:
+        """
+        Blocks until the next frame is due.
+        
+        Returns
+        -------
+        float
+            The time in seconds since the start of the previous frame, to pass on as the
+            frame's delta time.
+        """
+        remaining = self.__start_wait()
+        
+        # Sleep on an event rather than with time.sleep, so that wake() can cut a long idle frame short
+        if remaining > self.spin_threshold and self.__woken.wait(remaining - self.spin_threshold):
+            self.__deadline = time.monotonic()
+        return self.__finish_wait()
+    
+    async def wait_async(self) -> float:
+        """
+        Waits until the next frame is due without blocking the event loop, so other
+        tasks run in the meantime.
+        
+        Returns
+        -------
+        float
+            The time in seconds since the start of the previous frame, to pass on as the
+            frame's delta time.
+        """
+        loop = asyncio.get_running_loop()
+        if self.__loop is not loop:
+            self.__loop = loop
+            self.__async_woken = asyncio.Event()
+        
+        self.__start_wait()
+        while not self.__woken.is_set():
+            remaining = self.__deadline - time.monotonic()
+            if remaining <= self.spin_threshold:
+                break
+            try:
+                await asyncio.wait_for(self.__async_woken.wait(), remaining - self.spin_threshold)
+            except asyncio.TimeoutError:
+                pass
+            self.__async_woken.clear()
+        
+        if self.__woken.is_set():
+            self.__deadline = time.monotonic()
+        return self.__finish_wait()
+    
+    def __start_wait(self) -> float:
+        # Returns the time left until the next frame is due
+        now = time.monotonic()
+        if self.__deadline is None:
+            self.__deadline = now
+            self.__last_frame_start = now - self.frame_budget
+            self.__last_change = now
+        return self.__deadline - now
+    
+    def __finish_wait(self) -> float:
+        if self.__woken.is_set():
+            self.__woken.clear()
+            self.idle = False
+        while time.monotonic() < self.__deadline:
+            pass
+        
+        now = time.monotonic()
+        delta_time = now - self.__last_frame_start
+        self.__last_frame_start = now
+        return delta_time
+    
+    def frame_done(self, changed: bool = True) -> None:
+        """
+        Schedules the next frame. This should be called after every frame.
+        
+        Parameters
+        ----------
+        changed: bool
+            Whether the frame changed anything on the screen, which keeps the scheduler out
+            of idle mode.
+        """
+        now = time.monotonic()
+        self.frame_count += 1
+        
+        if self.adaptive:
+            self.__adapt(now - self.__last_frame_start, now)
+        
+        if changed:
+            self.__last_change = now
+            self.idle = False
+        elif self.idle_budget and not self.idle and now - self.__last_change >= self.idle_after:
+            self.idle = True
+        
+        budget = self.__current_budget()
+        self.__deadline += budget
+        if now <= self.__deadline:
+            return
+        
+        self.late_frames += 1
+        missed = math.ceil((now - self.__deadline) / budget)
+        if self.late_policy == "catch_up" and missed <= self.max_catch_up:
+            # Keep the deadline where it is, so the next frames run immediately until the
+            # loop is back on schedule
+            return
+        
+        # Skip the deadlines that have already passed, keeping the frames in phase
+        self.dropped_frames += missed
+        self.__deadline += missed * budget
+    
+    def __adapt(self, cost: float, now: float) -> None:
+        # Follows a moving average of the time spent on each frame, so a single slow frame
+        # doesn't change the frame rate
+        if self.__average_cost is None:
+            self.__average_cost = cost
+        else:
+            self.__average_cost += (cost - self.__average_cost) * _COST_SMOOTHING
+        average = self.__average_cost
+        
+        # Drop straight to the fastest frame rate the frames fit in, down to min_fps
+        if average > self.frame_budget * _LOWER_THRESHOLD:
+            divisor = math.ceil(average / (self.__base_budget * _LOWER_THRESHOLD))
+            divisor = max(1, min(divisor, math.floor(1 / (self.__base_budget * self.min_fps) + 1e-9)))
+            if divisor > self.__divisor:
+                self.__set_divisor(divisor, now)
+            return
+        
+        # Only go back up one step at a time, after frames have been fast enough for a while
+        if self.__divisor > 1 and average < self.__base_budget * (self.__divisor - 1) * _RAISE_THRESHOLD:
+            if now - self.__divisor_changed >= self.raise_after:
+                self.__set_divisor(self.__divisor - 1, now)
+        else:
+            self.__divisor_changed = now
+    
+    def __set_divisor(self, divisor: int, now: float) -> None:
+        self.__divisor = divisor
+        self.__divisor_changed = now
+        self.frame_budget = self.__base_budget * divisor
+    
+    def get_update_steps(self, delta_time: float) -> list[float]:
+        """
+        Returns the delta times to update the current state with for a frame. Without a
+        fixed update_rate, this is just the frame's delta time.
+        
+        Parameters
+        ----------
+        delta_time: float
+            The frame's delta time in seconds, as returned by wait.
+        """
+        if self.update_step is None:
+            return [delta_time]
+        
+        self.__update_time += delta_time
+        steps = int(self.__update_time / self.update_step)
+        if steps > self.max_updates:
+            self.skipped_updates += steps - self.max_updates
+            self.__update_time = 0.0
+            return [self.update_step] * self.max_updates
+        
+        self.__update_time -= steps * self.update_step
+        return [self.update_step] * steps
+    
+    def get_stats(self) -> dict:
+        """
+        Returns statistics about the frames that have been scheduled.
+        
+        Returns
+        -------
+        dict
+            frames: the number of frames that have run.
+            late_frames: the number of frames that finished after the next frame's deadline.
+            dropped_frames: the number of frame deadlines that were skipped.
+            fps: the current target frame rate.
+            max_fps: the highest target frame rate, which the adaptive frame rate can drop below.
+            idle: whether the scheduler is in idle mode.
+            frame_cost: the average time spent on each frame in seconds, with an adaptive frame rate.
+            skipped_updates: the number of fixed updates skipped because a frame fell too far behind.
+        """
+        return {
+            "frames": self.frame_count,
+            "late_frames": self.late_frames,
+            "dropped_frames": self.dropped_frames,
+            "fps": self.get_fps(),
+            "max_fps": 1 / self.__base_budget,
+            "idle": self.idle,
+            "frame_cost": self.__average_cost or 0.0,
+            "skipped_updates": self.skipped_updates,
+        }
@@ -0,0 +1,28 @@
+from ...graphics.scene import Scene
+from .state import State
+
+class RetainedState(State):
+    """
+    A state whose screen is described by a scene of nodes, rather than being drawn from
+    scratch every frame. Add nodes to self.scene in init or enter, then change their
+    attributes in update. Only the parts of the screen covered by nodes that changed are
+    redrawn, and frames where nothing changed skip drawing and sending entirely.
+    
+    Unlike other states, a retained state doesn't need a render method.
+    """
+    
+    @property
+    def scene(self) -> Scene:
+        """
+        The scene that's drawn while this state is the current one.
+        """
+        if "_scene" not in self.__dict__:
+            self._scene = Scene()
+        return self._scene
+    
+    def render(self) -> None:
+        """
+        Redraws the parts of the scene that changed. This is only called when something
+        in the scene changed since the last frame.
+        """
+        self.scene.render()
@@ -6,10 +6,22 @@ class State(ABC):
     this class. The framework will automatically initialize the state upon
     entering it. The user can manually set the state using the set_state function
     in the state manager.
+    
+    A state can list the images and fonts it draws with in preload_images and
+    preload_fonts, to have them decoded before it's entered instead of while its first
+    frame is drawn. preload_fonts is a list of font names, which preloads every character
+    of each, or a dict of font names to the characters to preload.
+    
+    It can also list the routes it leads to in preload_routes, to have them warmed up in
+    the background whenever it's entered, as with StateManager.preload_routes.
     """
     
     initialized = False
     
+    preload_images: list[str] = []
+    preload_fonts: list[str] | dict[str, str] = []
+    preload_routes: list[str] = []
+    
     @abstractmethod
     def init(self) -> None:
         """
@@ -24,6 +36,19 @@ class State(ABC):
         """
         pass
 
+    def on_input(self, event) -> None:
+        """
+        A function that gets run for each input event, such as a button press, while the
+        state is the current one. Events are handled at the start of each frame, before
+        update. Overriding it is optional.
+        
+        Parameters
+        ----------
+        event: InputEvent
+            The input event, with its source, type, value, and timestamp.
+        """
+        pass
+
     @abstractmethod
     def update(self, dt: float) -> None:
         """
@@ -1,5 +1,17 @@
 from ...graphics.drawing import Drawing
+from ...graphics.images import Images
+from ...graphics.fonts import Fonts
+from ..panels import panelmethod
+from ..profiler import Profiler
+from ..recorder import Recorder
+from ..input import Input
 from .state import State
+from .retained_state import RetainedState
+from .transition import Transition
+
+from concurrent.futures import ThreadPoolExecutor
+import inspect
+import time
 
 class StateManager:
     """
@@ -7,60 +19,418 @@ class StateManager:
     It handles the initialization, entering, updating, and rendering of the
     current state. These are done automatically by the SH1106Framework, however
     the user can manually set the state using the set_state and pop methods.
+    
+    Routes can be warmed up, so that their init methods run on a background thread ahead
+    of being entered, rather than holding up the frame they're entered on. Switching to a
+    route that's still warming up doesn't block either: the current route stays on the
+    screen, or a loading route is shown, until its init has finished.
+    
+    Each instance manages the states of one display, with its own routes. Its methods can
+    also be called on the class, as states usually do, in which case they act on the
+    current display: the one SH1106Framework.begin set up, or, when running several, the
+    one whose state is being run.
+    
+    Parameters
+    ----------
+    drawing: Drawing
+        The display the states are drawn to.
     """
     
-    __states: dict[str, State] = {}
+    # The current display, which methods called on the class are bound to
+    _current: "StateManager" = None
     
-    @staticmethod
-    def _init(default_route: str, routes: dict[str, State]) -> None:
+    __pending_hooks: list = []
+    
+    # Runs the init methods of routes being warmed up, one at a time, for every display
+    __init_executor: ThreadPoolExecutor = None
+    
+    def __init__(self, drawing: Drawing) -> None:
+        self.__drawing = drawing
+        self.__states: dict[str, State] = {}
+        self.__current_state = None
+        self.__previous_state = None
+        
+        self.__loading_route = None
+        self.__warming = {}
+        self.__pending_route = None
+        self.__init_stats: dict[str, dict] = {}
+        
+        # The running transition, the snapshot of the frame it started from, and how long it's been running
+        self.__transition: list = None
+    
+    @panelmethod
+    def get_drawing(self) -> Drawing:
+        """
+        Returns the display the states are drawn to.
+        """
+        return self.__drawing
+    
+    def _activate(self) -> None:
+        # Makes this the current display, for methods called on StateManager and Drawing
+        StateManager._current = self
+        Drawing._current = self.__drawing
+    
+    @panelmethod
+    def register_routes(self, default_route: str, routes: dict[str, State], preload: list[str] = None, loading_route: str = None) -> None:
+        """
+        Registers the routes of the display, and initializes and enters the default route.
+        SH1106Framework.register_routes does this for the current display.
+        
+        Parameters
+        ----------
+        default_route: str
+            The initial route.
+        
+        routes: dict[str, State]
+            A dictionary of routes and their corresponding states.
+        
+        preload: list[str]
+            Routes to warm up in the background straight away, as with preload_routes.
+        
+        loading_route: str
+            A route to show while switching to a route that's still warming up, such as
+            a spinner. Its init runs as usual. Defaults to keeping the current route on
+            the screen until the switch happens.
+        """
         # Define routes here
         for page in routes:
-            StateManager.__states[page] = routes[page]
+            self.__states[page] = routes[page]
         
-        StateManager.__current_state = default_route
-        StateManager.__previous_state = default_route
-
+        self.__loading_route = loading_route
+        self.__current_state = default_route
+        self.__previous_state = default_route
         
         # Initializes the default route afterwards
-        StateManager.__states[StateManager.__current_state].initialized = True
-        StateManager.__states[StateManager.__current_state].init()
-        StateManager.__states[StateManager.__current_state].enter()
+        self.__enter(default_route)
+        self.preload_routes(preload or [])
         
-    @staticmethod
-    def set_route(route_name):
+    @panelmethod
+    def set_route(self, route_name, transition: Transition = None):
         """
         Sets the current state to the given route name.
         
+        If the route is still warming up, the switch happens once its init has finished,
+        on a later frame, and the current route, or the loading route if one was
+        registered, keeps running until then.
+        
         Parameters
         ----------
         route_name: str
             The name of the route to set the current state to.
+        
+        transition: Transition
+            The animation to switch to the route with, starting from the frame that's on
+            the screen. Defaults to switching straight away.
+        """
+        warming = self.__warming.get(route_name)
+        self.__pending_route = None
+        if warming is not None and not warming.done():
+            self.__pending_route = (route_name, self.__current_state, time.perf_counter(), transition)
+            if self.__loading_route is not None and self.__current_state != self.__loading_route:
+                self.__enter(self.__loading_route)
+            return
+        
+        self.__previous_state = self.__current_state
+        self.__start_transition(transition)
+        self.__enter(route_name)
+    
+    @panelmethod
+    def preload_routes(self, routes: list[str]) -> None:
+        """
+        Warms up routes by running their init methods on a background thread, so entering
+        them later doesn't hold up a frame. States can also list the routes they lead to
+        in their preload_routes attribute, to warm them up whenever the state is entered.
+        
+        Routes that are already initialized are skipped, as are routes whose init is a
+        coroutine, since those already run on the event loop. An init that runs in the
+        background mustn't draw or change routes, and an exception it raises is raised
+        when its route is entered.
+        
+        Parameters
+        ----------
+        routes: list[str]
+            The routes to warm up.
+        """
+        for route in routes:
+            state = self.__states[route]
+            if state.initialized or inspect.iscoroutinefunction(state.init):
+                continue
+            
+            state.initialized = True
+            if StateManager.__init_executor is None:
+                StateManager.__init_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sh1106-init")
+            self.__warming[route] = StateManager.__init_executor.submit(self.__init_state, route, True)
+    
+    @panelmethod
+    def get_init_stats(self) -> dict[str, dict]:
         """
-        StateManager.__previous_state = StateManager.__current_state
+        Returns how long the init method of each route took, for the routes that have
+        been initialized so far.
         
-        if not StateManager.__states[route_name].initialized:
-            StateManager.__states[route_name].initialized = True
-            StateManager.__states[route_name].init()
+        Returns
+        -------
+        dict[str, dict]
+            For each route:
+            init_time: the number of seconds its init method took.
+            background: whether it was warmed up in the background.
+            waited: the number of seconds a switch to it waited for its init to finish.
+        """
+        return {route: dict(stats) for route, stats in self.__init_stats.items()}
+    
+    def __enter(self, route_name: str) -> None:
+        # Enters a route, initializing it first if it hasn't been
+        state = self.__states[route_name]
+        StateManager.__preload(state)
+        
+        warming = self.__warming.pop(route_name, None)
+        if warming is not None:
+            warming.result()
+        elif not state.initialized:
+            state.initialized = True
+            self.__init_state(route_name, False)
         
-        StateManager.__states[route_name].enter()
+        self.__call(state.enter)
+        self.__invalidate_scene(state)
         
-        StateManager.__current_state = route_name
+        self.__current_state = route_name
+        self.preload_routes(state.preload_routes)
+    
+    def __init_state(self, route_name: str, background: bool) -> None:
+        start = time.perf_counter()
+        if background:
+            # Hooks run on the main thread make their display current, which isn't safe from here
+            self.__states[route_name].init()
+        else:
+            self.__call(self.__states[route_name].init)
+        self.__init_stats[route_name] = {"init_time": time.perf_counter() - start, "background": background, "waited": 0.0}
+    
+    def __check_pending_route(self) -> None:
+        # Finishes switching to a route once it's done warming up
+        pending = self.__pending_route
+        if pending is None or not self.__warming[pending[0]].done():
+            return
         
+        route_name, origin, requested, transition = pending
+        self.__pending_route = None
+        if route_name in self.__init_stats:
+            self.__init_stats[route_name]["waited"] = time.perf_counter() - requested
+        self.__previous_state = origin
+        self.__start_transition(transition)
+        self.__enter(route_name)
+    
+    def __start_transition(self, transition: Transition) -> None:
+        # The frame on the screen is packed once, and composited with the incoming state's frames
+        if transition is None:
+            self.__transition = None
+        else:
+            self.__transition = [transition, self.__drawing.to_bitmap(), 0.0]
+    
+    def __draw_transition(self) -> None:
+        if self.__transition is not None:
+            transition, outgoing, elapsed = self.__transition
+            transition._draw(self.__drawing, outgoing, transition._get_progress(elapsed))
+    
     @staticmethod
-    def pop():
+    def __preload(state: State) -> None:
+        # Decodes the assets the state says it draws with, before it's entered
+        Images._preload(state.preload_images)
+        Fonts._preload(state.preload_fonts)
+    
+    def __invalidate_scene(self, state: State) -> None:
+        # The screen still shows the previous state, so a retained state's scene is redrawn in full on entering
+        if isinstance(state, RetainedState):
+            state.scene.invalidate()
+        
+    @panelmethod
+    def pop(self, transition: Transition = None):
         """
         Sets the current state to the previous state. Nothing happens if there is
         no previous state.
+        
+        Parameters
+        ----------
+        transition: Transition
+            The animation to switch to the previous state with, as in set_route.
         """
-        StateManager.set_route(StateManager.__previous_state)
+        self.set_route(self.__previous_state, transition)
+    
+    def __call(self, hook, *args) -> None:
+        # Hooks run with this display current, so drawing through the Drawing class goes to
+        # it, even when one display's state changes the route of another
+        previous = StateManager._current
+        self._activate()
+        try:
+            result = hook(*args)
+        finally:
+            previous._activate()
+        
+        # State methods can be coroutines when the framework is run with SH1106Framework.run,
+        # in which case they're awaited, with their display current, before the frame moves on
+        if inspect.isawaitable(result):
+            StateManager.__pending_hooks.append((self, result))
     
     @staticmethod
-    def _update(dt):
-        StateManager.__states[StateManager.__current_state].update(dt)
+    def _check_hooks() -> None:
+        # Without an event loop, there's nothing to run coroutine state methods on
+        if StateManager.__pending_hooks:
+            for _, hook in StateManager.__pending_hooks:
+                if inspect.iscoroutine(hook):
+                    hook.close()
+            StateManager.__pending_hooks.clear()
+            raise TypeError("State methods can only be coroutines when the framework is started with SH1106Framework.run, or replayed with Recorder.replay_async")
     
     @staticmethod
-    def _render():
-        Drawing._update_contrast()
-        Drawing.clear()
-        StateManager.__states[StateManager.__current_state].render()
-        Drawing._render()
\ No newline at end of file
+    async def _await_hooks() -> None:
+        while StateManager.__pending_hooks:
+            manager, hook = StateManager.__pending_hooks.pop(0)
+            previous = StateManager._current
+            manager._activate()
+            try:
+                await hook
+            finally:
+                previous._activate()
+    
+    @staticmethod
+    def _handle_input(managers: list["StateManager"]) -> None:
+        # Passes queued input events to the current state of each display, which can change between events
+        if not Profiler._enabled:
+            for event in StateManager.__get_events():
+                for manager in managers:
+                    manager.__handle_event(event)
+            return
+        
+        start = time.perf_counter()
+        for event in StateManager.__get_events():
+            for manager in managers:
+                manager.__handle_event(event)
+        Profiler._record("input", time.perf_counter() - start)
+    
+    @staticmethod
+    async def _handle_input_async(managers: list["StateManager"]) -> None:
+        start = time.perf_counter()
+        for event in StateManager.__get_events():
+            for manager in managers:
+                manager.__handle_event(event)
+                await StateManager._await_hooks()
+        
+        if Profiler._enabled:
+            Profiler._record("input", time.perf_counter() - start)
+    
+    @staticmethod
+    def __get_events():
+        # Events are recorded as they're handled, while a recording is running
+        if Recorder._recording:
+            return Recorder._record_events(Input._get_events())
+        return Input._get_events()
+    
+    def __handle_event(self, event) -> None:
+        self.__drawing.wake()
+        self.__call(self.__states[self.__current_state].on_input, event)
+    
+    @panelmethod
+    def _update(self, dt):
+        self.__check_pending_route()
+        if self.__transition is not None:
+            self.__transition[2] += dt
+        if not Profiler._enabled:
+            self.__call(self.__states[self.__current_state].update, dt)
+            return
+        
+        start = time.perf_counter()
+        self.__call(self.__states[self.__current_state].update, dt)
+        Profiler._record("update", time.perf_counter() - start)
+    
+    @panelmethod
+    async def _update_async(self, dt):
+        self.__check_pending_route()
+        if self.__transition is not None:
+            self.__transition[2] += dt
+        start = time.perf_counter()
+        self.__call(self.__states[self.__current_state].update, dt)
+        await StateManager._await_hooks()
+        
+        if Profiler._enabled:
+            Profiler._record("update", time.perf_counter() - start)
+    
+    @panelmethod
+    def _render(self) -> bool:
+        state = self.__prepare_draw()
+        if state is None:
+            return False
+        
+        if not Profiler._enabled:
+            self.__call(state.render)
+            self.__draw_transition()
+            return self.__drawing._render()
+        
+        start = time.perf_counter()
+        self.__call(state.render)
+        self.__draw_transition()
+        Profiler._record("render", time.perf_counter() - start)
+        
+        if Profiler._overlay:
+            self.__draw_overlay()
+        
+        return self.__drawing._render()
+    
+    @panelmethod
+    async def _draw_async(self) -> bool:
+        # Draws the frame without sending it, and returns whether there's anything to send
+        state = self.__prepare_draw()
+        if state is None:
+            return False
+        
+        start = time.perf_counter()
+        self.__call(state.render)
+        await StateManager._await_hooks()
+        self.__draw_transition()
+        
+        if Profiler._enabled:
+            Profiler._record("render", time.perf_counter() - start)
+            if Profiler._overlay:
+                self.__draw_overlay()
+        return True
+    
+    def __prepare_draw(self) -> State:
+        # Returns the state to draw, with the framebuffer cleared for it, or None if there's nothing to draw
+        self.__check_pending_route()
+        transition = self.__transition
+        scale = 1.0 if transition is None else transition[0]._get_contrast_scale(transition[0]._get_progress(transition[2]))
+        woke = self.__drawing._update_brightness(scale)
+        
+        # Retained states keep what's in the framebuffer and redraw only what changed, so
+        # when nothing did, there's nothing to clear, draw or send
+        state = self.__states[self.__current_state]
+        if transition is not None:
+            # The incoming state is drawn in full on every frame of the transition, and the one after it
+            self.__invalidate_scene(state)
+            if transition[2] >= transition[0].duration:
+                self.__transition = None
+        
+        if isinstance(state, RetainedState):
+            # A display that was just turned back on is sent whatever changed while it was off
+            return state if state.scene.is_dirty() or woke else None
+        
+        if not Profiler._enabled:
+            self.__drawing.clear()
+            return state
+        
+        start = time.perf_counter()
+        self.__drawing.clear()
+        Profiler._record("clear", time.perf_counter() - start)
+        return state
+    
+    def __draw_overlay(self) -> None:
+        # Draws the frame rate and frame time in the top-right corner, on a blank background
+        text = Profiler._get_overlay_text()
+        font = Profiler._overlay_font
+        width = self.__drawing.get_text_width(text, font=font)
+        height = self.__drawing.get_text_height(font=font)
+        x = self.__drawing.get_width() - width
+        
+        self.__drawing.draw_rect(x - 1, 0, width + 1, height, 0)
+        self.__drawing.draw_text(text, x, 0, 1, font=font)
+
+
+# The display the framework runs when it's given a single one, drawn to by the current Drawing
+StateManager._current = StateManager(Drawing._current)
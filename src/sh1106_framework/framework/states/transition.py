@@ -0,0 +1,148 @@
+from ...graphics.bitmap import Bitmap
+from ...graphics.canvas import Canvas
+
+from typing import Callable
+
+# Easing curves, which map the time through a transition to how far along it is, both from 0 to 1
+_EASINGS = {
+    "linear": lambda t: t,
+    "ease_in": lambda t: t * t,
+    "ease_out": lambda t: 1 - (1 - t) * (1 - t),
+    "ease_in_out": lambda t: t * t * (3 - 2 * t),
+}
+
+_KINDS = ("slide", "wipe", "fade")
+_DIRECTIONS = ("left", "right", "up", "down")
+
+
+def _bayer(size: int) -> list[list[int]]:
+    # An ordered dithering matrix, where lighting the cells below a threshold spreads the
+    # lit pixels evenly at every level
+    if size == 1:
+        return [[0]]
+    half = _bayer(size // 2)
+    return [[4 * half[y % (size // 2)][x % (size // 2)] + (0, 2, 3, 1)[(y >= size // 2) * 2 + (x >= size // 2)] for x in range(size)] for y in range(size)]
+
+
+_BAYER = _bayer(8)
+
+# The dither masks the fade has made, by width, height, and number of lit cells out of 64
+_dither_masks: dict[tuple[int, int, int], Bitmap] = {}
+
+
+def _dither_mask(width: int, height: int, level: int) -> Bitmap:
+    key = (width, height, level)
+    mask = _dither_masks.get(key)
+    if mask is None:
+        # The matrix is 8 rows tall, so every page of the mask is the same 8 column bytes repeated
+        columns = [sum(1 << row for row in range(8) if _BAYER[row][column] < level) for column in range(8)]
+        page = bytes(columns[x & 7] for x in range(width))
+        pages = (height + 7) // 8
+        data = bytearray(page * pages)
+        if height & 7:
+            last = (pages - 1) * width
+            for x in range(width):
+                data[last + x] &= 0xFF >> (8 - (height & 7))
+        mask = _dither_masks[key] = Bitmap(width, height, data)
+    return mask
+
+
+class Transition:
+    """
+    An animated transition between two routes, for StateManager.set_route.
+    
+    The outgoing route's last frame is snapshotted once when the transition starts, and
+    each frame of the transition composites it with the incoming route's frame a whole
+    page at a time, so a transition costs little more than a normal frame. Only the
+    incoming route is updated and rendered while it runs.
+    
+    Parameters
+    ----------
+    kind: str
+        "slide" to push the outgoing frame off the screen with the incoming one, "wipe"
+        to uncover the incoming frame behind an edge moving across the outgoing one, or
+        "fade" to dissolve the outgoing frame to black and the incoming one in from it,
+        with ordered dithering while the display's contrast is lowered to 0 and raised
+        back again.
+    duration: float
+        How long the transition takes, in seconds.
+    direction: str
+        The direction a slide or wipe moves in, either "left", "right", "up" or "down".
+    easing: str | Callable[[float], float]
+        How the transition speeds up and slows down, either "linear", "ease_in",
+        "ease_out" or "ease_in_out", or a function mapping the time through the
+        transition to how far along it is, both from 0 to 1.
+    """
+    
+    def __init__(self, kind: str = "slide", duration: float = 0.3, direction: str = "left", easing: str | Callable[[float], float] = "ease_in_out") -> None:
+        if kind not in _KINDS:
+            raise ValueError("Unknown transition \"{}\"".format(kind))
+        if direction not in _DIRECTIONS:
+            raise ValueError("Unknown transition direction \"{}\"".format(direction))
+        if duration < 0:
+            raise ValueError("A transition's duration can't be negative")
+        if not callable(easing) and easing not in _EASINGS:
+            raise ValueError("Unknown easing \"{}\"".format(easing))
+        
+        self.kind = kind
+        self.duration = duration
+        self.direction = direction
+        self.easing = easing
+    
+    def _get_progress(self, elapsed: float) -> float:
+        # How far along the transition is after `elapsed` seconds, from 0 to 1
+        if self.duration <= 0 or elapsed >= self.duration:
+            return 1.0
+        
+        easing = self.easing if callable(self.easing) else _EASINGS[self.easing]
+        return min(max(easing(elapsed / self.duration), 0.0), 1.0)
+    
+    def _get_contrast_scale(self, progress: float) -> float:
+        # What the display's contrast is multiplied by at this point of the transition. A fade
+        # ramps it down to 0 over the first half and back up over the second, in step with the
+        # dithering, so the pixels that are still lit dim rather than just thinning out
+        if self.kind != "fade":
+            return 1.0
+        return abs(2 * progress - 1)
+    
+    def _draw(self, canvas: Canvas, outgoing: Bitmap, progress: float) -> None:
+        # Composites the outgoing frame with the incoming one, which has just been drawn on the canvas
+        width = canvas.get_width()
+        height = canvas.get_height()
+        canvas.reset_clip()
+        
+        if self.kind == "fade":
+            # The outgoing frame fades out over the first half, and the incoming one in over the second
+            if progress < 0.5:
+                canvas.draw_canvas(outgoing, 0, 0, "copy")
+                level = round((1 - 2 * progress) * 64)
+            else:
+                level = round((2 * progress - 1) * 64)
+            if level < 64:
+                canvas.draw_canvas(_dither_mask(width, height, level), 0, 0, "and")
+            return
+        
+        horizontal = self.direction in ("left", "right")
+        size = width if horizontal else height
+        offset = round(progress * size)
+        forwards = self.direction in ("right", "down")
+        
+        if self.kind == "wipe":
+            # The incoming frame stays put, and the part of the outgoing one the edge hasn't passed yet is drawn over it
+            start = offset if forwards else 0
+            if horizontal:
+                canvas.draw_canvas(outgoing, start, 0, "copy", source_x=start, width=width - offset)
+            else:
+                canvas.draw_canvas(outgoing, 0, start, "copy", source_y=start, height=height - offset)
+            return
+        
+        # Both frames move together, with the incoming one following the outgoing one onto the screen
+        incoming = canvas.to_bitmap()
+        shift = offset if forwards else -offset
+        follow = shift - size if forwards else shift + size
+        if horizontal:
+            canvas.draw_canvas(outgoing, shift, 0, "copy")
+            canvas.draw_canvas(incoming, follow, 0, "copy")
+        else:
+            canvas.draw_canvas(outgoing, 0, shift, "copy")
+            canvas.draw_canvas(incoming, 0, follow, "copy")
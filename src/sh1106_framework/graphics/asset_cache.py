@@ -0,0 +1,148 @@
+from collections import OrderedDict
+
+from .bitmap import Bitmap
+
+class AssetCache:
+    """
+    A least-recently-used cache of decoded images and font glyphs, bounded by memory.
+    
+    Registering images and fonts only indexes them. Each image or glyph is decoded the
+    first time it's drawn, and kept here until the packed pixels of everything in the
+    cache, along with the scaled copies made of it when it's drawn at a scale, add up to
+    more than its size limit. The least recently used are dropped first,
+    and are decoded again if they're drawn again.
+    
+    States can name the images and fonts they use with their preload_images and
+    preload_fonts attributes, to have them decoded before the state is entered rather
+    than while its first frame is drawn.
+    
+    Methods
+    -------
+    set_max_bytes(max_bytes: int)
+        Sets the maximum number of bytes of decoded pixels kept in the cache.
+    
+    get_stats()
+        Returns the cache's size, and its hit, miss and eviction statistics.
+    
+    clear()
+        Empties the cache.
+    """
+    
+    __bitmaps: OrderedDict = OrderedDict()
+    __max_bytes = 1 << 20
+    __resident_bytes = 0
+    
+    __hits = 0
+    __misses = 0
+    __evictions = 0
+    
+    @staticmethod
+    def set_max_bytes(max_bytes: int) -> None:
+        """
+        Sets the maximum number of bytes of decoded pixels kept in the cache, which is
+        1 MiB by default. The least recently used assets are dropped first once the cache is full.
+        
+        Parameters
+        ----------
+        max_bytes: int
+            The maximum number of bytes, or 0 to decode assets every time they're drawn.
+        """
+        if max_bytes < 0:
+            raise ValueError("The cache size can't be negative")
+        
+        AssetCache.__max_bytes = max_bytes
+        AssetCache.__trim()
+    
+    @staticmethod
+    def get_stats() -> dict[str, int]:
+        """
+        Returns the cache's statistics.
+        
+        Returns
+        -------
+        dict[str, int]
+            hits: the number of lookups that were served from the cache.
+            misses: the number of lookups that had to decode the asset.
+            evictions: the number of assets dropped to stay within the size limit.
+            size: the number of decoded assets currently in the cache.
+            resident_bytes: the number of bytes of packed pixels currently in the cache, including scaled copies.
+            max_bytes: the maximum number of bytes of packed pixels kept in the cache.
+        """
+        return {
+            "hits": AssetCache.__hits,
+            "misses": AssetCache.__misses,
+            "evictions": AssetCache.__evictions,
+            "size": len(AssetCache.__bitmaps),
+            "resident_bytes": AssetCache.__resident_bytes,
+            "max_bytes": AssetCache.__max_bytes,
+        }
+    
+    @staticmethod
+    def clear() -> None:
+        """
+        Empties the cache, so every asset is decoded again the next time it's drawn.
+        """
+        for bitmap in AssetCache.__bitmaps.values():
+            object.__setattr__(bitmap, '_on_scaled', None)
+        AssetCache.__bitmaps.clear()
+        AssetCache.__resident_bytes = 0
+    
+    @staticmethod
+    def __trim() -> None:
+        bitmaps = AssetCache.__bitmaps
+        while AssetCache.__resident_bytes > AssetCache.__max_bytes and bitmaps:
+            _, bitmap = bitmaps.popitem(last=False)
+            AssetCache.__release(bitmap)
+            AssetCache.__evictions += 1
+    
+    @staticmethod
+    def __size(bitmap: Bitmap) -> int:
+        # The packed pixels of an asset and of every scaled copy made of it so far
+        return len(bitmap.data) + sum(len(scaled.data) for scaled in bitmap._scaled.values())
+    
+    @staticmethod
+    def __add_scaled(scaled: Bitmap) -> None:
+        # A cached asset was drawn at a new scale, and kept the copy
+        AssetCache.__resident_bytes += len(scaled.data)
+        AssetCache.__trim()
+    
+    @staticmethod
+    def __release(bitmap: Bitmap) -> None:
+        # Stops counting an asset that's left the cache, and the scaled copies it kept
+        object.__setattr__(bitmap, '_on_scaled', None)
+        AssetCache.__resident_bytes -= AssetCache.__size(bitmap)
+    
+    @staticmethod
+    def _get(key: tuple) -> Bitmap:
+        # Returns a decoded asset, or None if it has to be decoded and added with _put
+        bitmap = AssetCache.__bitmaps.get(key)
+        if bitmap is None:
+            AssetCache.__misses += 1
+            return None
+        
+        AssetCache.__hits += 1
+        AssetCache.__bitmaps.move_to_end(key)
+        return bitmap
+    
+    @staticmethod
+    def _put(key: tuple, bitmap: Bitmap) -> Bitmap:
+        if AssetCache.__max_bytes:
+            AssetCache._discard(key)
+            AssetCache.__bitmaps[key] = bitmap
+            AssetCache.__resident_bytes += AssetCache.__size(bitmap)
+            object.__setattr__(bitmap, '_on_scaled', AssetCache.__add_scaled)
+            AssetCache.__trim()
+        return bitmap
+    
+    @staticmethod
+    def _discard(key: tuple) -> None:
+        bitmap = AssetCache.__bitmaps.pop(key, None)
+        if bitmap is not None:
+            AssetCache.__release(bitmap)
+    
+    @staticmethod
+    def _discard_group(*prefix) -> None:
+        # Drops every asset whose key starts with the prefix, such as every glyph of a font
+        # that's registered again
+        for key in [key for key in AssetCache.__bitmaps if key[:len(prefix)] == prefix]:
+            AssetCache._discard(key)
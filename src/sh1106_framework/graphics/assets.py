@@ -0,0 +1,265 @@
+import json
+import mmap
+import re
+import struct
+
+from .bitmap import Bitmap
+
+# Compiled asset files start with a header, followed by an index table and the packed bitmaps:
+#
+#   header: magic (4 bytes), version (u16), reserved (u16), number of assets (u32)
+#   index:  for each asset: width (u16), height (u16), data offset (u32), name length (u16), UTF-8 name
+#   data:   for each asset: the bitmap in page layout, (height + 7) // 8 pages of `width` bytes
+#
+# All integers are little-endian, and every offset is relative to the start of the file.
+MAGIC = b'SH1B'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sHHI')
+_ENTRY = struct.Struct('<HHIH')
+
+# The parts of the JSON files the generators write that JsonAssetFile indexes them by: each
+# entry's name, its [width, height] header, and the end of its last row
+_JSON_NAME = re.compile(rb'\s*"((?:[^"\\]|\\.)*)"\s*:\s*')
+_JSON_SIZE = re.compile(rb'\[\s*\[\s*(\d+)\s*,\s*(\d+)\s*\]')
+_JSON_END = re.compile(rb'\]\s*\]\s*([,}])')
+
+
+def is_asset_file(filepath: str) -> bool:
+    """
+    Returns whether a file is a compiled binary asset file, as opposed to a JSON file.
+    
+    Parameters
+    ----------
+    filepath: str
+        The path to the file.
+    """
+    with open(filepath, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_asset_file(filepath: str, bitmaps: dict[str, Bitmap]) -> None:
+    """
+    Writes bitmaps to a compiled binary asset file.
+    
+    Parameters
+    ----------
+    filepath: str
+        The path of the file to write.
+    bitmaps: dict[str, Bitmap]
+        The bitmaps to write, by the name they'll be referred to with.
+    """
+    names = [name.encode('utf-8') for name in bitmaps]
+    offset = _HEADER.size + sum(_ENTRY.size + len(name) for name in names)
+    
+    index = bytearray()
+    data = bytearray()
+    for name, bitmap in zip(names, bitmaps.values()):
+        index += _ENTRY.pack(bitmap.width, bitmap.height, offset + len(data), len(name))
+        index += name
+        data += bitmap.data
+    
+    with open(filepath, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, len(names)))
+        f.write(index)
+        f.write(data)
+
+
+def compile_json(json_data: dict[str, list]) -> dict[str, Bitmap]:
+    """
+    Packs the contents of a JSON file made by the image or font generator into bitmaps.
+    
+    Parameters
+    ----------
+    json_data: dict[str, list]
+        The parsed JSON file, where each entry is a [width, height] header followed by rows of 0/1 pixels.
+    """
+    bitmaps = {}
+    for name, rows in json_data.items():
+        bitmaps[name] = Bitmap.from_rows(rows[1:], rows[0][0], rows[0][1])
+    return bitmaps
+
+
+class AssetFile:
+    """
+    A read-only, memory-mapped compiled asset file.
+    
+    Only the header and index table are read when the file is opened. Each bitmap is
+    copied out of the mapping the first time it's asked for, so opening a large icon pack
+    costs next to nothing until its images are drawn.
+    
+    Parameters
+    ----------
+    filepath: str
+        The path to the compiled asset file.
+    """
+    
+    def __init__(self, filepath: str) -> None:
+        self.filepath = filepath
+        
+        with open(filepath, 'rb') as f:
+            self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        if len(self.__map) < _HEADER.size:
+            raise ValueError("{} is not a compiled asset file".format(filepath))
+        
+        magic, version, _, count = _HEADER.unpack_from(self.__map, 0)
+        if magic != MAGIC:
+            raise ValueError("{} is not a compiled asset file".format(filepath))
+        if version != VERSION:
+            raise ValueError("{} uses unsupported asset file version {}".format(filepath, version))
+        
+        self.__index = {}
+        position = _HEADER.size
+        for _ in range(count):
+            width, height, offset, name_length = _ENTRY.unpack_from(self.__map, position)
+            position += _ENTRY.size
+            name = self.__map[position:position + name_length].decode('utf-8')
+            position += name_length
+            self.__index[name] = (width, height, offset)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.__index
+    
+    def __len__(self) -> int:
+        return len(self.__index)
+    
+    def names(self) -> list[str]:
+        """
+        Returns the names of every asset in the file.
+        """
+        return list(self.__index)
+    
+    def size(self, name: str) -> tuple[int, int]:
+        """
+        Returns the width and height of an asset, without reading it.
+        
+        Parameters
+        ----------
+        name: str
+            The name of the asset.
+        """
+        return self.__index[name][:2]
+    
+    def get(self, name: str) -> Bitmap:
+        """
+        Reads an asset from the file.
+        
+        Parameters
+        ----------
+        name: str
+            The name of the asset.
+        """
+        width, height, offset = self.__index[name]
+        return Bitmap(width, height, self.__map[offset:offset + ((height + 7) // 8) * width])
+    
+    def close(self) -> None:
+        """
+        Unmaps the file.
+        """
+        self.__map.close()
+
+
+class JsonAssetFile:
+    """
+    A read-only, memory-mapped JSON file made by the image or font generator, with the
+    same interface as AssetFile.
+    
+    Opening the file only finds where each bitmap is in it and reads its size, without
+    parsing any pixels. Each bitmap is parsed and packed the first time it's asked for.
+    Files that aren't laid out the way the generators write them are parsed in full instead.
+    
+    Parameters
+    ----------
+    filepath: str
+        The path to the JSON file.
+    """
+    
+    def __init__(self, filepath: str) -> None:
+        self.filepath = filepath
+        self.__map = None
+        self.__rows = None
+        
+        with open(filepath, 'rb') as f:
+            if f.seek(0, 2):
+                self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        self.__index = self.__scan()
+        if self.__index is None:
+            with open(filepath) as f:
+                self.__rows = json.load(f)
+            self.__index = {name: (rows[0][0], rows[0][1], 0, 0) for name, rows in self.__rows.items()}
+            self.close()
+    
+    def __scan(self) -> dict[str, tuple[int, int, int, int]]:
+        # Indexes each entry's size and the span of bytes it's in, or returns None if the
+        # file isn't laid out as expected
+        data = self.__map
+        if data is None:
+            return None
+        
+        position = data.find(b'{')
+        if position < 0 or data[:position].strip():
+            return None
+        position += 1
+        
+        index = {}
+        while True:
+            name = _JSON_NAME.match(data, position)
+            if name is None:
+                return index if data[position:].strip() == b'}' and not index else None
+            size = _JSON_SIZE.match(data, name.end())
+            end = _JSON_END.search(data, name.end())
+            if size is None or end is None:
+                return None
+            
+            index[json.loads(b'"' + name.group(1) + b'"')] = (int(size.group(1)), int(size.group(2)), name.end(), end.start(1))
+            position = end.end()
+            if end.group(1) == b'}':
+                return index if not data[position:].strip() else None
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.__index
+    
+    def __len__(self) -> int:
+        return len(self.__index)
+    
+    def names(self) -> list[str]:
+        """
+        Returns the names of every bitmap in the file.
+        """
+        return list(self.__index)
+    
+    def size(self, name: str) -> tuple[int, int]:
+        """
+        Returns the width and height of a bitmap, without parsing it.
+        
+        Parameters
+        ----------
+        name: str
+            The name of the bitmap.
+        """
+        return self.__index[name][:2]
+    
+    def get(self, name: str) -> Bitmap:
+        """
+        Parses a bitmap from the file, and packs it.
+        
+        Parameters
+        ----------
+        name: str
+            The name of the bitmap.
+        """
+        width, height, start, end = self.__index[name]
+        if self.__rows is not None:
+            rows = self.__rows[name]
+        else:
+            rows = json.loads(self.__map[start:end])
+        return Bitmap.from_rows(rows[1:], width, height)
+    
+    def close(self) -> None:
+        """
+        Unmaps the file.
+        """
+        if self.__map is not None:
+            self.__map.close()
@@ -0,0 +1,115 @@
+class Bitmap:
+    """
+    An immutable, packed 1-bit-per-pixel bitmap, stored in the same page layout as the
+    framebuffer so that it can be blitted onto it a whole page span at a time. Images,
+    font glyphs and rendered text are all kept as bitmaps.
+    
+    Scaled copies of a bitmap are made the first time each scale is asked for, and kept
+    for as long as the bitmap is.
+    
+    Parameters
+    ----------
+    width: int
+        The width of the bitmap in pixels.
+    
+    height: int
+        The height of the bitmap in pixels.
+    
+    data: bytes
+        The packed pixels. Each byte holds 8 rows of one column, with the least significant
+        bit at the top, and pages of 8 rows follow each other. Bits below the last row must be 0.
+    """
+    
+    __slots__ = ('width', 'height', 'pages', 'data', '_scaled', '_on_scaled')
+    
+    def __init__(self, width: int, height: int, data: bytes) -> None:
+        object.__setattr__(self, 'width', width)
+        object.__setattr__(self, 'height', height)
+        object.__setattr__(self, 'pages', (height + 7) // 8)
+        object.__setattr__(self, 'data', bytes(data))
+        object.__setattr__(self, '_scaled', {})
+        # Called with each scaled copy as it's made, so the AssetCache can count it
+        object.__setattr__(self, '_on_scaled', None)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("Bitmap objects are immutable")
+    
+    def __repr__(self) -> str:
+        return "Bitmap({}x{})".format(self.width, self.height)
+    
+    @staticmethod
+    def from_rows(rows: list[list[int]], width: int = None, height: int = None) -> "Bitmap":
+        """
+        Packs a list of rows of 0/1 pixels, as found in the generated JSON files, into a bitmap.
+        
+        Parameters
+        ----------
+        rows: list[list[int]]
+            The rows of pixels, from top to bottom.
+        width: int
+            The width of the bitmap. Defaults to the length of the first row.
+        height: int
+            The height of the bitmap. Defaults to the number of rows.
+        """
+        if height is None:
+            height = len(rows)
+        if width is None:
+            width = len(rows[0]) if rows else 0
+        
+        data = bytearray(((height + 7) // 8) * width)
+        for y in range(min(height, len(rows))):
+            row = rows[y]
+            offset = (y >> 3) * width
+            bit = 1 << (y & 7)
+            for x in range(min(width, len(row))):
+                if row[x] == 1:
+                    data[offset + x] |= bit
+        
+        return Bitmap(width, height, data)
+    
+    def get_pixel(self, x: int, y: int) -> int:
+        """
+        Returns the color of a pixel, either 0 or 1. Pixels outside the bitmap are 0.
+        
+        Parameters
+        ----------
+        x: int
+            The x coordinate of the pixel.
+        y: int
+            The y coordinate of the pixel.
+        """
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            return 0
+        return (self.data[(y >> 3) * self.width + x] >> (y & 7)) & 1
+    
+    def to_rows(self) -> list[list[int]]:
+        """
+        Unpacks the bitmap into a list of rows of 0/1 pixels.
+        """
+        return [[self.get_pixel(x, y) for x in range(self.width)] for y in range(self.height)]
+    
+    def scaled(self, scale: int) -> "Bitmap":
+        """
+        Returns a copy of the bitmap with every pixel turned into a scale by scale square.
+        The copy is made once per scale, and reused after that.
+        
+        Parameters
+        ----------
+        scale: int
+            The scale of the new bitmap.
+        """
+        if scale == 1:
+            return self
+        
+        scaled = self._scaled.get(scale)
+        if scaled is None:
+            rows = []
+            for row in self.to_rows():
+                scaled_row = [pixel for pixel in row for _ in range(scale)]
+                rows.extend(scaled_row for _ in range(scale))
+            
+            scaled = Bitmap.from_rows(rows, self.width * scale, self.height * scale)
+            self._scaled[scale] = scaled
+            if self._on_scaled is not None:
+                self._on_scaled(scaled)
+        return scaled
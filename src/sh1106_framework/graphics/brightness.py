@@ -0,0 +1,226 @@
+import time
+
+_AWAKE = "awake"
+_DIMMED = "dimmed"
+_ASLEEP = "asleep"
+
+
+def _parse_time_of_day(value: str) -> int:
+    # "HH:MM" to minutes since midnight
+    try:
+        hours, minutes = (int(part) for part in value.split(":"))
+    except ValueError:
+        raise ValueError("Unknown time of day \"{}\"".format(value)) from None
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError("Unknown time of day \"{}\"".format(value))
+    return hours * 60 + minutes
+
+
+def _check_contrast(contrast: int) -> int:
+    if not 0 <= contrast <= 255:
+        raise ValueError("The contrast must be between 0 and 255")
+    return int(contrast)
+
+
+class Brightness:
+    """
+    Works out the contrast a display should be at, and whether it should be on, as it
+    fades between levels, follows a schedule through the day, and dims and sleeps after
+    a while without input.
+    
+    It doesn't talk to the display itself. Drawing asks it for the contrast and power
+    state once a frame, and only sends them when they change.
+    
+    Parameters
+    ----------
+    contrast: int
+        The contrast the display starts at, between 0 and 255.
+    """
+    
+    def __init__(self, contrast: int = 255) -> None:
+        now = time.monotonic()
+        
+        # The contrast set with set_contrast or the schedule, which the display is at while awake
+        self.__level = contrast
+        
+        # The fade in progress, from one contrast to another
+        self.__fade_from = contrast
+        self.__fade_to = contrast
+        self.__fade_start = now
+        self.__fade_duration = 0.0
+        
+        self.__mode = _AWAKE
+        self.__last_activity = now
+        self.__dim_after = None
+        self.__dim_contrast = 32
+        self.__sleep_after = None
+        self.__idle_fade = 1.0
+        
+        # Minutes since midnight of each scheduled change, sorted, and the one applied last
+        self.__schedule: list[tuple[int, int]] = []
+        self.__schedule_fade = 0.0
+        self.__scheduled_level = None
+    
+    def set_contrast(self, contrast: int, duration: float = 0.0, now: float = None) -> None:
+        """
+        Sets the contrast the display is at while it's awake, fading to it over a duration.
+        
+        Parameters
+        ----------
+        contrast: int
+            The contrast, between 0 and 255.
+        duration: float
+            How long the fade takes, in seconds, or 0 to change straight away.
+        now: float
+            The time, from time.monotonic. Defaults to the current time.
+        """
+        self.__level = _check_contrast(contrast)
+        if self.__mode == _AWAKE:
+            self.__fade(self.__level, duration, now)
+        elif self.__mode == _DIMMED:
+            self.__fade(min(self.__dim_contrast, self.__level), duration, now)
+    
+    def set_auto_dim(self, dim_after: float = None, dim_contrast: int = 32, sleep_after: float = None, fade: float = 1.0) -> None:
+        """
+        Sets how long the display waits without input before it dims, and before it
+        turns off. Either can be None to never do it.
+        
+        Parameters
+        ----------
+        dim_after: float
+            The seconds without input before the display dims.
+        dim_contrast: int
+            The contrast it dims to, between 0 and 255.
+        sleep_after: float
+            The seconds without input before the display fades out and turns off.
+        fade: float
+            How long dimming, sleeping and waking up again fade for, in seconds.
+        """
+        if (dim_after is not None and dim_after < 0) or (sleep_after is not None and sleep_after < 0) or fade < 0:
+            raise ValueError("Auto-dim times can't be negative")
+        
+        self.__dim_after = dim_after
+        self.__dim_contrast = _check_contrast(dim_contrast)
+        self.__sleep_after = sleep_after
+        self.__idle_fade = fade
+    
+    def set_schedule(self, schedule: dict[str, int] = None, fade: float = 60.0) -> None:
+        """
+        Sets the contrast to change at times of day, such as to dim the display at night.
+        Each change lasts until the next one, wrapping around at midnight.
+        
+        Parameters
+        ----------
+        schedule: dict[str, int]
+            The contrast to change to at each time of day, as "HH:MM" in local time, or
+            None to stop following a schedule.
+        fade: float
+            How long each change fades for, in seconds.
+        """
+        if fade < 0:
+            raise ValueError("A fade's duration can't be negative")
+        
+        entries = [(_parse_time_of_day(at), _check_contrast(contrast)) for at, contrast in (schedule or {}).items()]
+        self.__schedule = sorted(entries)
+        self.__schedule_fade = fade
+        self.__scheduled_level = None
+    
+    def wake(self, now: float = None) -> None:
+        """
+        Counts as input, so the display fades back up to its contrast if it dimmed or
+        turned off, and the wait before it dims starts again.
+        
+        Parameters
+        ----------
+        now: float
+            The time, from time.monotonic. Defaults to the current time.
+        """
+        now = time.monotonic() if now is None else now
+        self.__last_activity = now
+        if self.__mode != _AWAKE:
+            self.__mode = _AWAKE
+            self.__fade(self.__level, self.__idle_fade, now)
+    
+    def sleep(self, now: float = None) -> None:
+        """
+        Fades the display out and turns it off until wake is called, without waiting for
+        it to go without input.
+        
+        Parameters
+        ----------
+        now: float
+            The time, from time.monotonic. Defaults to the current time.
+        """
+        if self.__mode != _ASLEEP:
+            self.__mode = _ASLEEP
+            self.__fade(0, self.__idle_fade, now)
+    
+    def is_asleep(self) -> bool:
+        """
+        Returns whether the display has been put to sleep, or has gone to sleep without
+        input, and hasn't woken up since.
+        """
+        return self.__mode == _ASLEEP
+    
+    def is_on(self, now: float = None) -> bool:
+        """
+        Returns whether the display should be on. It turns off once it has faded out
+        after going to sleep.
+        
+        Parameters
+        ----------
+        now: float
+            The time, from time.monotonic. Defaults to the current time.
+        """
+        now = time.monotonic() if now is None else now
+        return self.__mode != _ASLEEP or now - self.__fade_start < self.__fade_duration
+    
+    def get_contrast(self, now: float = None) -> int:
+        """
+        Returns the contrast the display should be at, part way through any fade.
+        
+        Parameters
+        ----------
+        now: float
+            The time, from time.monotonic. Defaults to the current time.
+        """
+        now = time.monotonic() if now is None else now
+        elapsed = now - self.__fade_start
+        if self.__fade_duration <= 0 or elapsed >= self.__fade_duration:
+            return self.__fade_to
+        return round(self.__fade_from + (self.__fade_to - self.__fade_from) * elapsed / self.__fade_duration)
+    
+    def _update(self, now: float = None) -> None:
+        # Moves between awake, dimmed and asleep as the display goes without input, and
+        # applies the schedule. Called once a frame
+        now = time.monotonic() if now is None else now
+        
+        if self.__schedule:
+            local = time.localtime()
+            minutes = local.tm_hour * 60 + local.tm_min
+            # The latest change at or before now, or the last one of the day before
+            level = self.__schedule[-1][1]
+            for at, contrast in self.__schedule:
+                if at > minutes:
+                    break
+                level = contrast
+            if level != self.__scheduled_level:
+                # The first time, the display goes straight to the level it should be at
+                fade = self.__schedule_fade if self.__scheduled_level is not None else 0.0
+                self.__scheduled_level = level
+                self.set_contrast(level, fade, now)
+        
+        idle = now - self.__last_activity
+        if self.__sleep_after is not None and idle >= self.__sleep_after:
+            self.sleep(now)
+        elif self.__mode == _AWAKE and self.__dim_after is not None and idle >= self.__dim_after:
+            self.__mode = _DIMMED
+            self.__fade(min(self.__dim_contrast, self.__level), self.__idle_fade, now)
+    
+    def __fade(self, contrast: int, duration: float, now: float = None) -> None:
+        # Starts a fade from wherever the contrast is now
+        now = time.monotonic() if now is None else now
+        self.__fade_from = self.get_contrast(now)
+        self.__fade_to = contrast
+        self.__fade_start = now
+        self.__fade_duration = max(duration, 0.0)
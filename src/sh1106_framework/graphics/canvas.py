@@ -0,0 +1,602 @@
+from .fonts import Fonts
+from .images import Images
+from .bitmap import Bitmap
+from .framebuffer import FrameBuffer, INVERT, COMPOSITE_MODES
+from .numpy_framebuffer import NumpyFrameBuffer
+from .text_cache import TextCache
+from .text_layout import TextLayout, Layout
+from . import shapes
+from ..framework.panels import panelmethod
+
+class Canvas:
+    """
+    An off-screen image with the same drawing methods as Drawing. Something that's costly
+    to draw but rarely changes, such as a gauge's dial or a panel of labels, can be drawn
+    onto a canvas once and then composited onto the screen, or onto another canvas, every
+    frame with draw_canvas, which combines whole packed pages at a time rather than pixels.
+    
+    Wherever a color is taken, it can be 0 for an unlit pixel, 1 for a lit pixel, or
+    Canvas.INVERT to invert whatever is already on the canvas.
+    
+    Parameters
+    ----------
+    width: int
+        The width of the canvas in pixels.
+    
+    height: int
+        The height of the canvas in pixels.
+    
+    backend: str
+        The framebuffer implementation, "python" or "numpy".
+    """
+    
+    INVERT = INVERT
+    
+    # Canvases are only ever drawn to through an instance. Drawing replaces this
+    _current: "Canvas" = None
+    
+    _framebuffer: FrameBuffer = None
+    _width = 0
+    _height = 0
+    
+    def __init__(self, width: int, height: int, backend: str = "python") -> None:
+        if width <= 0 or height <= 0:
+            raise ValueError("A canvas must be at least 1 pixel wide and high, not {}x{}".format(width, height))
+        
+        self._width = int(width)
+        self._height = int(height)
+        self._framebuffer = Canvas._create_framebuffer(self._width, self._height, backend)
+    
+    @staticmethod
+    def _create_framebuffer(width: int, height: int, backend: str) -> FrameBuffer:
+        if backend not in ("python", "numpy"):
+            raise ValueError("Unknown drawing backend \"{}\"".format(backend))
+        
+        if backend == "numpy":
+            if NumpyFrameBuffer.is_available():
+                return NumpyFrameBuffer(width, height)
+            print("NumPy isn't installed, so the Python drawing backend will be used instead")
+        
+        return FrameBuffer(width, height)
+    
+    @panelmethod
+    def get_width(self) -> int:
+        """
+        Returns the width of the canvas in pixels.
+        """
+        return self._width
+    
+    @panelmethod
+    def get_height(self) -> int:
+        """
+        Returns the height of the canvas in pixels.
+        """
+        return self._height
+    
+    @panelmethod
+    def clear(self) -> None:
+        """
+        Clears the canvas, turning off every pixel.
+        """
+        self._framebuffer.clear()
+    
+    @panelmethod
+    def set_pixel(self, x: int, y: int, color: int) -> None:
+        """
+        Sets a pixel on the canvas.
+        
+        Parameters
+        ----------
+        x: int
+            The x coordinate of the pixel to set.
+        y: int
+            The y coordinate of the pixel to set.
+        color: int
+            The color of the pixel to set, either 0 or 1, or Canvas.INVERT.
+        """
+        self._framebuffer.set_pixel(x, y, color)
+    
+    @panelmethod
+    def get_pixel(self, x: int, y: int) -> int:
+        """
+        Returns the color of a pixel, either 0 or 1. Pixels outside the canvas are 0.
+        
+        Parameters
+        ----------
+        x: int
+            The x coordinate of the pixel.
+        y: int
+            The y coordinate of the pixel.
+        """
+        return self._framebuffer.get_pixel(int(x), int(y))
+    
+    @panelmethod
+    def get_text_width(self, text: str, font: str = "default", scale: int = 1) -> int:
+        """
+        Returns the width of a string of text in pixels.
+        
+        Parameters
+        ----------
+        text: str
+            The string of text to get the width of.
+        font: str
+            The name of the font to use.
+        scale: int
+            The scale of the text.
+        """
+        return TextCache._get_width(font, text, scale)
+    
+    @panelmethod
+    def get_text_height(self, font: str = "default", scale: int = 1) -> int:
+        """
+        Returns the height of a line of text in pixels, which is the height of the font's tallest character.
+        
+        Parameters
+        ----------
+        font: str
+            The name of the font to use.
+        scale: int
+            The scale of the text.
+        """
+        return Fonts._get_height(font) * scale
+    
+    @panelmethod
+    def draw_text(self, text: str, x: int, y: int, color: int = 1, font: str = "default", scale: int = 1, centered: bool = False) -> None:
+        """
+        Draws a string of text.
+        
+        Parameters
+        ----------
+        text: str
+            The string of text to draw.
+        x: int
+            The x coordinate of the text.
+        y: int
+            The y coordinate of the text.
+        color: int
+            The color of the text, either 0 or 1, or Canvas.INVERT.
+        font: str
+            The name of the font to use.
+        scale: int
+            The scale of the text.
+        centered: bool
+            Whether or not the text should be centered.
+        """
+        
+        # The whole string is rendered once into a cached bitmap, then drawn with a single blit
+        text_bitmap = TextCache._get_text(font, text, scale)
+        
+        if centered:
+            start_x = int(x) - text_bitmap.width // 2
+        else:
+            start_x = int(x)
+        
+        self._framebuffer.blit(text_bitmap, start_x, int(y), color)
+    
+    @panelmethod
+    def layout_text(self, text: str, width: int = None, height: int = None, font: str = "default", scale: int = 1, align: str = "left", wrap: bool = True, ellipsis: str = "...", line_spacing: int = 1) -> Layout:
+        """
+        Lays out a block of text in a box, without drawing it, and returns where its lines
+        and characters go. Layouts are cached, so laying out the same text again is cheap.
+        
+        Parameters
+        ----------
+        text: str
+            The text to lay out. Newlines always start a new line.
+        width: int
+            The width of the box. Defaults to the width of the longest line.
+        height: int
+            The height of the box. Lines past the bottom are dropped. Defaults to no limit.
+        font: str
+            The name of the font to use.
+        scale: int
+            The scale of the text.
+        align: str
+            How to align each line in the box, either "left", "center" or "right".
+        wrap: bool
+            Whether to break lines at spaces to fit the width. Lines that aren't wrapped
+            are cut off at the width instead.
+        ellipsis: str
+            The text to end a line that was cut off with, or an empty string for none.
+        line_spacing: int
+            The number of pixels between lines.
+        """
+        return TextLayout._layout(text, width, height, font, scale, align, wrap, ellipsis, line_spacing)
+    
+    @panelmethod
+    def draw_text_box(self, text: str, x: int, y: int, width: int = None, height: int = None, color: int = 1, font: str = "default", scale: int = 1, align: str = "left", wrap: bool = True, ellipsis: str = "...", line_spacing: int = 1) -> Layout:
+        """
+        Draws a block of text in a box, wrapped, cut off and aligned as with layout_text.
+        Each line is drawn with a single blit.
+        
+        Parameters
+        ----------
+        text: str
+            The text to draw. Newlines always start a new line.
+        x: int
+            The x coordinate of the box.
+        y: int
+            The y coordinate of the box.
+        width: int
+            The width of the box. Defaults to the width of the longest line.
+        height: int
+            The height of the box. Lines past the bottom are dropped. Defaults to no limit.
+        color: int
+            The color of the text, either 0 or 1, or Canvas.INVERT.
+        font: str
+            The name of the font to use.
+        scale: int
+            The scale of the text.
+        align: str
+            How to align each line in the box, either "left", "center" or "right".
+        wrap: bool
+            Whether to break lines at spaces to fit the width. Lines that aren't wrapped
+            are cut off at the width instead.
+        ellipsis: str
+            The text to end a line that was cut off with, or an empty string for none.
+        line_spacing: int
+            The number of pixels between lines.
+        
+        Returns
+        -------
+        Layout
+            The layout the text was drawn with.
+        """
+        layout = TextLayout._layout(text, width, height, font, scale, align, wrap, ellipsis, line_spacing)
+        x = int(x)
+        y = int(y)
+        for line in layout.lines:
+            if line.text:
+                self._framebuffer.blit(TextCache._get_text(font, line.text, scale), x + line.x, y + line.y, color)
+        return layout
+    
+    @panelmethod
+    def draw_rect(self, x: int, y: int, width: int, height: int, color: int = 1) -> None:
+        """
+        Draws a rectangle.
+        
+        Parameters
+        ----------
+        x: int
+            The x coordinate of the rectangle.
+        y: int
+            The y coordinate of the rectangle.
+        width: int
+            The width of the rectangle.
+        height: int
+            The height of the rectangle.
+        color: int
+            The color of the rectangle, either 0 or 1, or Canvas.INVERT.
+        """
+        
+        self._framebuffer.fill_rect(int(x), int(y), int(width), int(height), color)
+    
+    @panelmethod
+    def draw_outlined_rect(self, x: int, y: int, width: int, height: int, color: int = 1) -> None:
+        """
+        Draws an outlined rectangle.
+        
+        Parameters
+        ----------
+        x: int
+            The x coordinate of the rectangle.
+        y: int
+            The y coordinate of the rectangle.
+        width: int
+            The width of the rectangle.
+        height: int
+            The height of the rectangle.
+        color: int
+            The color of the rectangle, either 0 or 1, or Canvas.INVERT.
+        """
+        
+        framebuffer = self._framebuffer
+        framebuffer.fill_rect(x, y, width, 1, color) # Top border
+        framebuffer.fill_rect(x, y+height-1, width, 1, color) # Bottom border
+        framebuffer.fill_rect(x, y+1, 1, height-2, color) # Left border
+        framebuffer.fill_rect(x+width-1, y+1, 1, height-2, color) # Right border
+    
+    @panelmethod
+    def draw_line(self, x0: int, y0: int, x1: int, y1: int, color: int = 1, thickness: int = 1) -> None:
+        """
+        Draws a line.
+        
+        Parameters
+        ----------
+        x0: int
+            The x coordinate of the starting point of the line.
+        y0: int
+            The y coordinate of the starting point of the line.
+        x1: int
+            The x coordinate of the ending point of the line.
+        y1: int
+            The y coordinate of the ending point of the line.
+        color: int
+            The color of the line, either 0 or 1, or Canvas.INVERT.
+        thickness: int
+            The width of the line in pixels. Thick lines are centered on the points, with square ends.
+        """
+        
+        x0, y0, x1, y1 = int(x0), int(y0), int(x1), int(y1)
+        
+        # Horizontal and vertical lines are filled as rectangles
+        if thickness == 1 and y0 == y1:
+            self._framebuffer.fill_rect(min(x0, x1), y0, abs(x1 - x0) + 1, 1, color)
+            return
+        if thickness == 1 and x0 == x1:
+            self._framebuffer.fill_rect(x0, min(y0, y1), 1, abs(y1 - y0) + 1, color)
+            return
+        
+        framebuffer = self._framebuffer
+        framebuffer._fill_spans(shapes.thick_line_spans(x0, y0, x1, y1, int(thickness), framebuffer.clip), color)
+    
+    @panelmethod
+    def draw_circle(self, x: int, y: int, radius: int, color: int = 1, filled: bool = False) -> None:
+        """
+        Draws a circle.
+        
+        Parameters
+        ----------
+        x: int
+            The x coordinate of the center of the circle.
+        y: int
+            The y coordinate of the center of the circle.
+        radius: int
+            The radius of the circle.
+        color: int
+            The color of the circle, either 0 or 1, or Canvas.INVERT.
+        filled: bool
+            Whether to fill the circle, or only draw its outline.
+        """
+        framebuffer = self._framebuffer
+        framebuffer._fill_spans(shapes.ellipse_spans(int(x), int(y), int(radius), int(radius), filled, framebuffer.clip), color)
+    
+    @panelmethod
+    def draw_ellipse(self, x: int, y: int, radius_x: int, radius_y: int, color: int = 1, filled: bool = False) -> None:
+        """
+        Draws an ellipse.
+        
+        Parameters
+        ----------
+        x: int
+            The x coordinate of the center of the ellipse.
+        y: int
+            The y coordinate of the center of the ellipse.
+        radius_x: int
+            The horizontal radius of the ellipse.
+        radius_y: int
+            The vertical radius of the ellipse.
+        color: int
+            The color of the ellipse, either 0 or 1, or Canvas.INVERT.
+        filled: bool
+            Whether to fill the ellipse, or only draw its outline.
+        """
+        framebuffer = self._framebuffer
+        framebuffer._fill_spans(shapes.ellipse_spans(int(x), int(y), int(radius_x), int(radius_y), filled, framebuffer.clip), color)
+    
+    @panelmethod
+    def draw_arc(self, x: int, y: int, radius: int, start_angle: float, end_angle: float, color: int = 1, thickness: int = 1) -> None:
+        """
+        Draws an arc of a circle, such as for a gauge.
+        
+        Parameters
+        ----------
+        x: int
+            The x coordinate of the center of the circle.
+        y: int
+            The y coordinate of the center of the circle.
+        radius: int
+            The radius of the circle.
+        start_angle: float
+            The angle the arc starts at, in degrees clockwise from the right of the center.
+        end_angle: float
+            The angle the arc ends at, in degrees clockwise from the right of the center.
+            The arc covers the whole circle when it's 360 or more past the start angle.
+        color: int
+            The color of the arc, either 0 or 1, or Canvas.INVERT.
+        thickness: int
+            The width of the arc in pixels, measured inwards from the radius.
+        """
+        framebuffer = self._framebuffer
+        framebuffer._fill_spans(shapes.arc_spans(int(x), int(y), int(radius), start_angle, end_angle, int(thickness), framebuffer.clip), color)
+    
+    @panelmethod
+    def draw_rounded_rect(self, x: int, y: int, width: int, height: int, radius: int, color: int = 1, filled: bool = False) -> None:
+        """
+        Draws a rectangle with rounded corners.
+        
+        Parameters
+        ----------
+        x: int
+            The x coordinate of the rectangle.
+        y: int
+            The y coordinate of the rectangle.
+        width: int
+            The width of the rectangle.
+        height: int
+            The height of the rectangle.
+        radius: int
+            The radius of the corners, which is limited to fit the rectangle.
+        color: int
+            The color of the rectangle, either 0 or 1, or Canvas.INVERT.
+        filled: bool
+            Whether to fill the rectangle, or only draw its outline.
+        """
+        framebuffer = self._framebuffer
+        framebuffer._fill_spans(shapes.rounded_rect_spans(int(x), int(y), int(width), int(height), int(radius), filled, framebuffer.clip), color)
+    
+    @panelmethod
+    def draw_polygon(self, points: list[tuple[int, int]], color: int = 1, filled: bool = False) -> None:
+        """
+        Draws a closed polygon.
+        
+        Parameters
+        ----------
+        points: list[tuple[int, int]]
+            The (x, y) coordinates of the corners, in order. The last corner is joined back to the first.
+        color: int
+            The color of the polygon, either 0 or 1, or Canvas.INVERT.
+        filled: bool
+            Whether to fill the polygon, using the even-odd rule for edges that cross, or
+            only draw its outline.
+        """
+        framebuffer = self._framebuffer
+        framebuffer._fill_spans(shapes.polygon_spans(list(points), filled, framebuffer.clip), color)
+    
+    @panelmethod
+    def draw_image(self, image: str, x: int, y: int, color: int = 1, scale: int = 1, centered_horizontal: bool = False, centered_vertical: bool = False) -> None:
+        """
+        Draws an image.
+        
+        Parameters
+        ----------
+        image: str
+            The name of the image to draw.
+        x: int
+            The x coordinate of the image.
+        y: int
+            The y coordinate of the image.
+        color: int
+            The color of the image, either 0 or 1, or Canvas.INVERT.
+        scale: int
+            The scale of the image.
+        centered_horizontal: bool
+            Whether or not the image should be centered horizontally.
+        centered_vertical: bool
+            Whether or not the image should be centered vertically.
+        """
+        
+        bitmap = Images._get_image(image)
+        
+        if centered_horizontal:
+            offset_x = int((-bitmap.width*scale) / 2)
+        else:
+            offset_x = 0
+        
+        if centered_vertical:
+            offset_y = int((-bitmap.height*scale) / 2)
+        else:
+            offset_y = 0
+        
+        self._framebuffer.blit(bitmap, int(x + offset_x), int(y + offset_y), color, scale)
+    
+    @panelmethod
+    def get_sprite(self, image: str) -> Bitmap:
+        """
+        Returns a registered image as a sprite, for drawing with blit.
+        
+        Parameters
+        ----------
+        image: str
+            The name of the image.
+        """
+        return Images._get_image(image)
+    
+    @panelmethod
+    def blit(self, sprite: Bitmap, x: int, y: int, color: int = 1, scale: int = 1) -> None:
+        """
+        Draws a sprite, with its top-left corner at the given coordinates.
+        
+        This is the fastest way to draw an image. The sprite is clipped to the canvas once,
+        and copied onto it a whole span of columns at a time.
+        
+        Parameters
+        ----------
+        sprite: Bitmap
+            The sprite to draw, such as one from get_sprite.
+        x: int
+            The x coordinate of the sprite.
+        y: int
+            The y coordinate of the sprite.
+        color: int
+            The color of the sprite, either 0 or 1, or Canvas.INVERT.
+        scale: int
+            The scale of the sprite.
+        """
+        self._framebuffer.blit(sprite, x, y, color, scale)
+    
+    @panelmethod
+    def set_clip(self, x: int, y: int, width: int, height: int) -> None:
+        """
+        Limits all drawing to a rectangle of the canvas, until reset_clip is called.
+        Pixels outside of the rectangle are left as they are.
+        
+        Parameters
+        ----------
+        x: int
+            The x coordinate of the rectangle.
+        y: int
+            The y coordinate of the rectangle.
+        width: int
+            The width of the rectangle.
+        height: int
+            The height of the rectangle.
+        """
+        self._framebuffer.set_clip(int(x), int(y), int(width), int(height))
+    
+    @panelmethod
+    def reset_clip(self) -> None:
+        """
+        Allows drawing anywhere on the canvas again, after set_clip.
+        """
+        self._framebuffer.reset_clip()
+    
+    @panelmethod
+    def to_bitmap(self) -> Bitmap:
+        """
+        Returns a copy of the canvas as a bitmap, which can be drawn with blit like a sprite.
+        """
+        return self._framebuffer.to_bitmap()
+    
+    @panelmethod
+    def draw_canvas(self, canvas: "Canvas | Bitmap", x: int, y: int, mode: str = "or", source_x: int = 0, source_y: int = 0, width: int = None, height: int = None) -> None:
+        """
+        Composites another canvas onto this one, with the given part of it at the given
+        coordinates. Each page of the canvas is combined a whole span of columns at a time,
+        so it costs about the same as blitting a sprite of its size.
+        
+        Parameters
+        ----------
+        canvas: Canvas | Bitmap
+            The canvas to draw, or a bitmap, such as a snapshot of a canvas from to_bitmap.
+        x: int
+            The x coordinate to draw it at.
+        y: int
+            The y coordinate to draw it at.
+        mode: str
+            How its pixels are combined with the ones under them: "or" lights its lit
+            pixels, "and" turns off the pixels under its unlit ones, "xor" inverts the
+            pixels under its lit ones, and "copy" replaces the pixels under it with its own.
+        source_x: int
+            The x coordinate of the part of the canvas to draw.
+        source_y: int
+            The y coordinate of the part of the canvas to draw.
+        width: int
+            The width of the part of the canvas to draw. Defaults to the rest of its width.
+        height: int
+            The height of the part of the canvas to draw. Defaults to the rest of its height.
+        """
+        if mode not in COMPOSITE_MODES:
+            raise ValueError("Unknown composite mode \"{}\"".format(mode))
+        
+        source = canvas._framebuffer if isinstance(canvas, Canvas) else canvas
+        x, y, source_x, source_y = int(x), int(y), int(source_x), int(source_y)
+        if width is None:
+            width = source.width - source_x
+        if height is None:
+            height = source.height - source_y
+        
+        # The part of the canvas is kept to by clipping to where it lands, along with the current clip
+        framebuffer = self._framebuffer
+        clip = framebuffer.clip
+        left, top, right, bottom = clip
+        x0 = max(left, x, x - source_x)
+        y0 = max(top, y, y - source_y)
+        x1 = max(x0, min(right, x + int(width), x - source_x + source.width))
+        y1 = max(y0, min(bottom, y + int(height), y - source_y + source.height))
+        
+        framebuffer.clip = (x0, y0, x1, y1)
+        try:
+            framebuffer.composite(source, x - source_x, y - source_y, mode)
+        finally:
+            framebuffer.clip = clip
@@ -0,0 +1,307 @@
+from abc import ABC, abstractmethod
+from collections import deque
+import hashlib
+import time
+
+# The SH1106 has 132 columns of display RAM, and 128 pixel wide panels are wired to the middle 128
+_COLUMN_OFFSET = 2
+
+# luma.core's I2C interface splits data writes into blocks of this many bytes
+_I2C_BLOCK_SIZE = 32
+
+
+class Device(ABC):
+    """
+    The base class for display backends. A backend receives the framebuffer's pages, or
+    parts of them, and puts them on a screen.
+    
+    Attributes
+    ----------
+    width: int
+        The width of the display in pixels.
+    
+    height: int
+        The height of the display in pixels.
+    
+    bus: object
+        Identifies the bus the display is connected to, or None if it's not shared. Pipelined
+        displays on the same bus share a transmitter thread, so their transfers take turns,
+        while displays on different buses are sent to in parallel.
+    """
+    
+    width = 128
+    height = 64
+    bus = None
+    
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Turns off every pixel of the display.
+        """
+        pass
+    
+    @abstractmethod
+    def write_page(self, page: int, column: int, data: bytes) -> None:
+        """
+        Writes a run of columns of one page to the display.
+        
+        Parameters
+        ----------
+        page: int
+            The index of the page, from 0 at the top of the screen.
+        column: int
+            The first column to write to, from 0 at the left of the screen.
+        data: bytes
+            One byte per column, with the least significant bit at the top of the page.
+        """
+        pass
+    
+    @abstractmethod
+    def contrast(self, level: int) -> None:
+        """
+        Sets the contrast of the display.
+        
+        Parameters
+        ----------
+        level: int
+            The contrast, between 0 and 255.
+        """
+        pass
+    
+    def set_start_line(self, line: int) -> None:
+        """
+        Sets which row of the display RAM is shown at the top of the screen, which scrolls
+        the whole screen vertically without rewriting the display RAM. Rows that scroll off
+        the top wrap around to the bottom.
+        
+        Parameters
+        ----------
+        line: int
+            The row of the display RAM to show at the top, between 0 and height - 1.
+        """
+        raise NotImplementedError("This display doesn't support hardware scrolling")
+    
+    def set_power(self, on: bool) -> None:
+        """
+        Turns the display's panel on or off, to save power. The display RAM keeps its
+        contents while the panel is off, and can still be written to.
+        
+        Displays that can't be turned off ignore this, and are left at contrast 0 while
+        they're asleep instead.
+        
+        Parameters
+        ----------
+        on: bool
+            Whether the panel should be on.
+        """
+        pass
+    
+    def frame_done(self) -> None:
+        """
+        Gets called after every frame has been written, including frames where nothing changed.
+        """
+        pass
+
+
+class LumaDevice(Device):
+    """
+    A real SH1106 display connected over I2C, driven through the luma.oled package.
+    
+    Parameters
+    ----------
+    port: int
+        The I2C port the display is connected to.
+    
+    address: int
+        The I2C address of the display.
+    """
+    
+    def __init__(self, port: int, address: int) -> None:
+        from luma.core.interface.serial import i2c
+        from luma.oled.device import sh1106
+        
+        self.serial = i2c(port=port, address=address)
+        self.device = sh1106(self.serial)
+        self.bus = port
+        
+        self.width = self.device.width
+        self.height = self.device.height
+    
+    def clear(self) -> None:
+        self.device.clear()
+    
+    def write_page(self, page: int, column: int, data: bytes) -> None:
+        column += _COLUMN_OFFSET
+        self.device.command(0xB0 | page, column & 0x0F, 0x10 | (column >> 4))
+        self.device.data(list(data))
+    
+    def contrast(self, level: int) -> None:
+        self.device.contrast(level)
+    
+    def set_start_line(self, line: int) -> None:
+        self.device.command(0x40 | line)
+    
+    def set_power(self, on: bool) -> None:
+        if on:
+            self.device.show()
+        else:
+            self.device.hide()
+
+
+class VirtualDevice(Device):
+    """
+    An in-memory display for running the framework without any hardware, such as for
+    benchmarking and testing.
+    
+    It keeps a copy of the display RAM, records the frames that were shown (as they appear
+    on the screen, with any scrolling applied), and estimates
+    how long each write would have taken on a real I2C bus. It can also optionally block
+    for that long, so frame timings match the real display.
+    
+    Parameters
+    ----------
+    width: int
+        The width of the display in pixels.
+    
+    height: int
+        The height of the display in pixels.
+    
+    bus_speed: int
+        The speed of the emulated I2C bus in Hz.
+    
+    emulate_timing: bool
+        Whether writes should block for as long as they would take on the emulated bus.
+    
+    max_frames: int
+        The number of most recent frames to keep, or 0 to not record frames.
+    
+    bus: object
+        Identifies the emulated bus, so virtual displays can share one like real ones do.
+    """
+    
+    def __init__(self, width: int = 128, height: int = 64, bus_speed: int = 400_000, emulate_timing: bool = False, max_frames: int = 100, bus: object = None) -> None:
+        self.width = width
+        self.height = height
+        self.bus = bus
+        self.bus_speed = bus_speed
+        self.emulate_timing = emulate_timing
+        
+        self.ram = bytearray(((height + 7) // 8) * width)
+        self.frames = deque(maxlen=max_frames)
+        
+        self.frame_count = 0
+        self.bytes_transferred = 0
+        self.transfer_time = 0.0
+        self.contrast_level = 255
+        self.start_line = 0
+        self.power = True
+    
+    def __transfer(self, command_bytes: int, data_bytes: int) -> None:
+        # Commands are sent in one I2C transaction, and data in blocks of up to 32 bytes.
+        # Each transaction costs an address byte and a control byte on top of its payload,
+        # every byte takes 9 clock cycles, and the start and stop conditions take one each.
+        transactions = (1 if command_bytes else 0) + -(-data_bytes // _I2C_BLOCK_SIZE)
+        total_bytes = command_bytes + data_bytes + transactions * 2
+        duration = (total_bytes * 9 + transactions * 2) / self.bus_speed
+        
+        self.bytes_transferred += total_bytes
+        self.transfer_time += duration
+        if self.emulate_timing:
+            time.sleep(duration)
+    
+    def clear(self) -> None:
+        self.ram[:] = bytes(len(self.ram))
+        for page in range(len(self.ram) // self.width):
+            self.__transfer(3, self.width)
+    
+    def write_page(self, page: int, column: int, data: bytes) -> None:
+        start = page * self.width + column
+        self.ram[start:start + len(data)] = data
+        self.__transfer(3, len(data))
+    
+    def contrast(self, level: int) -> None:
+        self.contrast_level = level
+        self.__transfer(2, 0)
+    
+    def set_start_line(self, line: int) -> None:
+        self.start_line = line
+        self.__transfer(1, 0)
+    
+    def set_power(self, on: bool) -> None:
+        self.power = on
+        self.__transfer(1, 0)
+    
+    def frame_done(self) -> None:
+        self.frame_count += 1
+        if self.frames.maxlen:
+            self.frames.append(self.get_screen())
+    
+    def get_screen(self) -> bytes:
+        """
+        Returns what's currently shown on the screen, in the same page layout as the display
+        RAM. This is the display RAM itself unless the screen is scrolled with a start line.
+        """
+        if not self.start_line:
+            return bytes(self.ram)
+        
+        # Each column is rotated up by the start line as one integer of all its pages
+        width = self.width
+        pages = len(self.ram) // width
+        shift = self.start_line
+        mask = (1 << self.height) - 1
+        screen = bytearray(len(self.ram))
+        for x in range(width):
+            column = int.from_bytes(self.ram[x::width], 'little')
+            column = ((column >> shift) | (column << (self.height - shift))) & mask
+            screen[x::width] = column.to_bytes(pages, 'little')
+        return bytes(screen)
+    
+    def frame_hash(self, frame: bytes = None) -> str:
+        """
+        Returns a short hash of a frame, for comparing frames against known good ones.
+        
+        Parameters
+        ----------
+        frame: bytes
+            The frame to hash. Defaults to what's currently on the screen.
+        """
+        return hashlib.blake2b(self.get_screen() if frame is None else frame, digest_size=8).hexdigest()
+    
+    def get_pixel(self, x: int, y: int) -> int:
+        """
+        Returns the color of a pixel currently on the screen, either 0 or 1.
+        
+        Parameters
+        ----------
+        x: int
+            The x coordinate of the pixel.
+        y: int
+            The y coordinate of the pixel.
+        """
+        y = (y + self.start_line) % self.height
+        return (self.ram[(y >> 3) * self.width + x] >> (y & 7)) & 1
+    
+    def save_png(self, filepath: str, frame: bytes = None, scale: int = 1) -> None:
+        """
+        Saves a frame as a PNG image. This requires the pillow package.
+        
+        Parameters
+        ----------
+        filepath: str
+            The path of the image to save.
+        frame: bytes
+            The frame to save. Defaults to what's currently on the screen.
+        scale: int
+            The scale to save the image at.
+        """
+        from PIL import Image
+        
+        frame = self.get_screen() if frame is None else frame
+        image = Image.new('1', (self.width, self.height))
+        image.putdata([
+            255 if (frame[(y >> 3) * self.width + x] >> (y & 7)) & 1 else 0
+            for y in range(self.height) for x in range(self.width)
+        ])
+        if scale != 1:
+            image = image.resize((self.width * scale, self.height * scale), Image.NEAREST)
+        image.save(filepath)
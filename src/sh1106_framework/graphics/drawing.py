@@ -1,362 +1,426 @@
-from luma.core.interface.serial import i2c
-from luma.oled.device import sh1106
-
-from PIL import Image
 import time
 
-from .fonts import Fonts
-from .images import Images
+from .brightness import Brightness
+from .canvas import Canvas
+from .framebuffer import diff_pages
+from .devices import Device, LumaDevice
+from .transmitter import Transmitter
+from ..framework.panels import panelmethod
+from ..framework.profiler import Profiler
 
-class Drawing:
+class Drawing(Canvas):
     """
     A drawing class for the SH1106 OLED screen. It handles drawing pixels, text, shapes, and images.
+    
+    It's the Canvas of the screen itself: it has all of Canvas's drawing methods, and what's
+    drawn with them is sent to the display at the end of every frame.
+    
+    Wherever a color is taken, it can be 0 for an unlit pixel, 1 for a lit pixel, or
+    Drawing.INVERT to invert whatever is already on the screen.
+    
+    Each instance draws to its own display, so one process can drive several. Its methods
+    can also be called on the class, as most code does, in which case they draw to the
+    current display: the one SH1106Framework.begin set up, or, when running several, the
+    one whose state is being updated or rendered. Fonts and images are shared by every
+    display.
+    
+    Parameters
+    ----------
+    port: int
+        The I2C port the display is connected to.
+    
+    address: int
+        The I2C address of the display.
+    
+    device: Device
+        The display backend to draw to, instead of an SH1106 on the given port and address.
+    
+    pipelined: bool
+        Whether frames are sent on a background thread while the next one is being drawn.
+        Pipelined displays on the same bus share a thread, and displays on different
+        buses are sent to in parallel.
+    
+    backend: str
+        The framebuffer implementation, "python" or "numpy".
     """
     
-    __lcdserial: i2c = None
-    __lcddevice: sh1106 = None
+    # The current display, which methods called on the class are bound to
+    _current: "Drawing" = None
     
-    __lcdpixels = []
-    __image = None
+    # The transmitters of pipelined displays, shared by every display on the same bus, and
+    # how many displays use each
+    __transmitters: dict[object, list] = {}
     
-    __last_contrast_update_time = 0
-    __contrast_update_interval = 0.1
-    __prev_contrast = 255
-    __current_contrast = 255
+    # The defaults for each display, until _init replaces them
+    __lcddevice: Device = None
     
-    __width = 0
-    __height = 0
+    __sent_frame: bytearray = None
+    __submitted_frame: bytes = None
+    __transmitter: Transmitter = None
     
-    @staticmethod
-    def _init(port: int, address: int) -> None:
-        Drawing.__lcdserial = i2c(port=port, address=address)
-        Drawing.__lcddevice = sh1106(Drawing.__lcdserial)
+    __frames_sent = 0
+    __frames_skipped = 0
+    __bytes_sent = 0
+    __bytes_saved = 0
+    __frames_dropped = 0
+    
+    __brightness: Brightness = None
+    
+    # The contrast and power state the display should be at, and what was last sent to it
+    __brightness_target: tuple[int, bool] = None
+    __brightness_queued = False
+    __sent_contrast: int = None
+    __sent_power = True
+    
+    __scroll = 0
+    __scrolled = False
+    
+    def __init__(self, port: int = None, address: int = None, device: Device = None, pipelined: bool = False, backend: str = "python") -> None:
+        self._init(port=port, address=address, device=device, pipelined=pipelined, backend=backend)
+    
+    @panelmethod
+    def _init(self, port: int = None, address: int = None, device: Device = None, pipelined: bool = False, backend: str = "python") -> None:
+        self._stop()
+        
+        if device is None:
+            device = LumaDevice(port=port, address=address)
+        self.__lcddevice = device
         
-        Drawing.__width = Drawing.__lcddevice.width
-        Drawing.__height = Drawing.__lcddevice.height
+        self._width = self.__lcddevice.width
+        self._height = self.__lcddevice.height
         
-        Drawing.__lcddevice.clear()
-        for y in range(Drawing.__height):
-            Drawing.__lcdpixels.append([])
-            for x in range(Drawing.__width):
-                Drawing.__lcdpixels[y].append(0)
+        self.__lcddevice.clear()
+        self._framebuffer = Canvas._create_framebuffer(self._width, self._height, backend)
+        self.__scroll = 0
         
-        Drawing.__image = Image.new('1', (Drawing.__width, Drawing.__height))
+        # The device was just cleared, so its display RAM matches an empty framebuffer
+        self.__sent_frame = bytearray(self._framebuffer.buffer)
+        self.__submitted_frame = bytes(self._framebuffer.buffer)
+        
+        # The device's contrast isn't known until it's been sent once, and it starts on
+        self.__brightness_target = None
+        self.__brightness_queued = False
+        self.__sent_contrast = None
+        self.__sent_power = True
+        
+        if pipelined:
+            self.__transmitter = Drawing.__acquire_transmitter(device.bus)
     
     @staticmethod
-    def __validate_pixel(x: int, y: int) -> bool:
-        if x < 0 or x >= Drawing.__width:
-            return False
-        if y < 0 or y >= Drawing.__height:
-            return False
-        return True
+    def __acquire_transmitter(bus: object) -> Transmitter:
+        # Displays on the same bus share a transmitter, so their transfers take turns
+        # instead of competing for the bus. Displays with no bus get one of their own
+        if bus is None:
+            return Transmitter(name="sh1106-transmitter")
+        
+        entry = Drawing.__transmitters.get(bus)
+        if entry is None:
+            entry = Drawing.__transmitters[bus] = [Transmitter(name="sh1106-transmitter-{}".format(bus)), 0]
+        entry[1] += 1
+        return entry[0]
     
-    @staticmethod
-    def get_width() -> int:
-        """
-        Returns the width of the LCD screen in pixels.
-        """
-        return Drawing.__width
+    @panelmethod
+    def _stop(self) -> None:
+        # Finishes sending anything still queued for the display, and stops its transmitter
+        # once no other display is using it
+        transmitter = self.__transmitter
+        if transmitter is None:
+            return
+        self.__transmitter = None
+        
+        for bus, entry in list(Drawing.__transmitters.items()):
+            if entry[0] is transmitter:
+                entry[1] -= 1
+                if entry[1] > 0:
+                    transmitter.wait()
+                    return
+                del Drawing.__transmitters[bus]
+        transmitter.stop()
     
-    @staticmethod
-    def get_height() -> int:
-        """
-        Returns the height of the LCD screen in pixels.
-        """
-        return Drawing.__height        
-                
-    @staticmethod
-    def set_contrast(contrast: int) -> None:
+    def __device_command(self, command, *args) -> None:
+        # With a transmitter, commands go through its thread so they don't interleave with a frame being sent
+        if self.__transmitter is not None:
+            self.__transmitter.submit_command(command, *args)
+        else:
+            command(*args)
+    
+    def __get_brightness(self) -> Brightness:
+        # Made on first use, so brightness settings made before the display is set up carry over to it
+        if self.__brightness is None:
+            self.__brightness = Brightness()
+        return self.__brightness
+    
+    @panelmethod
+    def set_contrast(self, contrast: int, duration: float = 0.0) -> None:
         """
-        Sets the contrast (a.k.a. brightness) of the SH1106 display.
-
+        Sets the contrast (a.k.a. brightness) of the SH1106 display, optionally fading to
+        it. While the display is dimmed by set_auto_dim, it's the contrast it goes back to
+        when there's input.
+        
         Parameters
         ----------
         contrast: int
             The contrast to set the display to, between 0 and 255.
+        duration: float
+            How long to fade to it for, in seconds, or 0 to change straight away.
         """
-        
-        Drawing.__prev_contrast = Drawing.__current_contrast
-        Drawing.__current_contrast = contrast
-        
-    @staticmethod
-    def _update_contrast() -> None:
-        # Update the contrast if it has changed, but only every __contrast_update_interval seconds
-        # This is because updating the contrast too often can cause the screen to lag behind
-        
-        if Drawing.__current_contrast != Drawing.__prev_contrast:
-            current_time = time.time()
-            if current_time - Drawing.__last_contrast_update_time >= Drawing.__contrast_update_interval:
-                Drawing.__last_contrast_update_time = current_time
-                Drawing.__lcddevice.contrast(int(Drawing.__current_contrast*25.5))
-        
-    @staticmethod
-    def clear() -> None:
+        self.__get_brightness().set_contrast(contrast, duration)
+    
+    @panelmethod
+    def get_contrast(self) -> int:
         """
-        Clears the LCD screen.
+        Returns the contrast the display is at, part way through any fade, between 0 and 255.
         """
-        for y in range(Drawing.__height):
-            for x in range(Drawing.__width):
-                Drawing.__lcdpixels[y][x] = 0
-                
-    @staticmethod
-    def set_pixel(x: int, y: int, color: int) -> None:
+        return self.__get_brightness().get_contrast()
+    
+    @panelmethod
+    def set_auto_dim(self, dim_after: float = None, dim_contrast: int = 32, sleep_after: float = None, fade: float = 1.0) -> None:
         """
-        Sets a pixel on the LCD screen.
+        Dims the display after a while without input, and turns it off after a while
+        longer, to save power and the panel. Any input wakes it up again, fading back up
+        to its contrast, and is still passed on to the current state as usual. No frames
+        are sent while the display is off; what changed is sent once it's woken up.
         
         Parameters
         ----------
-        x: int
-            The x coordinate of the pixel to set.
-        y: int
-            The y coordinate of the pixel to set.
-        color: int
-            The color of the pixel to set, either 0 or 1.
+        dim_after: float
+            The seconds without input before the display dims, or None to never dim it.
+        dim_contrast: int
+            The contrast it dims to, between 0 and 255.
+        sleep_after: float
+            The seconds without input before the display fades out and turns off, or None
+            to never turn it off.
+        fade: float
+            How long dimming, turning off and waking up fade for, in seconds.
         """
-        if Drawing.__validate_pixel(x, y):
-            Drawing.__lcdpixels[y][x] = color
-            
-    @staticmethod
-    def get_text_width(text: str, font: str = "default", scale: int = 1) -> int:
+        self.__get_brightness().set_auto_dim(dim_after, dim_contrast, sleep_after, fade)
+    
+    @panelmethod
+    def set_brightness_schedule(self, schedule: dict[str, int] = None, fade: float = 60.0) -> None:
         """
-        Returns the width of a string of text in pixels.
+        Changes the contrast at times of day, such as to dim an always-on display at
+        night. Each change lasts until the next one, wrapping around at midnight, and
+        replaces the contrast set with set_contrast.
         
         Parameters
         ----------
-        text: str
-            The string of text to get the width of.
-        font: str
-            The name of the font to use.
-        scale: int
-            The scale of the text.
+        schedule: dict[str, int]
+            The contrast to change to at each time of day, as "HH:MM" in local time, such as
+            {"07:00": 255, "22:30": 16}, or None to stop following a schedule.
+        fade: float
+            How long each change fades for, in seconds.
         """
-        text_width = 0
-        for i in range(len(text)):
-            char = text[i]
-            text_width += scale * (Fonts._get_char(font, char)[0][0] + 1)
-        
-        return text_width
-                        
-    @staticmethod
-    def draw_text(text: str, x: int, y: int, color: int = 1, font: str = "default", scale: int = 1, centered: bool = False) -> None:
+        self.__get_brightness().set_schedule(schedule, fade)
+    
+    @panelmethod
+    def wake(self) -> None:
         """
-        Draws a string of text on the LCD screen.
-        
-        Parameters
-        ----------
-        text: str
-            The string of text to draw.
-        x: int
-            The x coordinate of the text.
-        y: int
-            The y coordinate of the text.
-        color: int
-            The color of the text, either 0 or 1.
-        font: str
-            The name of the font to use.
-        scale: int
-            The scale of the text.
-        centered: bool
-            Whether or not the text should be centered.
+        Wakes the display up if it was dimmed or turned off, as any input does, and
+        restarts the wait before it dims again.
         """
-        
-        if centered:
-            start_x = x - Drawing.get_text_width(text, font=font, scale=scale) // 2
-            
-            for i in range(len(text)):
-                char = text[i]
-                
-                char_bitmap = Fonts._get_char(font, char)[1:]
-                for y1 in range(len(char_bitmap)):
-                    for x1 in range(len(char_bitmap[y1])):
-                        if char_bitmap[y1][x1] == 1:
-                            if scale == 1:
-                                if Drawing.__validate_pixel(start_x+x1, y+y1):
-                                    Drawing.__lcdpixels[y+y1][start_x+x1] = color
-                            else:
-                                Drawing.draw_rect(start_x + x1*scale, y+ y1 *scale, scale, scale, color)
-
-                start_x += scale * (Fonts._get_char(font, char)[0][0] + 1)
-        else:
-            start_x = int(x)
-            
-            for i in range(len(text)):
-                char = text[i]
-                
-                char_bitmap = Fonts._get_char(font, char)[1:]
-                for y1 in range(len(char_bitmap)):
-                    for x1 in range(len(char_bitmap[y1])):
-                        if char_bitmap[y1][x1] == 1:
-                            if scale == 1:
-                                if Drawing.__validate_pixel(start_x+x1, y+y1):
-                                    Drawing.__lcdpixels[y+y1][start_x+x1] = color
-                            else:
-                                Drawing.draw_rect(start_x + x1*scale, y+ y1 *scale, scale, scale, color)
-
-                start_x += scale * (Fonts._get_char(font, char)[0][0] + 1)
-            
-    @staticmethod
-    def draw_rect(x: int, y: int, width: int, height: int, color: int = 1) -> None:
+        self.__get_brightness().wake()
+    
+    @panelmethod
+    def sleep(self) -> None:
         """
-        Draws a rectangle on the LCD screen.
-        
-        Parameters
-        ----------
-        x: int
-            The x coordinate of the rectangle.
-        y: int
-            The y coordinate of the rectangle.
-        width: int
-            The width of the rectangle.
-        height: int
-            The height of the rectangle.
-        color: int
-            The color of the rectangle, either 0 or 1.
+        Fades the display out and turns it off until there's input or wake is called,
+        without waiting for set_auto_dim's timeout.
+        """
+        self.__get_brightness().sleep()
+    
+    @panelmethod
+    def is_asleep(self) -> bool:
         """
+        Returns whether the display is asleep, from set_auto_dim or sleep.
+        """
+        return self.__get_brightness().is_asleep()
+    
+    @panelmethod
+    def _update_brightness(self, scale: float = 1.0) -> bool:
+        # Works out the contrast and power state for this frame, and sends them if they changed.
+        # The contrast is multiplied by scale, which a fade transition lowers to 0 and back
+        # without changing the contrast the display is set to.
+        # Changes are coalesced rather than rate limited: each frame only the latest values
+        # are sent, and a pipelined display has at most one brightness command queued, which
+        # sends whatever the latest values are by the time the transmitter gets to it.
+        # Returns whether the display was just turned back on, so the frame has to be sent
+        # even if nothing was drawn
+        brightness = self.__get_brightness()
+        brightness._update()
+        now = time.monotonic()
+        contrast = brightness.get_contrast(now)
+        if scale != 1.0:
+            contrast = round(contrast * scale)
+        target = (contrast, brightness.is_on(now))
+        previous = self.__brightness_target
+        if target == previous:
+            return False
         
-        # Clip to fit within screen borders
-        new_x = max(0, x)
-        new_y = max(0, y)
-        new_width = min(width, Drawing.__width - new_x)
-        new_height = min(height, Drawing.__height - new_y)
+        self.__brightness_target = target
+        if self.__transmitter is None:
+            self.__send_brightness()
+        elif not self.__brightness_queued:
+            self.__brightness_queued = True
+            self.__transmitter.submit_command(self.__send_brightness)
+        return previous is not None and not previous[1] and target[1]
+    
+    def __send_brightness(self) -> None:
+        # The panel is turned on before the contrast is raised, and off after it's lowered
+        self.__brightness_queued = False
+        contrast, on = self.__brightness_target
         
-        for y1 in range(new_height):
-            for x1 in range(new_width):
-                Drawing.__lcdpixels[new_y+y1][new_x+x1] = color
-                
-    @staticmethod
-    def draw_outlined_rect(x: int, y: int, width: int, height: int, color: int = 1) -> None:
+        if on and not self.__sent_power:
+            self.__lcddevice.set_power(True)
+            self.__sent_power = True
+        if contrast != self.__sent_contrast:
+            self.__lcddevice.contrast(contrast)
+            self.__sent_contrast = contrast
+        if not on and self.__sent_power:
+            self.__lcddevice.set_power(False)
+            self.__sent_power = False
+    
+    @panelmethod
+    def set_scroll(self, offset: int) -> None:
         """
-        Draws an outlined rectangle on the LCD screen.
+        Scrolls the whole screen up by a number of rows, using the display's start line
+        rather than redrawing anything, so scrolling costs a single command instead of a
+        full frame. Rows that scroll off the top wrap around to the bottom.
+        
+        While the screen is scrolled, drawing is done in the display's own coordinates,
+        which don't move: the pixel drawn at row y appears on row (y - offset) of the
+        screen. For a continuous vertical ticker, draw each new row of content into the
+        row that just scrolled off the top, and only that row is sent.
         
         Parameters
         ----------
-        x: int
-            The x coordinate of the rectangle.
-        y: int
-            The y coordinate of the rectangle.
-        width: int
-            The width of the rectangle.
-        height: int
-            The height of the rectangle.
-        color: int
-            The color of the rectangle, either 0 or 1.
+        offset: int
+            The number of rows to scroll up by. It wraps around at the screen's height,
+            and 0 turns scrolling off.
         """
-
-        for x1 in range(x, x+width): # Top border
-            Drawing.set_pixel(x1, y, color)
-        for x1 in range(x, x+width): # Bottom border
-            Drawing.set_pixel(x1, y+height-1, color)
-        for y1 in range(y+1, y+height-1): # Left border
-            Drawing.set_pixel(x, y1, color)
-        for y1 in range(y+1, y+height-1): # Right border
-            Drawing.set_pixel(x+width-1, y1, color)
-                    
-    @staticmethod
-    def draw_line(x0: int, y0: int, x1: int, y1: int, color: int = 1) -> None:
+        line = int(offset) % self._height
+        if line != self.__scroll:
+            self.__scroll = line
+            self.__scrolled = True
+            self.__device_command(self.__lcddevice.set_start_line, line)
+    
+    @panelmethod
+    def get_scroll(self) -> int:
+        """
+        Returns the number of rows the screen is scrolled up by, from set_scroll.
         """
-        Draws a line on the LCD screen.
+        return self.__scroll
+    
+    @panelmethod
+    def invalidate(self) -> None:
+        """
+        Forces the whole screen to be sent to the display on the next frame, even if the
+        pixels haven't changed since the last frame that was sent.
+        """
+        self.__sent_frame = None
+        self.__submitted_frame = None
+    
+    @panelmethod
+    def get_transfer_stats(self) -> dict[str, int]:
+        """
+        Returns counters describing how much has been sent to the display so far.
         
-        Parameters
-        ----------
-        x0: int
-            The x coordinate of the starting point of the line.
-        y0: int
-            The y coordinate of the starting point of the line.
-        x1: int
-            The x coordinate of the ending point of the line.
-        y1: int
-            The y coordinate of the ending point of the line.
-        color: int
-            The color of the line, either 0 or 1.
+        Returns
+        -------
+        dict[str, int]
+            frames_sent: the number of frames that had at least one changed page.
+            frames_skipped: the number of frames that were identical to the previous one.
+            bytes_sent: the number of command and data bytes sent to the display.
+            bytes_saved: the number of bytes that sending every page in full would have cost on top of that.
+            frames_dropped: the number of frames replaced by a newer one before they could be sent, when pipelined.
         """
+        return {
+            "frames_sent": self.__frames_sent,
+            "frames_skipped": self.__frames_skipped,
+            "bytes_sent": self.__bytes_sent,
+            "bytes_saved": self.__bytes_saved,
+            "frames_dropped": self.__frames_dropped,
+        }
+    
+    @panelmethod
+    def _is_pipelined(self) -> bool:
+        return self.__transmitter is not None
+    
+    @panelmethod
+    def _render(self) -> bool:
+        # Scrolling changes the screen even when the framebuffer stays the same
+        scrolled = self.__scrolled
+        self.__scrolled = False
         
-        # Optimized bresenham's line algorithm
-        # See last code block from https://en.wikipedia.org/wiki/Bresenham%27s_line_algorithm#All_cases
-        dx = abs(x1 - x0)
-        sx = 1 if x0 < x1 else -1
-        dy = -abs(y1 - y0)
-        sy = 1 if y0 < y1 else -1
-        error = dx + dy
+        # While the display is off, frames wait to be sent until it's woken up
+        if self.__brightness_target is not None and not self.__brightness_target[1]:
+            return False
         
-        while True:
-            Drawing.set_pixel(x0, y0, color)
-            if x0 == x1 and y0 == y1:
-                break
-            e2 = 2 * error
-            if e2 >= dy:
-                if x0 == x1:
-                    break
-                error = error + dy
-                x0 = x0 + sx
-            if e2 <= dx:
-                if y0 == y1:
-                    break
-                error = error + dx
-                y0 = y0 + sy
-                
-    @staticmethod
-    def draw_image(image: str, x: int, y: int, color: int = 1, scale: int = 1, centered_horizontal: bool = False, centered_vertical: bool = False) -> None:
-        """
-        Draws an image on the LCD screen.
+        if self.__transmitter is None:
+            return self.__send_frame(self._framebuffer.buffer) or scrolled
         
-        Parameters
-        ----------
-        image: str
-            The name of the image to draw.
-        x: int
-            The x coordinate of the image.
-        y: int
-            The y coordinate of the image.
-        color: int
-            The color of the image, either 0 or 1.
-        scale: int
-            The scale of the image.
-        centered_horizontal: bool
-            Whether or not the image should be centered horizontally.
-        centered_vertical: bool
-            Whether or not the image should be centered vertically.
-        """
+        # When pipelined, a snapshot of the frame is handed to the transmitter thread, which
+        # sends it while the next frame is being drawn
+        if Profiler._enabled:
+            start = time.perf_counter()
+        
+        frame = self._framebuffer.buffer
+        changed = frame != self.__submitted_frame
+        if changed:
+            self.__submitted_frame = bytes(frame)
+        if self.__transmitter.submit_frame(self.__submitted_frame, self.__send_frame):
+            self.__frames_dropped += 1
         
-        image_pixels = Images._images[image]
-        image_pixels = image_pixels[1:]
+        if Profiler._enabled:
+            Profiler._record("pack", time.perf_counter() - start)
+        return changed or scrolled
     
-        if centered_horizontal:
-            offset_x = int((-image_pixels[0][0]*scale) / 2)
-        else:
-            offset_x = 0
-            
-        if centered_vertical:
-            offset_y = int((-image_pixels[0][1]*scale) / 2)
+    def __send_frame(self, frame: bytes) -> bool:
+        # The framebuffer is already in the SH1106's page layout, so only the columns of each
+        # page that changed since the last frame are written to the display RAM
+        framebuffer = self._framebuffer
+        width = framebuffer.width
+        profiling = Profiler._enabled
+        if profiling:
+            start = time.perf_counter()
+        
+        # invalidate can clear the sent frame from another thread while this one is sending,
+        # so the copy being updated is held on to until the frame is done
+        sent_frame = self.__sent_frame
+        if sent_frame is None:
+            spans = [(page, 0, width) for page in range(framebuffer.pages)]
+            sent_frame = self.__sent_frame = bytearray(len(frame))
         else:
-            offset_y = 0
+            spans = diff_pages(frame, sent_frame, width)
         
-        for y1 in range(len(image_pixels)):
-            for x1 in range(len(image_pixels[0])):
-                if image_pixels[y1][x1] == 1:
-                    if scale == 1:
-                        Drawing.set_pixel(x + x1 + offset_x, y + y1 + offset_y, color)
-                    else:
-                        Drawing.draw_rect(int(x + x1 * scale + offset_x), int(y + y1 * scale + offset_y), scale, scale, color)
-    
-    @staticmethod
-    def _render() -> None:
-        width = len(Drawing.__lcdpixels[0])
-        height = len(Drawing.__lcdpixels)
+        # A full frame costs 3 command bytes and a row of data bytes per page
+        full_frame_bytes = framebuffer.pages * (3 + width)
+        
+        if profiling:
+            packed = time.perf_counter()
+            Profiler._record("pack", packed - start)
         
-        # Convert the 2D list into a bytes object with bit packing
-        packed_data = []
-        for row in Drawing.__lcdpixels:
-            # Pack 8 pixels into each byte
-            for i in range(0, len(row), 8):
-                byte = 0
-                for bit in row[i:i+8]:
-                    byte = (byte << 1) | bit
-                packed_data.append(byte)
-                
-        binary_data = bytes(packed_data)
+        if not spans:
+            self.__frames_skipped += 1
+            self.__bytes_saved += full_frame_bytes
+            self.__lcddevice.frame_done()
+            return False
         
-        # Create an image from the byte data
-        Drawing.__image = Image.frombytes('1', (width, height), binary_data)
+        bytes_sent = 0
+        for page, start, end in spans:
+            offset = page * width
+            self.__lcddevice.write_page(page, start, frame[offset + start:offset + end])
+            sent_frame[offset + start:offset + end] = frame[offset + start:offset + end]
+            bytes_sent += 3 + end - start
         
+        self.__frames_sent += 1
+        self.__bytes_sent += bytes_sent
+        self.__bytes_saved += full_frame_bytes - bytes_sent
+        self.__lcddevice.frame_done()
         
-        Drawing.__lcddevice.display(Drawing.__image)
\ No newline at end of file
+        if profiling:
+            Profiler._record("transfer", time.perf_counter() - packed)
+        return True
+
+
+# Until SH1106Framework.begin sets it up, the current display has no device
+Drawing._current = object.__new__(Drawing)
@@ -1,16 +1,60 @@
-import json
+from .assets import AssetFile, JsonAssetFile, is_asset_file
+from .asset_cache import AssetCache
+from .bitmap import Bitmap
 
 class Fonts:
-    __bitmaps = {}
+    # The file each font is in. Glyphs are only read from it when first drawn, and kept
+    # in the AssetCache after that
+    __sources = {}
+    __heights = {}
+    __kerning = {}
     
     char_list = " abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!?<>,./:;\"'@#$%^&*()_-+="
     
     @staticmethod
     def _register_font(font_name: str, filepath: str):
-        with open(filepath) as f:
-            Fonts.__bitmaps[font_name] = json.load(f)
-            print("Loaded font \"{}\" from {}".format(font_name, filepath))
+        # Compiled fonts are memory-mapped, and JSON fonts are only indexed
+        if is_asset_file(filepath):
+            Fonts.__sources[font_name] = AssetFile(filepath)
+        else:
+            Fonts.__sources[font_name] = JsonAssetFile(filepath)
+        
+        AssetCache._discard_group("font", font_name)
+        Fonts.__heights.pop(font_name, None)
+        Fonts.__kerning.pop(font_name, None)
+        print("Loaded font \"{}\" from {}".format(font_name, filepath))
     
     @staticmethod
-    def _get_char(font, char):
-        return Fonts.__bitmaps[font][str(char)]
\ No newline at end of file
+    def _get_glyph(font, char) -> Bitmap:
+        key = ("font", font, char)
+        glyph = AssetCache._get(key)
+        if glyph is None:
+            glyph = AssetCache._put(key, Fonts.__sources[font].get(str(char)))
+        return glyph
+    
+    @staticmethod
+    def _preload(fonts: list[str] | dict[str, str]) -> None:
+        # Decodes every character of a list of fonts, or the given characters of a dict of them
+        for font in fonts:
+            chars = fonts[font] if isinstance(fonts, dict) else Fonts.__sources[font].names()
+            for char in chars:
+                Fonts._get_glyph(font, char)
+    
+    @staticmethod
+    def _set_kerning(font, pairs: dict[str, int]) -> None:
+        Fonts.__kerning[font] = dict(pairs)
+    
+    @staticmethod
+    def _get_kerning(font) -> dict[str, int]:
+        # Maps pairs of characters to the number of pixels to move the second one by
+        return Fonts.__kerning.get(font, {})
+    
+    @staticmethod
+    def _get_height(font) -> int:
+        height = Fonts.__heights.get(font)
+        if height is None:
+            # The sizes are in the index, so no glyphs are decoded for this
+            source = Fonts.__sources[font]
+            height = max((source.size(char)[1] for char in source.names()), default=0)
+            Fonts.__heights[font] = height
+        return height
\ No newline at end of file
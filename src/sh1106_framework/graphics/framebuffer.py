@@ -0,0 +1,394 @@
+from functools import lru_cache
+
+from .bitmap import Bitmap
+
+# The color that inverts pixels instead of setting them
+INVERT = 2
+
+# The ways composite can combine an image with the framebuffer
+COMPOSITE_MODES = ("or", "and", "xor", "copy")
+
+
+@lru_cache(maxsize=512)
+def _repeat_byte(value: int, count: int) -> int:
+    # An integer made of `count` copies of the byte `value`, used to apply the same bit mask
+    # to a whole run of columns at once with a single big-integer operation
+    return int.from_bytes(bytes((value,)) * count, 'little')
+
+
+class FrameBuffer:
+    """
+    A 1-bit-per-pixel framebuffer, laid out the same way as the SH1106's display RAM.
+    
+    The buffer is split into pages of 8 rows. Each byte holds a vertical strip of 8 pixels
+    in one column of a page, with the least significant bit at the top, so the pixel (x, y)
+    lives in bit y % 8 of byte (y // 8) * width + x. A page can therefore be sent to the
+    display as-is, without any repacking.
+    
+    Parameters
+    ----------
+    width: int
+        The width of the framebuffer in pixels.
+    
+    height: int
+        The height of the framebuffer in pixels.
+    """
+    
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.pages = (height + 7) // 8
+        self.buffer = bytearray(self.pages * width)
+        
+        self.__blank = bytes(len(self.buffer))
+        
+        # Drawing is limited to this (left, top, right, bottom) rectangle, which also keeps the
+        # bits of the last page below the bottom row off when the height isn't a multiple of 8
+        self.clip = (0, 0, width, height)
+    
+    def set_clip(self, x: int, y: int, width: int, height: int) -> None:
+        """
+        Limits drawing to a rectangle, so pixels outside of it are left as they are.
+        The rectangle is clipped to the framebuffer.
+        
+        Parameters
+        ----------
+        x: int
+            The x coordinate of the rectangle.
+        y: int
+            The y coordinate of the rectangle.
+        width: int
+            The width of the rectangle.
+        height: int
+            The height of the rectangle.
+        """
+        x0 = min(max(0, x), self.width)
+        y0 = min(max(0, y), self.height)
+        self.clip = (x0, y0, max(x0, min(self.width, x + width)), max(y0, min(self.height, y + height)))
+    
+    def reset_clip(self) -> None:
+        """
+        Allows drawing anywhere in the framebuffer again.
+        """
+        self.clip = (0, 0, self.width, self.height)
+    
+    def clear(self) -> None:
+        """
+        Turns off every pixel in the framebuffer.
+        """
+        self.buffer[:] = self.__blank
+    
+    def get_page(self, page: int) -> bytearray:
+        """
+        Returns a copy of the bytes of one page, one byte per column.
+        
+        Parameters
+        ----------
+        page: int
+            The index of the page, from 0 at the top of the screen.
+        """
+        start = page * self.width
+        return self.buffer[start:start + self.width]
+    
+    def get_pixel(self, x: int, y: int) -> int:
+        """
+        Returns the color of a pixel, either 0 or 1. Pixels outside the framebuffer are 0.
+        
+        Parameters
+        ----------
+        x: int
+            The x coordinate of the pixel.
+        y: int
+            The y coordinate of the pixel.
+        """
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            return 0
+        return (self.buffer[(y >> 3) * self.width + x] >> (y & 7)) & 1
+    
+    def set_pixel(self, x: int, y: int, color: int) -> None:
+        """
+        Sets a pixel in the framebuffer. Pixels outside the framebuffer or the clip
+        rectangle are ignored.
+        
+        Parameters
+        ----------
+        x: int
+            The x coordinate of the pixel.
+        y: int
+            The y coordinate of the pixel.
+        color: int
+            The color of the pixel, either 0 or 1, or 2 to invert it.
+        """
+        left, top, right, bottom = self.clip
+        if x < left or x >= right or y < top or y >= bottom:
+            return
+        
+        index = (y >> 3) * self.width + x
+        if color == INVERT:
+            self.buffer[index] ^= 1 << (y & 7)
+        elif color:
+            self.buffer[index] |= 1 << (y & 7)
+        else:
+            self.buffer[index] &= ~(1 << (y & 7)) & 0xFF
+    
+    def fill_rect(self, x: int, y: int, width: int, height: int, color: int = 1) -> None:
+        """
+        Fills a rectangle, clipped to the framebuffer and the clip rectangle.
+        
+        Each page the rectangle touches is updated with one operation over the whole span
+        of columns, rather than one pixel at a time.
+        
+        Parameters
+        ----------
+        x: int
+            The x coordinate of the rectangle.
+        y: int
+            The y coordinate of the rectangle.
+        width: int
+            The width of the rectangle.
+        height: int
+            The height of the rectangle.
+        color: int
+            The color of the rectangle, either 0 or 1, or 2 to invert the pixels under it.
+        """
+        left, top, right, bottom = self.clip
+        x0 = max(left, x)
+        y0 = max(top, y)
+        x1 = min(right, x + width)
+        y1 = min(bottom, y + height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        
+        for page in range(y0 >> 3, ((y1 - 1) >> 3) + 1):
+            top = max(y0 - (page << 3), 0)
+            bottom = min(y1 - (page << 3), 8)
+            mask = (0xFF << top) & (0xFF >> (8 - bottom))
+            self._apply_mask(page * self.width + x0, x1 - x0, mask, color)
+    
+    def blit(self, bitmap: Bitmap, x: int, y: int, color: int = 1, scale: int = 1) -> None:
+        """
+        Draws the lit pixels of a bitmap onto the framebuffer, clipped to the framebuffer
+        and the clip rectangle.
+        
+        Each page of the bitmap is shifted into place and combined with the framebuffer
+        as a whole span of columns, so the cost depends on the number of pages the bitmap
+        covers rather than on the number of pixels.
+        
+        Parameters
+        ----------
+        bitmap: Bitmap
+            The bitmap to draw.
+        x: int
+            The x coordinate of the top-left corner of the bitmap.
+        y: int
+            The y coordinate of the top-left corner of the bitmap.
+        color: int
+            The color to draw the lit pixels of the bitmap with, either 0 or 1, or 2 to invert
+            the pixels under them.
+        scale: int
+            The scale to draw the bitmap at.
+        """
+        if scale != 1:
+            bitmap = bitmap.scaled(scale)
+        
+        left, top, right, bottom = self.clip
+        x0 = max(left, x)
+        x1 = min(right, x + bitmap.width)
+        if x0 >= x1 or y >= bottom or y + bitmap.height <= top:
+            return
+        
+        count = x1 - x0
+        source_start = x0 - x
+        shift = y & 7
+        first_page = y >> 3
+        
+        if shift:
+            lower_mask = _repeat_byte((0xFF << shift) & 0xFF, count)
+            upper_mask = _repeat_byte(0xFF >> (8 - shift), count)
+        
+        data = bitmap.data
+        for source_page in range(bitmap.pages):
+            page = first_page + source_page
+            if page >= self.pages:
+                break
+            
+            offset = source_page * bitmap.width + source_start
+            row = int.from_bytes(data[offset:offset + count], 'little')
+            if not row:
+                continue
+            
+            if not shift:
+                if page >= 0:
+                    self._combine(page * self.width + x0, count, row, color, page)
+                continue
+            
+            # Shifting the whole span at once moves bits across byte boundaries, so each
+            # half is masked back to the rows that belong to its page
+            lower = (row << shift) & lower_mask
+            upper = (row >> (8 - shift)) & upper_mask
+            if lower and page >= 0:
+                self._combine(page * self.width + x0, count, lower, color, page)
+            if upper and 0 <= page + 1 < self.pages:
+                self._combine((page + 1) * self.width + x0, count, upper, color, page + 1)
+    
+    def composite(self, source, x: int, y: int, mode: str = "or") -> None:
+        """
+        Combines a bitmap or another framebuffer with this one, clipped to the framebuffer
+        and the clip rectangle. Like blit, each page of the source is shifted into place and
+        combined as a whole span of columns, but the source's unlit pixels can count too.
+        
+        Parameters
+        ----------
+        source: Bitmap | FrameBuffer
+            The image to combine with the framebuffer.
+        x: int
+            The x coordinate of the top-left corner of the source.
+        y: int
+            The y coordinate of the top-left corner of the source.
+        mode: str
+            "or" to light the pixels under the source's lit pixels, "and" to turn off the
+            pixels under its unlit ones, "xor" to invert the pixels under its lit ones, or
+            "copy" to replace the pixels under it with its own.
+        """
+        if mode not in COMPOSITE_MODES:
+            raise ValueError("Unknown composite mode \"{}\"".format(mode))
+        
+        left, top, right, bottom = self.clip
+        x0 = max(left, x)
+        x1 = min(right, x + source.width)
+        if x0 >= x1 or y >= bottom or y + source.height <= top:
+            return
+        
+        count = x1 - x0
+        source_start = x0 - x
+        shift = y & 7
+        first_page = y >> 3
+        
+        if shift:
+            lower_mask = _repeat_byte((0xFF << shift) & 0xFF, count)
+            upper_mask = _repeat_byte(0xFF >> (8 - shift), count)
+        
+        data = source.data if isinstance(source, Bitmap) else source.buffer
+        for source_page in range((source.height + 7) >> 3):
+            page = first_page + source_page
+            if page >= self.pages:
+                break
+            
+            offset = source_page * source.width + source_start
+            row = int.from_bytes(data[offset:offset + count], 'little')
+            
+            # The rows of the source in this page, which its unlit pixels are taken from
+            cover = _repeat_byte(0xFF >> max(8 - (source.height - (source_page << 3)), 0), count)
+            
+            if not shift:
+                if page >= 0:
+                    self.__composite_span(page, x0, count, row, cover, mode)
+                continue
+            
+            if page >= 0:
+                self.__composite_span(page, x0, count, (row << shift) & lower_mask, (cover << shift) & lower_mask, mode)
+            if 0 <= page + 1 < self.pages:
+                self.__composite_span(page + 1, x0, count, (row >> (8 - shift)) & upper_mask, (cover >> (8 - shift)) & upper_mask, mode)
+    
+    def __composite_span(self, page: int, x: int, count: int, bits: int, cover: int, mode: str) -> None:
+        # Combines one page's span of the source, where `bits` are its lit pixels and
+        # `cover` is every pixel it covers, lit or not
+        start = page * self.width + x
+        if mode == "or":
+            if bits:
+                self._combine(start, count, bits, 1, page)
+        elif mode == "xor":
+            if bits:
+                self._combine(start, count, bits, INVERT, page)
+        else:
+            unlit = cover & ~bits
+            if unlit:
+                self._combine(start, count, unlit, 0, page)
+            if mode == "copy" and bits:
+                self._combine(start, count, bits, 1, page)
+    
+    def _fill_spans(self, spans: list[tuple[int, int, int]], color: int) -> None:
+        # Fills (y, x0, x1) spans that are already clipped and don't overlap, such as the
+        # ones from the shapes module. Spans in the same page over the same columns, like the
+        # rows of a filled circle's middle, are combined into a single mask
+        masks = {}
+        for y, x0, x1 in spans:
+            key = (y >> 3, x0, x1)
+            masks[key] = masks.get(key, 0) | (1 << (y & 7))
+        
+        width = self.width
+        for (page, x0, x1), mask in masks.items():
+            self._apply_mask(page * width + x0, x1 - x0, mask, color)
+    
+    def _apply_mask(self, start: int, count: int, mask: int, color: int) -> None:
+        # Sets, clears or inverts the bits in `mask` for `count` consecutive bytes of the buffer
+        if mask == 0xFF and color != INVERT:
+            self.buffer[start:start + count] = b'\xff' * count if color else bytes(count)
+            return
+        
+        self._combine(start, count, _repeat_byte(mask, count), color)
+    
+    def _combine(self, start: int, count: int, bits: int, color: int, page: int = None) -> None:
+        # Combines `bits`, a span of `count` bytes packed into an integer, with the buffer
+        buffer = self.buffer
+        end = start + count
+        
+        if page is not None:
+            # Rows of the page outside the clip rectangle are masked off
+            top = self.clip[1] - (page << 3)
+            bottom = self.clip[3] - (page << 3)
+            if top > 0 or bottom < 8:
+                mask = (0xFF << max(top, 0)) & (0xFF >> (8 - min(max(bottom, 0), 8)))
+                if not mask:
+                    return
+                bits &= _repeat_byte(mask, count)
+        
+        row = int.from_bytes(buffer[start:end], 'little')
+        if color == INVERT:
+            row ^= bits
+        elif color:
+            row |= bits
+        else:
+            row &= ~bits
+        buffer[start:end] = row.to_bytes(count, 'little')
+    
+    def to_bitmap(self) -> Bitmap:
+        """
+        Returns an immutable copy of the framebuffer's pixels as a bitmap.
+        """
+        return Bitmap(self.width, self.height, self.buffer)
+
+def diff_pages(current: bytes, previous: bytes, width: int) -> list[tuple[int, int, int]]:
+    """
+    Compares two page-layout frames and returns the parts of them that differ.
+    
+    Parameters
+    ----------
+    current: bytes
+        The bytes of the new frame.
+    previous: bytes
+        The bytes of the frame to compare against, of the same size.
+    width: int
+        The width of both frames in pixels.
+    
+    Returns
+    -------
+    list[tuple[int, int, int]]
+        A (page, start column, end column) tuple for every page that changed, where the end
+        column is exclusive. Pages that are identical in both frames are left out.
+    """
+    spans = []
+    for page in range(len(current) // width):
+        start = page * width
+        end = start + width
+        if current[start:end] == previous[start:end]:
+            continue
+        
+        # XOR the two pages as integers, so the lowest and highest set bits give the first
+        # and last changed columns without looping over the page in Python
+        changed = int.from_bytes(current[start:end], 'little') ^ int.from_bytes(previous[start:end], 'little')
+        first = ((changed & -changed).bit_length() - 1) >> 3
+        last = (changed.bit_length() - 1) >> 3
+        spans.append((page, first, last + 1))
+    
+    return spans
@@ -1,14 +1,33 @@
-import json
-from pathlib import Path
+from .assets import AssetFile, JsonAssetFile, is_asset_file
+from .asset_cache import AssetCache
+from .bitmap import Bitmap
 
 class Images:
-    _images = {}
+    # The file each registered image is in, by name. Images are only read from it when
+    # first drawn, and kept in the AssetCache after that
+    __sources: dict[str, AssetFile] = {}
     
     @staticmethod
     def _register_images(filepath: str) -> None:
-        with open(filepath) as f:
-            temp_images = json.load(f)
-            print("Reading images from " + filepath)
-            for key in temp_images.keys():
-                Images._images[key] = temp_images[key]
-                print("Loaded image \"{}\" from {}".format(key, filepath))
\ No newline at end of file
+        if is_asset_file(filepath):
+            source = AssetFile(filepath)
+        else:
+            source = JsonAssetFile(filepath)
+        
+        for key in source.names():
+            Images.__sources[key] = source
+            AssetCache._discard(("image", key))
+        print("Indexed {} images from {}".format(len(source), filepath))
+    
+    @staticmethod
+    def _get_image(image: str) -> Bitmap:
+        key = ("image", image)
+        bitmap = AssetCache._get(key)
+        if bitmap is None:
+            bitmap = AssetCache._put(key, Images.__sources[image].get(image))
+        return bitmap
+    
+    @staticmethod
+    def _preload(images: list[str]) -> None:
+        for image in images:
+            Images._get_image(image)
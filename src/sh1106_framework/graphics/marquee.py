@@ -0,0 +1,140 @@
+from .bitmap import Bitmap
+from .drawing import Drawing
+from .framebuffer import FrameBuffer
+from .text_cache import TextCache
+
+
+class Marquee:
+    """
+    Text that scrolls horizontally through a fixed area of the screen, such as a ticker.
+    
+    The text is rendered once, into a strip wide enough to hold it followed by the start of
+    its next repetition, and each frame draws the visible window of that strip with a
+    single clipped blit. Only the pages the marquee covers change from frame to frame, so
+    only those are sent to the display. Its text, font, scale, gap and width can be
+    changed at any time, and the strip is rendered again the next time it's used.
+    
+    Parameters
+    ----------
+    text: str
+        The text to scroll.
+    x: int
+        The x coordinate of the area the text scrolls through.
+    y: int
+        The y coordinate of the area the text scrolls through.
+    width: int
+        The width of the area the text scrolls through.
+    speed: float
+        How fast the text scrolls, in pixels per second. Negative speeds scroll to the right.
+    font: str
+        The name of the font to use.
+    scale: int
+        The scale of the text.
+    gap: int
+        The number of pixels between the end of the text and its next repetition.
+    color: int
+        The color of the text, either 0 or 1, or Drawing.INVERT.
+    """
+    
+    def __init__(self, text: str, x: int, y: int, width: int, speed: float = 30, font: str = "default", scale: int = 1, gap: int = 16, color: int = 1) -> None:
+        self.x = x
+        self.y = y
+        self.width = width
+        self.speed = speed
+        self.font = font
+        self.scale = scale
+        self.gap = gap
+        self.color = color
+        
+        self.offset = 0.0
+        self.__text = text
+        # What the strip was rendered from, so changing the font, scale, gap or width renders it again
+        self.__rendered = None
+        self.__render()
+    
+    def set_text(self, text: str) -> None:
+        """
+        Changes the text, rendering the new strip. The scroll position is kept.
+        
+        Parameters
+        ----------
+        text: str
+            The new text to scroll.
+        """
+        self.__text = text
+        self.__render()
+    
+    def __render(self) -> None:
+        # Renders the strip again if anything it depends on changed since it was last rendered
+        rendered = (self.__text, self.font, self.scale, self.gap, int(self.width))
+        if rendered == self.__rendered:
+            return
+        if self.gap < 0:
+            raise ValueError("A marquee's gap can't be negative")
+        
+        self.__rendered = rendered
+        run = TextCache._get_text(self.font, self.__text, self.scale)
+        # Empty text with no gap still repeats every pixel, so the strip and the offset can wrap
+        self.__period = max(run.width + self.gap, 1)
+        self.offset %= self.__period
+        
+        # The strip repeats the text until it covers the period plus the visible width, so
+        # any window into it at an offset below the period is complete
+        strip = FrameBuffer(self.__period + int(self.width), run.height)
+        for x in range(0, strip.width, self.__period):
+            strip.blit(run, x, 0)
+        self.__strip = strip.to_bitmap()
+    
+    def get_text(self) -> str:
+        """
+        Returns the text that's scrolling.
+        """
+        return self.__text
+    
+    def get_strip(self) -> Bitmap:
+        """
+        Returns the rendered strip the visible window is drawn from.
+        """
+        self.__render()
+        return self.__strip
+    
+    def update(self, dt: float) -> bool:
+        """
+        Moves the text along by its speed.
+        
+        Parameters
+        ----------
+        dt: float
+            The delta time in seconds.
+        
+        Returns
+        -------
+        bool
+            Whether the text moved by at least a whole pixel, and so needs redrawing.
+        """
+        self.__render()
+        previous = int(self.offset)
+        self.offset = (self.offset + self.speed * dt) % self.__period
+        return int(self.offset) != previous
+    
+    def draw(self) -> None:
+        """
+        Draws the visible part of the text, within any clip that's already set.
+        """
+        self.__render()
+        
+        # The window is kept to by clipping to the marquee's area, along with the current clip
+        framebuffer = Drawing._current._framebuffer
+        clip = framebuffer.clip
+        left, top, right, bottom = clip
+        x, y = int(self.x), int(self.y)
+        x0 = max(left, x)
+        y0 = max(top, y)
+        x1 = max(x0, min(right, x + int(self.width)))
+        y1 = max(y0, min(bottom, y + self.__strip.height))
+        
+        framebuffer.clip = (x0, y0, x1, y1)
+        try:
+            framebuffer.blit(self.__strip, x - int(self.offset), y, self.color)
+        finally:
+            framebuffer.clip = clip
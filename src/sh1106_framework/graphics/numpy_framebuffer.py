@@ -0,0 +1,178 @@
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .bitmap import Bitmap
+from .framebuffer import FrameBuffer, INVERT, COMPOSITE_MODES
+
+
+def _unpack_pages(width: int, height: int, data: bytes):
+    # Unpacks page-layout pixels into a 2D array of booleans
+    pages = (height + 7) // 8
+    pixels = np.unpackbits(np.frombuffer(data, dtype=np.uint8).reshape(pages, 1, width), axis=1, bitorder='little')
+    return pixels.reshape(pages * 8, width)[:height].astype(bool)
+
+
+@lru_cache(maxsize=256)
+def _unpack(bitmap: Bitmap, scale: int):
+    # Unpacks a bitmap into a 2D array of booleans, scaled up by repeating each pixel
+    pixels = _unpack_pages(bitmap.width, bitmap.height, bitmap.data)
+    if scale != 1:
+        pixels = pixels.repeat(scale, axis=0).repeat(scale, axis=1)
+    return pixels
+
+
+class NumpyFrameBuffer(FrameBuffer):
+    """
+    A framebuffer backed by a NumPy array of one byte per pixel. It has the same interface
+    as FrameBuffer, but draws with whole-array operations: rectangles are slice
+    assignments, and bitmaps are clipped and combined as masked array operations.
+    
+    The pixels are only packed into the SH1106's page layout when the frame is sent.
+    
+    Parameters
+    ----------
+    width: int
+        The width of the framebuffer in pixels.
+    
+    height: int
+        The height of the framebuffer in pixels.
+    """
+    
+    def __init__(self, width: int, height: int) -> None:
+        if np is None:
+            raise ImportError("The NumPy drawing backend requires the numpy package")
+        
+        self.width = width
+        self.height = height
+        self.pages = (height + 7) // 8
+        
+        # Rows below the bottom of the framebuffer pad it to a whole number of pages, and stay off
+        self.__padded = np.zeros((self.pages * 8, width), dtype=np.uint8)
+        self.pixels = self.__padded[:height]
+        self.__packed = None
+        self.clip = (0, 0, width, height)
+    
+    @staticmethod
+    def is_available() -> bool:
+        """
+        Returns whether NumPy is installed, which this backend needs.
+        """
+        return np is not None
+    
+    @property
+    def buffer(self) -> bytes:
+        """
+        The pixels packed into the SH1106's page layout, as in FrameBuffer.buffer.
+        """
+        if self.__packed is None:
+            pages = self.__padded.reshape(self.pages, 8, self.width)
+            self.__packed = np.packbits(pages, axis=1, bitorder='little').tobytes()
+        return self.__packed
+    
+    def clear(self) -> None:
+        self.pixels.fill(0)
+        self.__packed = None
+    
+    def get_page(self, page: int) -> bytes:
+        start = page * self.width
+        return self.buffer[start:start + self.width]
+    
+    def get_pixel(self, x: int, y: int) -> int:
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            return 0
+        return int(self.pixels[y, x])
+    
+    def set_pixel(self, x: int, y: int, color: int) -> None:
+        left, top, right, bottom = self.clip
+        if x < left or x >= right or y < top or y >= bottom:
+            return
+        
+        if color == INVERT:
+            self.pixels[y, x] ^= 1
+        else:
+            self.pixels[y, x] = 1 if color else 0
+        self.__packed = None
+    
+    def fill_rect(self, x: int, y: int, width: int, height: int, color: int = 1) -> None:
+        left, top, right, bottom = self.clip
+        x0 = max(left, x)
+        y0 = max(top, y)
+        x1 = min(right, x + width)
+        y1 = min(bottom, y + height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        
+        if color == INVERT:
+            self.pixels[y0:y1, x0:x1] ^= 1
+        else:
+            self.pixels[y0:y1, x0:x1] = 1 if color else 0
+        self.__packed = None
+    
+    def blit(self, bitmap: Bitmap, x: int, y: int, color: int = 1, scale: int = 1) -> None:
+        width = bitmap.width * scale
+        height = bitmap.height * scale
+        
+        left, top, right, bottom = self.clip
+        x0 = max(left, x)
+        y0 = max(top, y)
+        x1 = min(right, x + width)
+        y1 = min(bottom, y + height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        
+        mask = _unpack(bitmap, scale)[y0 - y:y1 - y, x0 - x:x1 - x]
+        region = self.pixels[y0:y1, x0:x1]
+        if color == INVERT:
+            region ^= mask
+        elif color:
+            region |= mask
+        else:
+            region &= ~mask
+        self.__packed = None
+    
+    def composite(self, source, x: int, y: int, mode: str = "or") -> None:
+        if mode not in COMPOSITE_MODES:
+            raise ValueError("Unknown composite mode \"{}\"".format(mode))
+        
+        left, top, right, bottom = self.clip
+        x0 = max(left, x)
+        y0 = max(top, y)
+        x1 = min(right, x + source.width)
+        y1 = min(bottom, y + source.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        
+        # Another NumPy framebuffer's pixels are used as they are, while packed sources are unpacked
+        if isinstance(source, NumpyFrameBuffer):
+            mask = source.pixels[y0 - y:y1 - y, x0 - x:x1 - x] != 0
+        elif isinstance(source, Bitmap):
+            mask = _unpack(source, 1)[y0 - y:y1 - y, x0 - x:x1 - x]
+        else:
+            mask = _unpack_pages(source.width, source.height, source.buffer)[y0 - y:y1 - y, x0 - x:x1 - x]
+        
+        region = self.pixels[y0:y1, x0:x1]
+        if mode == "or":
+            region |= mask
+        elif mode == "xor":
+            region ^= mask
+        elif mode == "and":
+            region &= mask
+        else:
+            region[...] = mask
+        self.__packed = None
+    
+    def _fill_spans(self, spans: list[tuple[int, int, int]], color: int) -> None:
+        pixels = self.pixels
+        for y, x0, x1 in spans:
+            if color == INVERT:
+                pixels[y, x0:x1] ^= 1
+            else:
+                pixels[y, x0:x1] = 1 if color else 0
+        self.__packed = None
+    
+    def to_bitmap(self) -> Bitmap:
+        return Bitmap(self.width, self.height, self.buffer)
@@ -0,0 +1,412 @@
+from .drawing import Drawing
+from .images import Images
+from .text_cache import TextCache
+
+_MISSING = object()
+
+# Past this many separate damaged rectangles, redrawing the whole scene is cheaper
+_MAX_DAMAGE_RECTS = 8
+
+
+def _intersects(a: tuple[int, int, int, int], b: tuple[int, int, int, int]) -> bool:
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+def _union(a: tuple[int, int, int, int], b: tuple[int, int, int, int]) -> tuple[int, int, int, int]:
+    x0 = min(a[0], b[0])
+    y0 = min(a[1], b[1])
+    return (x0, y0, max(a[0] + a[2], b[0] + b[2]) - x0, max(a[1] + a[3], b[1] + b[3]) - y0)
+
+
+class Node:
+    """
+    The base class for everything that can be put in a scene. Setting any of a node's
+    attributes to a new value marks it as changed, so the area it covered and the area it
+    now covers are redrawn on the next frame. Setting an attribute to the value it already
+    has doesn't cost anything.
+    
+    Attributes
+    ----------
+    color: int
+        The color to draw the node with, either 0 or 1, or Drawing.INVERT.
+    
+    visible: bool
+        Whether the node is drawn.
+    """
+    
+    def __init__(self, color: int = 1, visible: bool = True) -> None:
+        self.__dict__["_dirty"] = True
+        self.__dict__["_drawn_bounds"] = None
+        self.color = color
+        self.visible = visible
+    
+    def __setattr__(self, name: str, value) -> None:
+        if not name.startswith("_") and self.__dict__.get(name, _MISSING) != value:
+            self.__dict__["_dirty"] = True
+        object.__setattr__(self, name, value)
+    
+    def get_bounds(self) -> tuple[int, int, int, int]:
+        """
+        Returns the rectangle the node covers, relative to its group, as an (x, y, width, height) tuple.
+        """
+        raise NotImplementedError
+    
+    def _draw(self, x: int, y: int) -> None:
+        # Draws the node offset by the position of the groups it's in
+        raise NotImplementedError
+
+
+class TextNode(Node):
+    """
+    A string of text, drawn like Drawing.draw_text.
+    
+    Parameters
+    ----------
+    text: str
+        The string of text to draw.
+    x: int
+        The x coordinate of the text.
+    y: int
+        The y coordinate of the text.
+    color: int
+        The color of the text, either 0 or 1, or Drawing.INVERT.
+    font: str
+        The name of the font to use.
+    scale: int
+        The scale of the text.
+    centered: bool
+        Whether or not the text should be centered on x.
+    """
+    
+    def __init__(self, text: str, x: int, y: int, color: int = 1, font: str = "default", scale: int = 1, centered: bool = False) -> None:
+        super().__init__(color)
+        self.text = text
+        self.x = x
+        self.y = y
+        self.font = font
+        self.scale = scale
+        self.centered = centered
+    
+    def get_bounds(self) -> tuple[int, int, int, int]:
+        bitmap = TextCache._get_text(self.font, self.text, self.scale)
+        x = int(self.x) - bitmap.width // 2 if self.centered else int(self.x)
+        return (x, int(self.y), bitmap.width, bitmap.height)
+    
+    def _draw(self, x: int, y: int) -> None:
+        bitmap = TextCache._get_text(self.font, self.text, self.scale)
+        left = int(self.x) - bitmap.width // 2 if self.centered else int(self.x)
+        Drawing.blit(bitmap, x + left, y + int(self.y), self.color)
+
+
+class ImageNode(Node):
+    """
+    A registered image, drawn like Drawing.draw_image.
+    
+    Parameters
+    ----------
+    image: str
+        The name of the image to draw.
+    x: int
+        The x coordinate of the image.
+    y: int
+        The y coordinate of the image.
+    color: int
+        The color of the image, either 0 or 1, or Drawing.INVERT.
+    scale: int
+        The scale of the image.
+    centered_horizontal: bool
+        Whether or not the image should be centered horizontally.
+    centered_vertical: bool
+        Whether or not the image should be centered vertically.
+    """
+    
+    def __init__(self, image: str, x: int, y: int, color: int = 1, scale: int = 1, centered_horizontal: bool = False, centered_vertical: bool = False) -> None:
+        super().__init__(color)
+        self.image = image
+        self.x = x
+        self.y = y
+        self.scale = scale
+        self.centered_horizontal = centered_horizontal
+        self.centered_vertical = centered_vertical
+    
+    def get_bounds(self) -> tuple[int, int, int, int]:
+        bitmap = Images._get_image(self.image)
+        width = bitmap.width * self.scale
+        height = bitmap.height * self.scale
+        x = int(self.x + (int(-width / 2) if self.centered_horizontal else 0))
+        y = int(self.y + (int(-height / 2) if self.centered_vertical else 0))
+        return (x, y, width, height)
+    
+    def _draw(self, x: int, y: int) -> None:
+        left, top, _, _ = self.get_bounds()
+        Drawing.blit(Images._get_image(self.image), x + left, y + top, self.color, self.scale)
+
+
+class RectNode(Node):
+    """
+    A rectangle, either filled like Drawing.draw_rect or outlined like Drawing.draw_outlined_rect.
+    
+    Parameters
+    ----------
+    x: int
+        The x coordinate of the rectangle.
+    y: int
+        The y coordinate of the rectangle.
+    width: int
+        The width of the rectangle.
+    height: int
+        The height of the rectangle.
+    color: int
+        The color of the rectangle, either 0 or 1, or Drawing.INVERT.
+    filled: bool
+        Whether the rectangle is filled, or only has an outline.
+    """
+    
+    def __init__(self, x: int, y: int, width: int, height: int, color: int = 1, filled: bool = True) -> None:
+        super().__init__(color)
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.filled = filled
+    
+    def get_bounds(self) -> tuple[int, int, int, int]:
+        return (int(self.x), int(self.y), int(self.width), int(self.height))
+    
+    def _draw(self, x: int, y: int) -> None:
+        if self.width <= 0 or self.height <= 0:
+            return
+        if self.filled:
+            Drawing.draw_rect(x + int(self.x), y + int(self.y), self.width, self.height, self.color)
+        else:
+            Drawing.draw_outlined_rect(x + int(self.x), y + int(self.y), int(self.width), int(self.height), self.color)
+
+
+class LineNode(Node):
+    """
+    A line, drawn like Drawing.draw_line.
+    
+    Parameters
+    ----------
+    x0: int
+        The x coordinate of the starting point of the line.
+    y0: int
+        The y coordinate of the starting point of the line.
+    x1: int
+        The x coordinate of the ending point of the line.
+    y1: int
+        The y coordinate of the ending point of the line.
+    color: int
+        The color of the line, either 0 or 1, or Drawing.INVERT.
+    """
+    
+    def __init__(self, x0: int, y0: int, x1: int, y1: int, color: int = 1) -> None:
+        super().__init__(color)
+        self.x0 = x0
+        self.y0 = y0
+        self.x1 = x1
+        self.y1 = y1
+    
+    def get_bounds(self) -> tuple[int, int, int, int]:
+        x0, y0, x1, y1 = int(self.x0), int(self.y0), int(self.x1), int(self.y1)
+        return (min(x0, x1), min(y0, y1), abs(x1 - x0) + 1, abs(y1 - y0) + 1)
+    
+    def _draw(self, x: int, y: int) -> None:
+        Drawing.draw_line(x + int(self.x0), y + int(self.y0), x + int(self.x1), y + int(self.y1), self.color)
+
+
+class Group(Node):
+    """
+    A node that holds other nodes. The position of its children is relative to the group,
+    so moving or hiding the group moves or hides all of them. Children are drawn in the
+    order they were added, so later ones are drawn on top.
+    
+    Children should be added and removed with add and remove, rather than by changing
+    the children list directly, so the scene knows what to redraw.
+    
+    Parameters
+    ----------
+    x: int
+        The x coordinate of the group.
+    y: int
+        The y coordinate of the group.
+    children: list[Node]
+        The nodes to start the group with.
+    """
+    
+    def __init__(self, x: int = 0, y: int = 0, children: list[Node] = None) -> None:
+        super().__init__()
+        self.x = x
+        self.y = y
+        self.children = []
+        self._removed_bounds = []
+        for child in children or []:
+            self.add(child)
+    
+    def add(self, node: Node) -> Node:
+        """
+        Adds a node to the top of the group.
+        
+        Parameters
+        ----------
+        node: Node
+            The node to add.
+        
+        Returns
+        -------
+        Node
+            The node that was added, so it can be kept for changing later.
+        """
+        node.__dict__["_dirty"] = True
+        self.children.append(node)
+        return node
+    
+    def remove(self, node: Node) -> None:
+        """
+        Removes a node from the group.
+        
+        Parameters
+        ----------
+        node: Node
+            The node to remove.
+        """
+        self.children.remove(node)
+        Group.__forget(node, self._removed_bounds)
+    
+    def clear(self) -> None:
+        """
+        Removes every node from the group.
+        """
+        for child in self.children:
+            Group.__forget(child, self._removed_bounds)
+        self.children = []
+    
+    @staticmethod
+    def __forget(node: Node, removed_bounds: list) -> None:
+        # The area a removed node was drawn over still has to be redrawn
+        if isinstance(node, Group):
+            for child in node.children:
+                Group.__forget(child, removed_bounds)
+        elif node._drawn_bounds is not None:
+            removed_bounds.append(node._drawn_bounds)
+            node.__dict__["_drawn_bounds"] = None
+    
+    def get_bounds(self) -> tuple[int, int, int, int]:
+        bounds = None
+        for child in self.children:
+            x, y, width, height = child.get_bounds()
+            child_bounds = (x + int(self.x), y + int(self.y), width, height)
+            bounds = child_bounds if bounds is None else _union(bounds, child_bounds)
+        return bounds or (int(self.x), int(self.y), 0, 0)
+    
+    def _is_dirty(self) -> bool:
+        if self._dirty or self._removed_bounds:
+            return True
+        for child in self.children:
+            if child._dirty or (isinstance(child, Group) and child._is_dirty()):
+                return True
+        return False
+
+
+class Scene(Group):
+    """
+    The root of a tree of nodes that describes what's on the screen. Instead of redrawing
+    everything every frame, the scene remembers where each node was drawn, and only clears
+    and redraws the areas covered by nodes that changed, were added, or were removed.
+    Other nodes overlapping those areas are redrawn too, but only inside them.
+    
+    Scenes are normally owned by a RetainedState, which renders them automatically.
+    """
+    
+    def __init__(self, children: list[Node] = None) -> None:
+        super().__init__(0, 0, children)
+        self._full_redraw = True
+    
+    def invalidate(self) -> None:
+        """
+        Forces the whole scene to be redrawn on the next frame.
+        """
+        self._full_redraw = True
+    
+    def is_dirty(self) -> bool:
+        """
+        Returns whether anything in the scene changed since it was last rendered.
+        """
+        return self._full_redraw or self._is_dirty()
+    
+    def render(self) -> None:
+        """
+        Redraws the parts of the scene that changed since it was last rendered.
+        """
+        leaves = []
+        damage = []
+        Scene.__collect(self, 0, 0, False, True, leaves, damage)
+        
+        damage = Scene.__merge(damage)
+        if self._full_redraw or len(damage) > _MAX_DAMAGE_RECTS:
+            self._full_redraw = False
+            Drawing.clear()
+            for node, x, y, _ in leaves:
+                node._draw(x, y)
+            return
+        
+        # Each damaged area is rebuilt from scratch, clipped so nodes that overlap its edge
+        # don't draw over the parts of the screen that are already correct
+        for area in damage:
+            Drawing.set_clip(*area)
+            Drawing.draw_rect(*area, 0)
+            for node, x, y, bounds in leaves:
+                if _intersects(bounds, area):
+                    node._draw(x, y)
+        Drawing.reset_clip()
+    
+    @staticmethod
+    def __collect(group: Group, x: int, y: int, moved: bool, visible: bool, leaves: list, damage: list) -> None:
+        # Walks the tree, working out where each visible node is on the screen, and which
+        # areas need redrawing because a node or one of its groups changed
+        moved = moved or group._dirty
+        visible = visible and group.visible
+        group.__dict__["_dirty"] = False
+        damage.extend(group._removed_bounds)
+        group._removed_bounds.clear()
+        
+        x += int(group.x)
+        y += int(group.y)
+        for child in group.children:
+            if isinstance(child, Group):
+                Scene.__collect(child, x, y, moved, visible, leaves, damage)
+                continue
+            
+            bounds = None
+            if visible and child.visible:
+                left, top, width, height = child.get_bounds()
+                bounds = (left + x, top + y, width, height)
+            
+            if moved or child._dirty:
+                if child._drawn_bounds is not None:
+                    damage.append(child._drawn_bounds)
+                if bounds is not None:
+                    damage.append(bounds)
+            
+            child.__dict__["_dirty"] = False
+            child.__dict__["_drawn_bounds"] = bounds
+            if bounds is not None:
+                leaves.append((child, x, y, bounds))
+    
+    @staticmethod
+    def __merge(rects: list) -> list:
+        # Combines overlapping rectangles, so no area gets redrawn more than once
+        merged = []
+        for rect in rects:
+            if rect[2] <= 0 or rect[3] <= 0:
+                continue
+            
+            i = 0
+            while i < len(merged):
+                if _intersects(merged[i], rect):
+                    rect = _union(merged.pop(i), rect)
+                    i = 0
+                else:
+                    i += 1
+            merged.append(rect)
+        return merged
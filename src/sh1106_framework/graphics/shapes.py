@@ -0,0 +1,293 @@
+from math import atan2, ceil, cos, degrees, floor, hypot, isqrt, radians, sin
+
+# Shapes are rasterized into spans: (y, x0, x1) tuples covering the pixels x0 <= x < x1 of
+# row y. Every function here clips its spans to a (left, top, right, bottom) rectangle and
+# returns them sorted, with no pixel covered twice, so they can be inverted as well as set.
+#
+# Internally, shapes are built from rows of (y, left, right) with both ends inclusive.
+
+
+def _merge(rows: list[tuple[int, int, int]]) -> list[tuple[int, int, int]]:
+    # Sorts the rows and joins the ones on the same line that overlap or touch
+    merged = []
+    for y, left, right in sorted(rows):
+        if merged and merged[-1][0] == y and left <= merged[-1][2] + 1:
+            if right > merged[-1][2]:
+                merged[-1] = (y, merged[-1][1], right)
+        else:
+            merged.append((y, left, right))
+    return merged
+
+
+def _clip(rows: list[tuple[int, int, int]], clip: tuple[int, int, int, int]) -> list[tuple[int, int, int]]:
+    # Turns sorted, inclusive rows into spans inside the clip rectangle
+    left, top, right, bottom = clip
+    spans = []
+    for y, x0, x1 in rows:
+        if top <= y < bottom:
+            x0 = max(x0, left)
+            x1 = min(x1 + 1, right)
+            if x0 < x1:
+                spans.append((y, x0, x1))
+    return spans
+
+
+def _ellipse_widths(rx: int, ry: int) -> list[int]:
+    # The half width of each row of an ellipse, from its middle row outwards. A pixel is in
+    # the ellipse when its center is inside one with both radii half a pixel larger, which
+    # for circles is the same rule the midpoint circle algorithm follows
+    a = 2 * rx + 1
+    b = 2 * ry + 1
+    return [isqrt(a * a * (b * b - 4 * dy * dy)) // (2 * b) for dy in range(ry + 1)]
+
+
+def _ellipse_rows(cx: int, cy: int, rx: int, ry: int) -> list[tuple[int, int, int]]:
+    widths = _ellipse_widths(rx, ry)
+    return [(cy + dy, cx - widths[abs(dy)], cx + widths[abs(dy)]) for dy in range(-ry, ry + 1)]
+
+
+def _insides(rows: list[tuple[int, int, int]]) -> dict[int, tuple[int, int]]:
+    # The inside of a convex shape given as one row per line, top to bottom: on each line,
+    # the pixels whose neighbors above, below, and to either side are all in the shape
+    insides = {}
+    for i in range(1, len(rows) - 1):
+        y, left, right = rows[i]
+        inner_left = max(rows[i - 1][1], rows[i + 1][1], left + 1)
+        inner_right = min(rows[i - 1][2], rows[i + 1][2], right - 1)
+        if inner_left <= inner_right:
+            insides[y] = (inner_left, inner_right)
+    return insides
+
+
+def _subtract(rows: list[tuple[int, int, int]], insides: dict[int, tuple[int, int]]) -> list[tuple[int, int, int]]:
+    # Takes a range away from each line, leaving the parts to either side of it
+    result = []
+    for y, left, right in rows:
+        inside = insides.get(y)
+        if inside is None:
+            result.append((y, left, right))
+            continue
+        
+        if left < inside[0]:
+            result.append((y, left, inside[0] - 1))
+        if inside[1] < right:
+            result.append((y, inside[1] + 1, right))
+    return result
+
+
+def _outline(rows: list[tuple[int, int, int]]) -> list[tuple[int, int, int]]:
+    # The edge of a convex shape: its pixels that aren't inside it
+    return _subtract(rows, _insides(rows))
+
+
+def _line_rows(x0: int, y0: int, x1: int, y1: int) -> list[tuple[int, int, int]]:
+    # Bresenham's line algorithm, with each row's run of pixels collected into a single row
+    # See last code block from https://en.wikipedia.org/wiki/Bresenham%27s_line_algorithm#All_cases
+    dx = abs(x1 - x0)
+    sx = 1 if x0 < x1 else -1
+    dy = -abs(y1 - y0)
+    sy = 1 if y0 < y1 else -1
+    error = dx + dy
+    
+    rows = []
+    row_y = y0
+    row_left = row_right = x0
+    while True:
+        if y0 != row_y:
+            rows.append((row_y, row_left, row_right))
+            row_y = y0
+            row_left = row_right = x0
+        elif x0 < row_left:
+            row_left = x0
+        elif x0 > row_right:
+            row_right = x0
+        
+        if x0 == x1 and y0 == y1:
+            break
+        e2 = 2 * error
+        if e2 >= dy:
+            error += dy
+            x0 += sx
+        if e2 <= dx:
+            error += dx
+            y0 += sy
+    rows.append((row_y, row_left, row_right))
+    return rows
+
+
+def line_spans(x0: int, y0: int, x1: int, y1: int, clip: tuple[int, int, int, int]) -> list[tuple[int, int, int]]:
+    """
+    Returns the spans of a one pixel wide line, including both of its end points.
+    """
+    return _clip(sorted(_line_rows(x0, y0, x1, y1)), clip)
+
+
+def thick_line_spans(x0: int, y0: int, x1: int, y1: int, thickness: int, clip: tuple[int, int, int, int]) -> list[tuple[int, int, int]]:
+    """
+    Returns the spans of a line that's thickness pixels wide, centered on the line
+    between the end points, with square ends.
+    """
+    if thickness <= 1:
+        return line_spans(x0, y0, x1, y1, clip) if thickness == 1 else []
+    
+    length = hypot(x1 - x0, y1 - y0)
+    if length == 0:
+        offset = (thickness - 1) // 2
+        return _clip([(y, x0 - offset, x0 - offset + thickness - 1) for y in range(y0 - offset, y0 - offset + thickness)], clip)
+    
+    # The line is filled as the rectangle around it, offset to either side along its normal
+    half = (thickness - 1) / 2
+    nx = -(y1 - y0) / length * half
+    ny = (x1 - x0) / length * half
+    corners = [(x0 + nx, y0 + ny), (x1 + nx, y1 + ny), (x1 - nx, y1 - ny), (x0 - nx, y0 - ny)]
+    return polygon_spans(corners, True, clip)
+
+
+def ellipse_spans(cx: int, cy: int, rx: int, ry: int, filled: bool, clip: tuple[int, int, int, int]) -> list[tuple[int, int, int]]:
+    """
+    Returns the spans of an ellipse, or a circle when both radii are the same, or of its outline.
+    """
+    if rx < 0 or ry < 0:
+        return []
+    
+    rows = _ellipse_rows(cx, cy, rx, ry)
+    return _clip(rows if filled else _merge(_outline(rows)), clip)
+
+
+def rounded_rect_spans(x: int, y: int, width: int, height: int, radius: int, filled: bool, clip: tuple[int, int, int, int]) -> list[tuple[int, int, int]]:
+    """
+    Returns the spans of a rectangle with rounded corners, or of its outline. The radius
+    is limited to fit the rectangle.
+    """
+    if width <= 0 or height <= 0:
+        return []
+    
+    radius = max(0, min(radius, (width - 1) // 2, (height - 1) // 2))
+    widths = _ellipse_widths(radius, radius)
+    
+    rows = []
+    for row in range(height):
+        # Rows in the top and bottom corners are inset by how far the corner's circle is from its side
+        dy = max(radius - row, row - (height - 1 - radius), 0)
+        inset = radius - widths[dy] if dy else 0
+        rows.append((y + row, x + inset, x + width - 1 - inset))
+    return _clip(rows if filled else _merge(_outline(rows)), clip)
+
+
+def arc_spans(cx: int, cy: int, radius: int, start_angle: float, end_angle: float, thickness: int, clip: tuple[int, int, int, int]) -> list[tuple[int, int, int]]:
+    """
+    Returns the spans of an arc of a circle, thickness pixels wide inwards from its radius.
+    Angles are in degrees, clockwise from the positive x axis, since y points down.
+    """
+    if radius < 0 or thickness <= 0:
+        return []
+    
+    # The ring is the circle without the inside of a smaller circle, so an arc one pixel
+    # thick follows the same pixels as the circle's outline. The inside of a circle's row
+    # is what's also under the rows above and below it, and one pixel in from its ends
+    widths = _ellipse_widths(radius, radius)
+    inner_radius = radius - thickness + 1
+    inner_widths = _ellipse_widths(inner_radius, inner_radius) + [-1] if inner_radius > 0 else []
+    ring = []
+    for dy in range(-radius, radius + 1):
+        y = cy + dy
+        width = widths[abs(dy)]
+        hole = min(inner_widths[abs(dy) + 1], inner_widths[abs(dy)] - 1) if abs(dy) < inner_radius else -1
+        if hole < 0:
+            ring.append((y, cx - width, cx + width))
+        else:
+            if hole < width:
+                ring.append((y, cx - width, cx - hole - 1))
+                ring.append((y, cx + hole + 1, cx + width))
+    
+    rows = _clip(ring, clip)
+    sweep = end_angle - start_angle
+    if sweep >= 360:
+        return rows
+    
+    # Along a row, the angle from the center only ever moves one way, so the arc's two
+    # edges split each span of the ring into at most three runs, each all inside or all
+    # outside the arc. Only the first pixel of each span and the pixels either side of
+    # where an edge crosses it are tested, which finds where every run starts and ends
+    sweep %= 360
+    start_cos, start_sin = cos(radians(start_angle)), sin(radians(start_angle))
+    end_cos, end_sin = cos(radians(start_angle + sweep)), sin(radians(start_angle + sweep))
+    
+    spans = []
+    row_y = None
+    for y, x0, x1 in rows:
+        if y != row_y:
+            # Where each edge crosses the row, if it points towards the row at all. The row
+            # through the center goes from 180 degrees on the left to 0 on the right
+            row_y = y
+            dy = y - cy
+            crossings = []
+            if not dy:
+                crossings.append(cx - 0.5)
+            if start_sin * dy > 0:
+                crossings.append(cx + dy * start_cos / start_sin)
+            if end_sin * dy > 0:
+                crossings.append(cx + dy * end_cos / end_sin)
+        
+        checks = None
+        for crossing in crossings:
+            if x0 - 2 <= crossing <= x1 + 1:
+                # The pixels either side of the crossing, and of a crossing that might
+                # land on the other side of a pixel's center from rounding
+                if checks is None:
+                    checks = [x0]
+                checks.extend(range(max(floor(crossing - 0.001), x0), min(floor(crossing + 0.001) + 2, x1)))
+        
+        if checks is None:
+            # Neither edge crosses this span, so it's all in the arc or all out of it
+            if (degrees(atan2(dy, x0 - cx)) - start_angle) % 360 <= sweep:
+                spans.append((y, x0, x1))
+            continue
+        
+        run_start = None
+        for x in sorted(set(checks)):
+            if (degrees(atan2(dy, x - cx)) - start_angle) % 360 <= sweep:
+                if run_start is None:
+                    run_start = x
+            elif run_start is not None:
+                spans.append((y, run_start, x))
+                run_start = None
+        if run_start is not None:
+            spans.append((y, run_start, x1))
+    return spans
+
+
+def polygon_spans(points: list[tuple[float, float]], filled: bool, clip: tuple[int, int, int, int]) -> list[tuple[int, int, int]]:
+    """
+    Returns the spans of a closed polygon's outline, or of the polygon filled with the
+    even-odd rule. Filled polygons include their outline.
+    """
+    count = len(points)
+    if count == 0:
+        return []
+    
+    # The outline is the lines between the points, rounded to the nearest pixels
+    corners = [(floor(x + 0.5), floor(y + 0.5)) for x, y in points]
+    rows = []
+    for i in range(count):
+        rows.extend(_line_rows(*corners[i - 1], *corners[i]))
+    
+    if filled and count > 2:
+        # Each row through the polygon is filled between pairs of the points where it crosses an edge
+        left, top, right, bottom = clip
+        first = max(top, ceil(min(y for _, y in points)))
+        last = min(bottom - 1, floor(max(y for _, y in points)))
+        edges = [(points[i - 1], points[i]) for i in range(count) if points[i - 1][1] != points[i][1]]
+        for y in range(first, last + 1):
+            crossings = sorted(
+                xa + (y - ya) * (xb - xa) / (yb - ya)
+                for (xa, ya), (xb, yb) in edges
+                if min(ya, yb) <= y < max(ya, yb)
+            )
+            for i in range(0, len(crossings) - 1, 2):
+                start = ceil(crossings[i])
+                end = floor(crossings[i + 1])
+                if start <= end:
+                    rows.append((y, start, end))
+    
+    return _clip(_merge(rows), clip)
@@ -0,0 +1,167 @@
+from collections import OrderedDict
+
+from .bitmap import Bitmap
+from .fonts import Fonts
+from .framebuffer import FrameBuffer
+
+class TextCache:
+    """
+    A least-recently-used cache of rendered strings of text.
+    
+    Each entry is a ready-to-blit bitmap of a whole string in a given font and scale, so
+    drawing a label that was drawn recently costs a single blit. Text widths are cached
+    the same way, so centering text doesn't walk the string again.
+    
+    Methods
+    -------
+    set_max_size(max_size: int)
+        Sets the maximum number of strings kept in the cache.
+        
+    get_stats()
+        Returns the cache's hit and miss statistics.
+        
+    clear()
+        Empties the cache.
+    """
+    
+    __bitmaps: OrderedDict = OrderedDict()
+    __widths: OrderedDict = OrderedDict()
+    __max_size = 256
+    
+    __hits = 0
+    __misses = 0
+    __evictions = 0
+    
+    @staticmethod
+    def set_max_size(max_size: int) -> None:
+        """
+        Sets the maximum number of strings kept in the cache. The least recently used
+        strings are dropped first once the cache is full.
+        
+        Parameters
+        ----------
+        max_size: int
+            The maximum number of strings, or 0 to disable the cache.
+        """
+        if max_size < 0:
+            raise ValueError("The cache size can't be negative")
+        
+        TextCache.__max_size = max_size
+        TextCache.__trim(TextCache.__bitmaps)
+        TextCache.__trim(TextCache.__widths)
+    
+    @staticmethod
+    def get_stats() -> dict[str, int]:
+        """
+        Returns the cache's statistics.
+        
+        Returns
+        -------
+        dict[str, int]
+            hits: the number of lookups that were served from the cache.
+            misses: the number of lookups that had to render the text.
+            evictions: the number of entries dropped to stay within the size limit.
+            size: the number of rendered strings currently in the cache.
+            max_size: the maximum number of strings kept in the cache.
+        """
+        return {
+            "hits": TextCache.__hits,
+            "misses": TextCache.__misses,
+            "evictions": TextCache.__evictions,
+            "size": len(TextCache.__bitmaps),
+            "max_size": TextCache.__max_size,
+        }
+    
+    @staticmethod
+    def clear() -> None:
+        """
+        Empties the cache. This is done automatically when a font is registered.
+        """
+        TextCache.__bitmaps.clear()
+        TextCache.__widths.clear()
+    
+    @staticmethod
+    def __trim(cache: OrderedDict) -> None:
+        while len(cache) > TextCache.__max_size:
+            cache.popitem(last=False)
+            TextCache.__evictions += 1
+    
+    @staticmethod
+    def _get_text(font: str, text: str, scale: int) -> Bitmap:
+        key = (font, text, scale)
+        bitmap = TextCache.__bitmaps.get(key)
+        if bitmap is not None:
+            TextCache.__hits += 1
+            TextCache.__bitmaps.move_to_end(key)
+            return bitmap
+        
+        TextCache.__misses += 1
+        if scale == 1:
+            bitmap = TextCache.__render(font, text)
+        else:
+            bitmap = TextCache.__get_unscaled(font, text).scaled(scale)
+        return TextCache.__add(key, bitmap)
+    
+    @staticmethod
+    def __get_unscaled(font: str, text: str) -> Bitmap:
+        # Scaled text is made from the text at scale 1, which is cached too, but isn't
+        # counted as a lookup of its own
+        key = (font, text, 1)
+        bitmap = TextCache.__bitmaps.get(key)
+        if bitmap is None:
+            return TextCache.__add(key, TextCache.__render(font, text))
+        
+        TextCache.__bitmaps.move_to_end(key)
+        return bitmap
+    
+    @staticmethod
+    def __add(key: tuple, bitmap: Bitmap) -> Bitmap:
+        if TextCache.__max_size:
+            TextCache.__bitmaps[key] = bitmap
+            TextCache.__trim(TextCache.__bitmaps)
+        return bitmap
+    
+    @staticmethod
+    def _get_width(font: str, text: str, scale: int) -> int:
+        key = (font, text, scale)
+        width = TextCache.__widths.get(key)
+        if width is not None:
+            TextCache.__widths.move_to_end(key)
+            return width
+        
+        kerning = Fonts._get_kerning(font)
+        width = 0
+        previous = ""
+        for char in text:
+            width += scale * (Fonts._get_glyph(font, char).width + 1)
+            if kerning:
+                width += scale * kerning.get(previous + char, 0)
+            previous = char
+        
+        if TextCache.__max_size:
+            TextCache.__widths[key] = width
+            TextCache.__trim(TextCache.__widths)
+        return width
+    
+    @staticmethod
+    def __render(font: str, text: str) -> Bitmap:
+        glyphs = [Fonts._get_glyph(font, char) for char in text]
+        
+        # Each glyph is followed by a single column of spacing, adjusted by the font's kerning
+        kerning = Fonts._get_kerning(font)
+        positions = []
+        x = 0
+        for i, glyph in enumerate(glyphs):
+            if kerning and i:
+                x += kerning.get(text[i - 1:i + 1], 0)
+            positions.append(x)
+            x += glyph.width + 1
+        
+        width = max(x, 0)
+        height = max((glyph.height for glyph in glyphs), default=0)
+        
+        run = FrameBuffer(width, height)
+        for glyph, x in zip(glyphs, positions):
+            run.blit(glyph, x, 0)
+        
+        return run.to_bitmap()
@@ -0,0 +1,269 @@
+from collections import OrderedDict
+
+from .fonts import Fonts
+
+
+class LayoutLine:
+    """
+    One line of laid out text.
+    
+    Attributes
+    ----------
+    text: str
+        The text on the line, without the spaces it was wrapped at.
+    
+    x: int
+        The offset of the line from the left of the box, from its alignment.
+    
+    y: int
+        The offset of the line from the top of the box.
+    
+    width: int
+        The width of the line in pixels.
+    
+    positions: tuple[int, ...]
+        The x offset of each character from the start of the line.
+    """
+    
+    __slots__ = ('text', 'x', 'y', 'width', 'positions')
+    
+    def __init__(self, text: str, x: int, y: int, width: int, positions: tuple[int, ...]) -> None:
+        self.text = text
+        self.x = x
+        self.y = y
+        self.width = width
+        self.positions = positions
+    
+    def __repr__(self) -> str:
+        return "LayoutLine({!r}, x={}, y={}, width={})".format(self.text, self.x, self.y, self.width)
+
+
+class Layout:
+    """
+    The result of laying out a block of text: where its lines break, and where each line
+    and character goes. Layouts are cached and shared, so they must not be modified.
+    
+    Attributes
+    ----------
+    lines: tuple[LayoutLine, ...]
+        The lines of text, from top to bottom.
+    
+    width: int
+        The width of the box the lines were aligned in.
+    
+    height: int
+        The height of the lines, from the top of the first to the bottom of the last.
+    
+    truncated: bool
+        Whether some of the text didn't fit and was cut off.
+    """
+    
+    __slots__ = ('lines', 'width', 'height', 'truncated')
+    
+    def __init__(self, lines: tuple[LayoutLine, ...], width: int, height: int, truncated: bool) -> None:
+        self.lines = lines
+        self.width = width
+        self.height = height
+        self.truncated = truncated
+    
+    def __repr__(self) -> str:
+        return "Layout({} lines, {}x{}{})".format(len(self.lines), self.width, self.height, ", truncated" if self.truncated else "")
+
+
+class TextLayout:
+    """
+    Lays out blocks of text in a single pass: breaking them into lines at newlines and,
+    optionally, at spaces to fit a width, cutting off lines that don't fit with an
+    ellipsis, and aligning each line. Character widths include the font's kerning.
+    
+    Layouts are kept in a least-recently-used cache, so laying out the same text in the
+    same box again costs a single lookup.
+    
+    Methods
+    -------
+    set_max_size(max_size: int)
+        Sets the maximum number of layouts kept in the cache.
+    
+    get_stats()
+        Returns the cache's hit and miss statistics.
+    
+    clear()
+        Empties the cache.
+    """
+    
+    __layouts: OrderedDict = OrderedDict()
+    __max_size = 64
+    
+    __hits = 0
+    __misses = 0
+    
+    @staticmethod
+    def set_max_size(max_size: int) -> None:
+        """
+        Sets the maximum number of layouts kept in the cache. The least recently used
+        layouts are dropped first once the cache is full.
+        
+        Parameters
+        ----------
+        max_size: int
+            The maximum number of layouts, or 0 to disable the cache.
+        """
+        if max_size < 0:
+            raise ValueError("The cache size can't be negative")
+        
+        TextLayout.__max_size = max_size
+        while len(TextLayout.__layouts) > max_size:
+            TextLayout.__layouts.popitem(last=False)
+    
+    @staticmethod
+    def get_stats() -> dict[str, int]:
+        """
+        Returns the cache's statistics.
+        
+        Returns
+        -------
+        dict[str, int]
+            hits: the number of layouts that were served from the cache.
+            misses: the number of layouts that had to be worked out.
+            size: the number of layouts currently in the cache.
+            max_size: the maximum number of layouts kept in the cache.
+        """
+        return {
+            "hits": TextLayout.__hits,
+            "misses": TextLayout.__misses,
+            "size": len(TextLayout.__layouts),
+            "max_size": TextLayout.__max_size,
+        }
+    
+    @staticmethod
+    def clear() -> None:
+        """
+        Empties the cache. This is done automatically when a font is registered.
+        """
+        TextLayout.__layouts.clear()
+    
+    @staticmethod
+    def _layout(text: str, width: int, height: int, font: str, scale: int, align: str, wrap: bool, ellipsis: str, line_spacing: int) -> Layout:
+        if align not in ("left", "center", "right"):
+            raise ValueError("align must be \"left\", \"center\" or \"right\"")
+        
+        key = (text, width, height, font, scale, align, wrap, ellipsis, line_spacing)
+        layout = TextLayout.__layouts.get(key)
+        if layout is not None:
+            TextLayout.__hits += 1
+            TextLayout.__layouts.move_to_end(key)
+            return layout
+        
+        TextLayout.__misses += 1
+        layout = TextLayout.__build(text, width, height, font, scale, align, wrap, ellipsis, line_spacing)
+        if TextLayout.__max_size:
+            TextLayout.__layouts[key] = layout
+            if len(TextLayout.__layouts) > TextLayout.__max_size:
+                TextLayout.__layouts.popitem(last=False)
+        return layout
+    
+    @staticmethod
+    def __measure(text: str, font: str, scale: int) -> list[int]:
+        # Returns the x position of each character, followed by the width of the whole
+        # string, the same way TextCache renders it
+        kerning = Fonts._get_kerning(font)
+        positions = []
+        x = 0
+        previous = ""
+        for char in text:
+            if kerning:
+                x += kerning.get(previous + char, 0) * scale
+            positions.append(x)
+            x += (Fonts._get_glyph(font, char).width + 1) * scale
+            previous = char
+        positions.append(max(x, 0))
+        return positions
+    
+    @staticmethod
+    def __break_paragraph(paragraph: str, width: int, font: str, scale: int) -> list[str]:
+        # Greedily fits as many words as possible on each line. Spaces at the breaks are
+        # dropped, and words wider than the whole line are broken between characters
+        positions = TextLayout.__measure(paragraph, font, scale)
+        lines = []
+        start = 0
+        length = len(paragraph)
+        while start < length:
+            # The end of the longest run of characters from start that fits
+            end = start
+            while end < length and positions[end + 1] - positions[start] <= width:
+                end += 1
+            
+            if end == length:
+                lines.append(paragraph[start:end])
+                break
+            
+            space = paragraph.rfind(" ", start, end + 1)
+            if space > start:
+                lines.append(paragraph[start:space].rstrip(" "))
+                start = space + 1
+            else:
+                # At least one character goes on each line, so the loop always moves on
+                end = max(end, start + 1)
+                lines.append(paragraph[start:end])
+                start = end
+            while start < length and paragraph[start] == " ":
+                start += 1
+        
+        return lines or [""]
+    
+    @staticmethod
+    def __truncate(line: str, width: int, font: str, scale: int, ellipsis: str) -> str:
+        # Drops characters from the end of the line until it fits with the ellipsis after it
+        line = line.rstrip(" ")
+        while line:
+            if TextLayout.__measure(line + ellipsis, font, scale)[-1] <= width:
+                return line + ellipsis
+            line = line[:-1].rstrip(" ")
+        return ellipsis if TextLayout.__measure(ellipsis, font, scale)[-1] <= width else ""
+    
+    @staticmethod
+    def __build(text: str, width: int, height: int, font: str, scale: int, align: str, wrap: bool, ellipsis: str, line_spacing: int) -> Layout:
+        texts = []
+        for paragraph in text.split("\n"):
+            if wrap and width is not None:
+                texts.extend(TextLayout.__break_paragraph(paragraph, width, font, scale))
+            else:
+                texts.append(paragraph)
+        
+        # Lines that don't fit in the height are dropped, and the last one that does is
+        # cut off with the ellipsis
+        line_height = Fonts._get_height(font) * scale
+        truncated = False
+        if height is not None:
+            max_lines = max(0, (height + line_spacing) // (line_height + line_spacing))
+            if len(texts) > max_lines:
+                texts = texts[:max_lines]
+                truncated = True
+                if texts and ellipsis:
+                    texts[-1] = TextLayout.__truncate(texts[-1], width if width is not None else 1 << 30, font, scale, ellipsis)
+        
+        if width is not None and not wrap:
+            for i, line in enumerate(texts):
+                if TextLayout.__measure(line, font, scale)[-1] > width:
+                    truncated = True
+                    if ellipsis:
+                        texts[i] = TextLayout.__truncate(line, width, font, scale, ellipsis)
+        
+        measured = [TextLayout.__measure(line, font, scale) for line in texts]
+        box_width = width if width is not None else max((positions[-1] for positions in measured), default=0)
+        
+        lines = []
+        y = 0
+        for line, positions in zip(texts, measured):
+            line_width = positions[-1]
+            if align == "center":
+                x = (box_width - line_width) // 2
+            elif align == "right":
+                x = box_width - line_width
+            else:
+                x = 0
+            lines.append(LayoutLine(line, x, y, line_width, tuple(positions[:-1])))
+            y += line_height + line_spacing
+        
+        total_height = y - line_spacing if lines else 0
+        return Layout(tuple(lines), box_width, total_height, truncated)
@@ -0,0 +1,143 @@
+from collections import deque
+from typing import Callable
+import threading
+
+
+class Transmitter:
+    """
+    A worker thread that sends frames to a display, so the next frame can be drawn while
+    the previous one is still going over the bus.
+    
+    Frames are handed over through a single slot per display. If a new frame arrives before
+    the previous one has started sending, the previous one is stale and gets dropped, so the
+    display always catches up to the latest frame instead of falling behind. Commands, such
+    as contrast changes, are queued separately and are never dropped.
+    
+    Displays that share a bus can share a transmitter by passing their own send function to
+    submit_frame, so their transfers take turns on the bus instead of competing for it.
+    
+    Parameters
+    ----------
+    send_frame: Callable[[bytes], None]
+        The function that sends a frame to the display, used when submit_frame isn't given
+        one. It's only ever called from the worker thread.
+    
+    name: str
+        The name of the worker thread.
+    """
+    
+    def __init__(self, send_frame: Callable[[bytes], None] = None, name: str = "sh1106-transmitter") -> None:
+        self.__send_frame = send_frame
+        
+        self.__condition = threading.Condition()
+        self.__pending_frames = {}
+        self.__pending_commands = deque()
+        self.__busy = False
+        self.__running = True
+        self.__error = None
+        
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        
+        self.__thread = threading.Thread(target=self.__run, name=name, daemon=True)
+        self.__thread.start()
+    
+    def __check_error(self) -> None:
+        # Errors on the worker thread are raised again on the thread that uses the transmitter
+        if self.__error is not None:
+            error, self.__error = self.__error, None
+            raise error
+    
+    def submit_frame(self, frame: bytes, send_frame: Callable[[bytes], None] = None) -> bool:
+        """
+        Queues a frame to be sent, replacing any frame for the same display that hasn't
+        started sending yet.
+        
+        Parameters
+        ----------
+        frame: bytes
+            The frame to send. It must not be modified afterwards.
+        send_frame: Callable[[bytes], None]
+            The function that sends the frame. Defaults to the one the transmitter was
+            created with.
+        
+        Returns
+        -------
+        bool
+            Whether a different frame that hadn't been sent yet was dropped. Replacing a
+            pending frame with the same one doesn't count.
+        """
+        if send_frame is None:
+            send_frame = self.__send_frame
+        
+        self.__check_error()
+        with self.__condition:
+            pending = self.__pending_frames.pop(send_frame, None)
+            dropped = pending is not None and pending is not frame and pending != frame
+            if dropped:
+                self.frames_dropped += 1
+            self.__pending_frames[send_frame] = frame
+            self.__condition.notify_all()
+        return dropped
+    
+    def submit_command(self, command: Callable, *args) -> None:
+        """
+        Queues a function to be called on the worker thread, before the next frame is sent.
+        
+        Parameters
+        ----------
+        command: Callable
+            The function to call.
+        args
+            The arguments to call it with.
+        """
+        self.__check_error()
+        with self.__condition:
+            self.__pending_commands.append((command, args))
+            self.__condition.notify_all()
+    
+    def wait(self) -> None:
+        """
+        Blocks until every queued frame and command has been sent.
+        """
+        with self.__condition:
+            while self.__pending_frames or self.__pending_commands or self.__busy:
+                self.__condition.wait()
+        self.__check_error()
+    
+    def stop(self) -> None:
+        """
+        Sends everything that's queued, then stops the worker thread.
+        """
+        self.wait()
+        with self.__condition:
+            self.__running = False
+            self.__condition.notify_all()
+        self.__thread.join()
+    
+    def __run(self) -> None:
+        while True:
+            with self.__condition:
+                while self.__running and not self.__pending_frames and not self.__pending_commands:
+                    self.__condition.wait()
+                if not self.__running:
+                    return
+                
+                commands = list(self.__pending_commands)
+                self.__pending_commands.clear()
+                frames = list(self.__pending_frames.items())
+                self.__pending_frames.clear()
+                self.__busy = True
+            
+            try:
+                for command, args in commands:
+                    command(*args)
+                for send_frame, frame in frames:
+                    send_frame(frame)
+                    self.frames_sent += 1
+            except Exception as e:
+                self.__error = e
+            
+            with self.__condition:
+                self.__busy = False
+                self.__condition.notify_all()
@@ -0,0 +1,34 @@
+import json
+import argparse
+import sys
+
+from .graphics.assets import compile_json, write_asset_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compiles a JSON file from the image or font generator into a binary asset file')
+    parser.add_argument('-j', '--json', type=str, help='Path to the JSON file made by the image or font generator')
+    parser.add_argument('-o', '--output', type=str, help='Path to the output file')
+    
+    args = parser.parse_args()
+    
+    jsonfile = args.json
+    if jsonfile == None:
+        sys.exit('No JSON file specified')
+        
+    outputfile = args.output
+    if outputfile == None:
+        sys.exit('No output file specified')
+    
+    print("JSON file: {}\nOutput file: {}".format(jsonfile, outputfile))
+    
+    with open(jsonfile) as f:
+        bitmaps = compile_json(json.load(f))
+    
+    for key, bitmap in bitmaps.items():
+        print("Asset: {} | Width: {}, Height: {}".format(key, bitmap.width, bitmap.height))
+    
+    write_asset_file(outputfile, bitmaps)
+        
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+import json
+import argparse
+import hashlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .graphics.assets import compile_json, write_asset_file
+
+# Changing how sheets are converted changes this, so every sheet is rebuilt afterwards
+GENERATOR_VERSION = 1
+
+# The space character added to fonts that don't define one
+_FONT_SPACE = [[5, 11]] + [[0] * 5 for _ in range(11)]
+
+_FORMATS = ("json", "packed", "both")
+
+
+def load_sheet(image_path: str, threshold: int = 255, dither: bool = False):
+    """
+    Loads a reference image, and converts the whole of it to a single-channel image with
+    one byte per pixel, 1 for a lit pixel and 0 for an unlit one.
+    
+    Parameters
+    ----------
+    image_path: str
+        The path to the reference image.
+    threshold: int
+        Pixels are lit when each of their red, green, and blue values is at least this.
+        The default of 255 only lights pure white pixels.
+    dither: bool
+        Whether to dither the image's brightness with Floyd-Steinberg dithering instead,
+        for images with shades of gray, such as photos. The threshold isn't used.
+    """
+    from PIL import Image, ImageChops
+    
+    img = Image.open(image_path)
+    if dither:
+        sheet = img.convert('L').convert('1')
+    else:
+        # The darkest of the three channels is at least the threshold only when all of them are
+        red, green, blue = img.convert('RGB').split()
+        darkest = ImageChops.darker(ImageChops.darker(red, green), blue)
+        sheet = darkest.point(lambda value: 255 if value >= threshold else 0)
+    
+    return sheet.convert('L').point(lambda value: 1 if value else 0)
+
+
+def slice_sheet(sheet, reference: dict[str, list[int]]) -> dict[str, list[list[int]]]:
+    """
+    Cuts the bitmaps out of a sheet loaded with load_sheet, in the format of the JSON files
+    the framework loads: a [width, height] row followed by one row of pixels per line.
+    
+    Parameters
+    ----------
+    sheet: PIL.Image.Image
+        The sheet, from load_sheet.
+    reference: dict[str, list[int]]
+        The name of each bitmap, and its x, y, width, and height in the sheet.
+    """
+    bitmaps = {}
+    for key, (x, y, w, h) in reference.items():
+        x, y, w, h = int(x), int(y), int(w), int(h)
+        data = sheet.crop((x, y, x + w, y + h)).tobytes()
+        bitmaps[key] = [[w, h]] + [list(data[row * w:(row + 1) * w]) for row in range(h)]
+    return bitmaps
+
+
+def build_sheet(image_path: str, json_path: str, output_path: str, kind: str = "image", threshold: int = 255, dither: bool = False, format: str = "json", pretty: bool = False) -> dict[str, list[list[int]]]:
+    """
+    Converts one reference image and its JSON reference file, and writes the output.
+    
+    Parameters
+    ----------
+    image_path: str
+        The path to the reference image.
+    json_path: str
+        The path to the JSON reference file.
+    output_path: str
+        The path of the output file.
+    kind: str
+        "image" or "font". Fonts get a blank space character if they don't define one.
+    threshold: int
+        The threshold for a pixel to be lit, as in load_sheet.
+    dither: bool
+        Whether to dither the image, as in load_sheet.
+    format: str
+        "json" for a JSON file, "packed" for a compiled binary asset file, or "both" for a
+        JSON file at the output path and a binary file next to it, with a .sh1b extension.
+    pretty: bool
+        Whether to write the JSON file with one row of pixels per line.
+    
+    Returns
+    -------
+    dict[str, list[list[int]]]
+        The bitmaps that were written.
+    """
+    if format not in _FORMATS:
+        raise ValueError("Unknown output format \"{}\"".format(format))
+    
+    with open(json_path) as f:
+        reference = json.load(f)
+    
+    bitmaps = slice_sheet(load_sheet(image_path, threshold, dither), reference)
+    if kind == "font" and ' ' not in bitmaps:
+        bitmaps[' '] = _FONT_SPACE
+    
+    if format in ("json", "both"):
+        _write_json(output_path, bitmaps, pretty)
+    if format == "packed":
+        write_asset_file(output_path, compile_json(bitmaps))
+    elif format == "both":
+        write_asset_file(os.path.splitext(output_path)[0] + '.sh1b', compile_json(bitmaps))
+    
+    return bitmaps
+
+
+def _write_json(path: str, bitmaps: dict[str, list[list[int]]], pretty: bool) -> None:
+    with open(path, 'w') as f:
+        if not pretty:
+            json.dump(bitmaps, f)
+            return
+        
+        f.write('{\n')
+        for i, (key, rows) in enumerate(bitmaps.items()):
+            f.write('  {}: [\n'.format(json.dumps(key)))
+            f.write(',\n'.join('    ' + json.dumps(row, separators=(',', ':')) for row in rows))
+            f.write('\n  ]{}\n'.format(',' if i < len(bitmaps) - 1 else ''))
+        f.write('}\n')
+
+
+def _outputs(job: dict) -> list[str]:
+    # The files a job writes
+    if job["format"] == "both":
+        return [job["output"], os.path.splitext(job["output"])[0] + '.sh1b']
+    return [job["output"]]
+
+
+def _job_hash(job: dict) -> str:
+    # Hashes everything the output depends on: both input files, and the settings
+    digest = hashlib.sha256()
+    for path in (job["image"], job["json"]):
+        with open(path, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    settings = {key: job[key] for key in ("kind", "threshold", "dither", "format", "pretty")}
+    digest.update(json.dumps([GENERATOR_VERSION, settings], sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def _run_job(job: dict) -> int:
+    # Runs in a worker process, so it takes and returns only plain values
+    bitmaps = build_sheet(job["image"], job["json"], job["output"], job["kind"], job["threshold"], job["dither"], job["format"], job["pretty"])
+    return len(bitmaps)
+
+
+def _load_manifest(path: str, defaults: dict) -> list[dict]:
+    # A manifest is a JSON list of sheets, each with "image", "json" and "output" paths
+    # relative to the manifest, and optionally its own "type", "threshold", "dither", "format" and "pretty"
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path) as f:
+        entries = json.load(f)
+    
+    jobs = []
+    for entry in entries:
+        job = dict(defaults)
+        job.update({key: entry[key] for key in ("threshold", "dither", "format", "pretty") if key in entry})
+        job["kind"] = entry.get("type", defaults["kind"])
+        for key in ("image", "json", "output"):
+            if key not in entry:
+                sys.exit('Manifest entry {} has no "{}" path'.format(entry, key))
+            job[key] = os.path.join(base, entry[key])
+        jobs.append(job)
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generates LCD bitmaps from one or more reference images')
+    parser.add_argument('-i', '--image', type=str, help='Path to the image file')
+    parser.add_argument('-j', '--json', type=str, help='Path to the JSON file')
+    parser.add_argument('-o', '--output', type=str, help='Path to the output file')
+    parser.add_argument('-b', '--batch', type=str, help='Path to a JSON manifest listing many sheets to generate')
+    parser.add_argument('-t', '--type', type=str, default='image', choices=('image', 'font'), help='Whether the sheets are images or fonts')
+    parser.add_argument('--threshold', type=int, default=255, help='The value each of a pixel\'s red, green and blue must reach for it to be lit (default 255)')
+    parser.add_argument('--dither', action='store_true', help='Dither the image\'s brightness instead of using a threshold')
+    parser.add_argument('-f', '--format', type=str, default='json', choices=_FORMATS, help='Output a JSON file, a compiled binary file, or both')
+    parser.add_argument('--pretty', action='store_true', help='Write JSON files with one row of pixels per line')
+    parser.add_argument('-p', '--processes', type=int, default=None, help='The number of processes to generate sheets with (default: one per CPU)')
+    parser.add_argument('--cache', type=str, help='Path to the file recording what was generated, for skipping unchanged sheets')
+    parser.add_argument('--force', action='store_true', help='Regenerate every sheet, even unchanged ones')
+    
+    args = parser.parse_args()
+    
+    defaults = {"kind": args.type, "threshold": args.threshold, "dither": args.dither, "format": args.format, "pretty": args.pretty}
+    if args.batch is not None:
+        jobs = _load_manifest(args.batch, defaults)
+        cachefile = args.cache or os.path.join(os.path.dirname(os.path.abspath(args.batch)), '.sh1106-assets-cache.json')
+    else:
+        if args.image == None:
+            sys.exit('No image file specified')
+        if args.json == None:
+            sys.exit('No JSON file specified')
+        if args.output == None:
+            sys.exit('No output file specified')
+        jobs = [dict(defaults, image=args.image, json=args.json, output=args.output)]
+        cachefile = args.cache or os.path.join(os.path.dirname(os.path.abspath(args.output)), '.sh1106-assets-cache.json')
+    
+    try:
+        with open(cachefile) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    
+    # Sheets whose inputs and settings haven't changed since they were last generated are skipped
+    pending = []
+    for job in jobs:
+        job_hash = _job_hash(job)
+        key = os.path.abspath(job["output"])
+        if not args.force and cache.get(key) == job_hash and all(os.path.exists(path) for path in _outputs(job)):
+            print("Up to date: {}".format(job["output"]))
+            continue
+        pending.append((job, key, job_hash))
+    
+    if len(pending) > 1 and args.processes != 1:
+        with ProcessPoolExecutor(max_workers=args.processes) as executor:
+            counts = list(executor.map(_run_job, [job for job, _, _ in pending]))
+    else:
+        counts = [_run_job(job) for job, _, _ in pending]
+    
+    for (job, key, job_hash), count in zip(pending, counts):
+        print("Generated {} ({} {}s) from {}".format(job["output"], count, "character" if job["kind"] == "font" else "image", job["image"]))
+        cache[key] = job_hash
+    
+    if pending:
+        with open(cachefile, 'w') as f:
+            json.dump(cache, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,18 @@
-from .graphics.drawing import Drawing
 from .graphics.fonts import Fonts
 from .graphics.images import Images
+from .graphics.text_cache import TextCache
+from .graphics.text_layout import TextLayout
+from .graphics.devices import Device
 from .framework.constants import Constants
+from .framework.scheduler import FrameScheduler
+from .framework.profiler import Profiler
+from .framework.recorder import Recorder
+from .framework.input import Input
 from .framework.states.state_manager import StateManager, State
 
 from abc import ABC
-import time
-
-# Seconds per frame
-_SPF = 1 / Constants.FPS
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 
 class SH1106Framework(ABC):
     """
@@ -17,21 +21,35 @@ class SH1106Framework(ABC):
     
     Methods
     -------
-    register_routes(default_route: str, routes: dict[str, State])
+    register_routes(default_route: str, routes: dict[str, State], preload: list[str], loading_route: str)
         Registers page routes for the framework to reference.
         
     register_font(font_name: str, filepath: str)
         Registers a font for the framework to use.
         
+    register_kerning(font_name: str, pairs: dict[str, int])
+        Registers kerning pairs for a font.
+        
     register_images(filepath: str)
         Registers images for the framework to use.
         
-    begin(port: int, address: int)
+    preload_assets(images: list[str], fonts: list[str] | dict[str, str])
+        Decodes images and fonts ahead of drawing them.
+        
+    begin(port: int, address: int, device: Device, frames: int, fps: float, scheduler: FrameScheduler, pipelined: bool, backend: str, displays: list[StateManager])
         Starts the framework's main loop.
+    
+    run(port: int, address: int, device: Device, frames: int, fps: float, scheduler: FrameScheduler, pipelined: bool, backend: str, displays: list[StateManager])
+        Runs the framework's main loop as a coroutine on an asyncio event loop.
+    
+    next_frame()
+        Waits until the next frame has been drawn and sent, when running with run.
     """
     
+    __frame_waiters: list = []
+    
     @staticmethod
-    def begin(port: int, address: int) -> None:
+    def begin(port: int = None, address: int = None, device: Device = None, frames: int = None, fps: float = Constants.FPS, scheduler: FrameScheduler = None, pipelined: bool = False, backend: str = "python", displays: list[StateManager] = None) -> None:
         """
         Starts the framework's main loop.
 
@@ -42,30 +60,185 @@ class SH1106Framework(ABC):
             
         address: int
             The I2C address to use for the SH1106 display.
+            
+        device: Device
+            The display backend to draw to, such as a VirtualDevice for running without
+            any hardware. If it's given, port and address are ignored. Defaults to a real
+            SH1106 display on the given I2C port and address.
+            
+        frames: int
+            The number of frames to run before returning. Defaults to running forever.
+            
+        fps: float
+            The target number of frames per second.
+            
+        scheduler: FrameScheduler
+            The scheduler that paces the main loop, for finer control over the frame rate,
+            late frames, and idling. If it's given, fps is ignored.
+            
+        pipelined: bool
+            Whether to send frames to the display on a separate thread, so that the next
+            frame is drawn while the previous one is being sent. If the display can't keep
+            up, frames that haven't started sending are dropped in favor of newer ones.
+            
+        backend: str
+            The drawing backend, either "python" or "numpy". The NumPy backend draws with
+            whole-array operations, and falls back to the Python backend if NumPy isn't installed.
+            
+        displays: list[StateManager]
+            The displays to run, for driving several at once, such as panels on more than
+            one I2C bus. Each is a StateManager created with its own Drawing, with its
+            routes registered. Every frame, input events go to each display's current
+            state, and each display is updated and drawn in turn. If it's given, port,
+            address, device, pipelined and backend are ignored, since each Drawing was
+            created with its own.
         """
         
-        Drawing._init(port=port, address=address)
+        displays = SH1106Framework.__init_displays(port, address, device, pipelined, backend, displays)
         
-        next_frame_time = time.time()
-
-        while True:
-            current_time = time.time()
+        if scheduler is None:
+            scheduler = FrameScheduler(fps=fps)
+        
+        # Input is polled on its own thread, and wakes the scheduler so an idle frame rate doesn't delay it
+        Input._start(on_event=scheduler.wake)
+        
+        try:
+            frame_count = 0
+            while frames is None or frame_count < frames:
+                # Sleeps until the frame is due, rather than spinning on the clock
+                delta_time = scheduler.wait()
+                
+                if Profiler._enabled:
+                    Profiler._start_frame()
+                if Recorder._recording:
+                    Recorder._start_frame()
+                
+                StateManager._handle_input(displays)
+                for step in scheduler.get_update_steps(delta_time):
+                    if Recorder._recording:
+                        Recorder._record_step(step)
+                    for display in displays:
+                        display._update(step)
+                changed = False
+                for display in displays:
+                    changed = display._render() or changed
+                StateManager._check_hooks()
+                
+                if Profiler._enabled:
+                    Profiler._end_frame(scheduler.frame_budget)
+                if Recorder._recording:
+                    Recorder._end_frame(displays)
+                
+                scheduler.frame_done(changed)
+                frame_count += 1
+        finally:
+            Input._stop()
+            for display in displays:
+                display.get_drawing()._stop()
+    
+    @staticmethod
+    async def run(port: int = None, address: int = None, device: Device = None, frames: int = None, fps: float = Constants.FPS, scheduler: FrameScheduler = None, pipelined: bool = False, backend: str = "python", displays: list[StateManager] = None) -> None:
+        """
+        Runs the framework's main loop as a coroutine, so the display can share an asyncio
+        event loop with other tasks. The loop waits for each frame without blocking the event
+        loop, and sends frames to the display on a worker thread so other tasks keep running
+        while they go over the bus.
+        
+        The methods of states run with it can be coroutines, which are awaited before the
+        frame moves on.
+        
+        The parameters are the same as begin's.
+        """
+        
+        displays = SH1106Framework.__init_displays(port, address, device, pipelined, backend, displays)
+        
+        if scheduler is None:
+            scheduler = FrameScheduler(fps=fps)
+        
+        Input._start(on_event=scheduler.wake)
+        
+        # A single worker keeps frames in order. Pipelined frames already go to the transmitter thread
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sh1106-transfer")
+        
+        try:
+            # Coroutine init and enter methods of the initial route were called when the routes were registered
+            await StateManager._await_hooks()
             
-            if current_time >= next_frame_time:
-                delta_time = current_time - next_frame_time + _SPF
-                StateManager._update(delta_time)
-                StateManager._render()
-
-                # Calculate the next frame's start time
-                next_frame_time = current_time + _SPF
-
-                # This method controls the loop's execution rate to approximately match the desired FPS,
-                # while minimizing CPU usage by not constantly checking the time.
+            frame_count = 0
+            while frames is None or frame_count < frames:
+                delta_time = await scheduler.wait_async()
+                
+                if Profiler._enabled:
+                    Profiler._start_frame()
+                if Recorder._recording:
+                    Recorder._start_frame()
+                
+                await StateManager._handle_input_async(displays)
+                for step in scheduler.get_update_steps(delta_time):
+                    if Recorder._recording:
+                        Recorder._record_step(step)
+                    for display in displays:
+                        await display._update_async(step)
+                changed = False
+                for display in displays:
+                    if not await display._draw_async():
+                        continue
+                    drawing = display.get_drawing()
+                    if drawing._is_pipelined():
+                        changed = drawing._render() or changed
+                    else:
+                        changed = await loop.run_in_executor(executor, drawing._render) or changed
+                
+                if Profiler._enabled:
+                    Profiler._end_frame(scheduler.frame_budget)
+                if Recorder._recording:
+                    Recorder._end_frame(displays)
+                
+                scheduler.frame_done(changed)
+                frame_count += 1
+                
+                waiters, SH1106Framework.__frame_waiters = SH1106Framework.__frame_waiters, []
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(frame_count)
+        finally:
+            Input._stop()
+            executor.shutdown()
+            for display in displays:
+                display.get_drawing()._stop()
+    
+    @staticmethod
+    def __init_displays(port: int, address: int, device: Device, pipelined: bool, backend: str, displays: list[StateManager]) -> list[StateManager]:
+        # A single display is set up here, with the routes registered through register_routes
+        if displays is not None:
+            return list(displays)
         
+        display = StateManager._current
+        display.get_drawing()._init(port=port, address=address, device=device, pipelined=pipelined, backend=backend)
+        return [display]
+    
     @staticmethod
-    def register_routes(initial_route: str, routes: dict[str, State]) -> None:
+    async def next_frame() -> int:
         """
-        Registers page routes for the framework to reference.
+        Waits until the next frame has been drawn and sent to the display, when the
+        framework is running with run. This lets other tasks run in step with the display.
+        
+        Returns
+        -------
+        int
+            The number of frames that have run so far.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        SH1106Framework.__frame_waiters.append(waiter)
+        return await waiter
+        
+    @staticmethod
+    def register_routes(initial_route: str, routes: dict[str, State], preload: list[str] = None, loading_route: str = None) -> None:
+        """
+        Registers page routes for the framework to reference. When running several
+        displays, each display's routes are registered with its own
+        StateManager.register_routes instead.
         
         Parameters
         ----------
@@ -74,8 +247,16 @@ class SH1106Framework(ABC):
             
         routes: dict[str, State]
             A dictionary of routes and their corresponding states.
+            
+        preload: list[str]
+            Routes whose init methods are run on a background thread straight away, so
+            entering them later doesn't hold up a frame.
+            
+        loading_route: str
+            A route to show while switching to a route that's still being initialized in
+            the background. Defaults to keeping the current route on the screen.
         """
-        StateManager._init(initial_route, routes)
+        StateManager.register_routes(initial_route, routes, preload, loading_route)
     
     @staticmethod
     def register_font(font_name: str, filepath: str) -> None:
@@ -93,6 +274,28 @@ class SH1106Framework(ABC):
         """
         
         Fonts._register_font(font_name, filepath)
+        TextCache.clear()
+        TextLayout.clear()
+    
+    @staticmethod
+    def register_kerning(font_name: str, pairs: dict[str, int]) -> None:
+        """
+        Registers kerning pairs for a font, which adjust the spacing between particular
+        pairs of characters. It replaces any kerning registered for the font before, and
+        has to be done after the font itself is registered.
+        
+        Parameters
+        ----------
+        font_name: str
+            The name of the font.
+        pairs: dict[str, int]
+            Maps each pair of characters, such as "AV", to the number of pixels to move
+            the second character by. Negative numbers move it closer to the first.
+        """
+        
+        Fonts._set_kerning(font_name, pairs)
+        TextCache.clear()
+        TextLayout.clear()
         
     @staticmethod
     def register_images(filepath: str) -> None:
@@ -107,4 +310,24 @@ class SH1106Framework(ABC):
             The filepath to the JSON file containing the images.
         """
         
-        Images._register_images(filepath)
\ No newline at end of file
+        Images._register_images(filepath)
+    
+    @staticmethod
+    def preload_assets(images: list[str] = (), fonts: list[str] | dict[str, str] = ()) -> None:
+        """
+        Decodes registered images and fonts into the AssetCache ahead of drawing them, such
+        as while a splash screen is shown. Assets are otherwise decoded the first time
+        they're drawn. To preload the assets of a particular state whenever it's entered,
+        list them in its preload_images and preload_fonts attributes instead.
+        
+        Parameters
+        ----------
+        images: list[str]
+            The names of the images to decode.
+        fonts: list[str] | dict[str, str]
+            The names of the fonts to decode every character of, or a dict of font names
+            to the characters of each to decode.
+        """
+        
+        Images._preload(images)
+        Fonts._preload(fonts)
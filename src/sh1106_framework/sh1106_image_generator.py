@@ -2,32 +2,7 @@ import json
 import argparse
 import sys
 
-from PIL import Image
-
-
-def __get_pixel_data(image_path):
-    # Open the image
-    img = Image.open(image_path)
-    
-    # Convert the image to RGB (if it's not already in that format)
-    img = img.convert('RGB')
-    
-    # Initialize an empty 2D list for the pixel data
-    pixels = []
-    
-    # Get the size of the image
-    width, height = img.size
-    
-    # Loop through each pixel of the image
-    for y in range(height):
-        row = []
-        for x in range(width):
-            # Get the RGB values of the pixel
-            pixel = img.getpixel((x, y))
-            row.append(pixel)
-        pixels.append(row)
-    
-    return pixels
+from .sh1106_asset_generator import build_sheet
 
 
 def main():
@@ -35,6 +10,8 @@ def main():
     parser.add_argument('-i', '--image', type=str, help='Path to the image file')
     parser.add_argument('-j', '--json', type=str, help='Path to the JSON file')
     parser.add_argument('-o', '--output', type=str, help='Path to the output file')
+    parser.add_argument('--threshold', type=int, default=255, help='The value each of a pixel\'s red, green and blue must reach for it to be lit (default 255)')
+    parser.add_argument('--dither', action='store_true', help='Dither the image\'s brightness instead of using a threshold')
     
     args = parser.parse_args()
     
@@ -51,38 +28,16 @@ def main():
         sys.exit('No output file specified')
 
     
-    print("Image file: {}\JSON file: {}".format(imagefile, jsonfile))
+    print("Image file: {}\nJSON file: {}".format(imagefile, jsonfile))
 
-    pixels = __get_pixel_data(imagefile)
-        
-    bitmap = {}
-        
+    # The whole sheet is thresholded at once, then each bitmap is cut out of it
+    build_sheet(imagefile, jsonfile, outputfile, kind="image", threshold=args.threshold, dither=args.dither)
+    
     with open(jsonfile) as f:
         data = json.load(f)
         
         for key in data.keys():
             print("Image: {} | X: {}, Y: {}, Width: {}, Height: {}".format(key, data[key][0], data[key][1], data[key][2], data[key][3]))
-            
-            x = int(data[key][0])
-            y = int(data[key][1])
-            w = int(data[key][2])
-            h = int(data[key][3])
-            
-            rows = []
-            rows.append([w, h])
-            for y1 in range(y, y+h):
-                row = []
-                for x1 in range(x, x+w):
-                    if pixels[y1][x1] == (255, 255, 255):
-                        row.append(1)
-                    else:
-                        row.append(0)
-                rows.append(row)
-            
-            bitmap[key] = rows
-    
-    with open(outputfile, 'w') as f:
-        json.dump(bitmap, f)
         
 if __name__ == "__main__":
     main()
\ No newline at end of file
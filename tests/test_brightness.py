@@ -0,0 +1,138 @@
+from types import SimpleNamespace
+
+import pytest
+
+from sh1106_framework.graphics.brightness import Brightness
+
+
+def idle_brightness(contrast=200):
+    # Dims after 10 seconds without input, and turns off after 20, fading for a second each time
+    brightness = Brightness(contrast)
+    brightness.set_auto_dim(dim_after=10, dim_contrast=32, sleep_after=20, fade=1.0)
+    brightness.wake(now=0.0)
+    return brightness
+
+
+def test_dims_then_sleeps_then_wakes():
+    brightness = idle_brightness()
+    brightness._update(now=9.9)
+    assert brightness.get_contrast(now=9.9) == 200
+    
+    brightness._update(now=10.0)
+    assert brightness.get_contrast(now=10.5) == 116
+    assert brightness.get_contrast(now=11.0) == 32
+    assert not brightness.is_asleep()
+    
+    brightness._update(now=20.0)
+    assert brightness.is_asleep()
+    assert brightness.get_contrast(now=20.5) == 16
+    assert brightness.get_contrast(now=21.0) == 0
+    
+    brightness.wake(now=30.0)
+    assert not brightness.is_asleep()
+    assert brightness.is_on(now=30.0)
+    assert brightness.get_contrast(now=30.5) == 100
+    assert brightness.get_contrast(now=31.0) == 200
+    
+    # Waking restarts the wait before dimming
+    brightness._update(now=39.9)
+    assert brightness.get_contrast(now=39.9) == 200
+    brightness._update(now=40.0)
+    assert brightness.get_contrast(now=41.0) == 32
+
+
+def test_is_on_turns_false_only_once_the_fade_out_finishes():
+    brightness = idle_brightness()
+    brightness._update(now=20.0)
+    assert brightness.is_asleep()
+    assert brightness.is_on(now=20.0)
+    assert brightness.is_on(now=20.999)
+    assert not brightness.is_on(now=21.0)
+    
+    # Without a fade, it turns off straight away
+    brightness = Brightness(200)
+    brightness.set_auto_dim(sleep_after=0, fade=0)
+    brightness.wake(now=0.0)
+    brightness._update(now=5.0)
+    assert not brightness.is_on(now=5.0)
+    assert brightness.get_contrast(now=5.0) == 0
+
+
+def test_set_contrast_while_dimmed_is_capped_at_the_dimmed_contrast():
+    brightness = idle_brightness()
+    brightness._update(now=10.0)
+    brightness.set_contrast(100, now=11.0)
+    assert brightness.get_contrast(now=11.0) == 32
+    
+    # A contrast below the dimmed one applies straight away
+    brightness.set_contrast(16, now=12.0)
+    assert brightness.get_contrast(now=12.0) == 16
+    
+    brightness.set_contrast(100, now=13.0)
+    brightness.wake(now=14.0)
+    assert brightness.get_contrast(now=15.0) == 100
+
+
+def test_set_contrast_while_asleep_applies_once_woken():
+    brightness = idle_brightness()
+    brightness._update(now=20.0)
+    brightness.set_contrast(150, duration=0.5, now=22.0)
+    assert brightness.get_contrast(now=22.0) == 0
+    assert not brightness.is_on(now=22.0)
+    
+    brightness.wake(now=30.0)
+    assert brightness.get_contrast(now=31.0) == 150
+
+
+def test_set_contrast_fades_from_the_contrast_part_way_through_a_fade():
+    brightness = Brightness(0)
+    brightness.set_contrast(200, duration=2.0, now=0.0)
+    assert brightness.get_contrast(now=1.0) == 100
+    brightness.set_contrast(0, duration=1.0, now=1.0)
+    assert brightness.get_contrast(now=1.5) == 50
+    assert brightness.get_contrast(now=2.0) == 0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # The time of day the schedule sees, as (hours, minutes)
+    now = SimpleNamespace(time=(0, 0))
+    monkeypatch.setattr("time.localtime", lambda *args: SimpleNamespace(tm_hour=now.time[0], tm_min=now.time[1]))
+    return now
+
+
+@pytest.mark.parametrize("time_of_day, contrast", [
+    ((0, 0), 32), ((3, 0), 32), ((6, 59), 32), ((7, 0), 255), ((12, 0), 255), ((22, 29), 255), ((22, 30), 32), ((23, 59), 32),
+])
+def test_schedule_wraps_around_midnight(clock, time_of_day, contrast):
+    clock.time = time_of_day
+    brightness = Brightness(100)
+    brightness.set_schedule({"22:30": 32, "07:00": 255}, fade=60.0)
+    
+    # The first time, it goes straight to the contrast it should be at
+    brightness._update(now=0.0)
+    assert brightness.get_contrast(now=0.0) == contrast
+
+
+def test_schedule_fades_at_each_change(clock):
+    clock.time = (22, 29)
+    brightness = Brightness(100)
+    brightness.set_schedule({"07:00": 255, "22:30": 31}, fade=60.0)
+    brightness._update(now=0.0)
+    assert brightness.get_contrast(now=0.0) == 255
+    
+    clock.time = (22, 30)
+    brightness._update(now=60.0)
+    assert brightness.get_contrast(now=90.0) == 143
+    assert brightness.get_contrast(now=120.0) == 31
+    
+    # Past midnight, the last change of the day before still applies
+    clock.time = (0, 1)
+    brightness._update(now=200.0)
+    assert brightness.get_contrast(now=200.0) == 31
+
+
+@pytest.mark.parametrize("schedule", [{"24:00": 10}, {"7": 10}, {"07:60": 10}, {"07:00": 256}])
+def test_invalid_schedules_raise(schedule):
+    with pytest.raises(ValueError):
+        Brightness().set_schedule(schedule)
@@ -0,0 +1,245 @@
+import random
+
+import pytest
+
+from sh1106_framework.graphics.bitmap import Bitmap
+from sh1106_framework.graphics.devices import VirtualDevice
+from sh1106_framework.graphics.drawing import Drawing
+from sh1106_framework.graphics.framebuffer import COMPOSITE_MODES, INVERT, FrameBuffer, diff_pages
+
+SIZES = [(128, 64), (37, 21), (8, 3)]
+
+
+class PixelModel:
+    # A framebuffer kept as one value per pixel, drawing one pixel at a time, to check
+    # the packed framebuffer against
+    
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.pixels = [[0] * width for _ in range(height)]
+        self.clip = (0, 0, width, height)
+    
+    def set_clip(self, x, y, width, height):
+        x0, y0 = max(0, x), max(0, y)
+        self.clip = (x0, y0, max(x0, min(self.width, x + width)), max(y0, min(self.height, y + height)))
+    
+    def set_pixel(self, x, y, color):
+        left, top, right, bottom = self.clip
+        if left <= x < right and top <= y < bottom:
+            if color == INVERT:
+                self.pixels[y][x] ^= 1
+            else:
+                self.pixels[y][x] = 1 if color else 0
+    
+    def fill_rect(self, x, y, width, height, color=1):
+        for py in range(y, y + height):
+            for px in range(x, x + width):
+                self.set_pixel(px, py, color)
+    
+    def blit(self, bitmap, x, y, color=1, scale=1):
+        for py in range(bitmap.height * scale):
+            for px in range(bitmap.width * scale):
+                if bitmap.get_pixel(px // scale, py // scale):
+                    self.set_pixel(x + px, y + py, color)
+    
+    def composite(self, source, x, y, mode="or"):
+        for py in range(source.height):
+            for px in range(source.width):
+                lit = source.get_pixel(px, py)
+                if mode == "or" and lit:
+                    self.set_pixel(x + px, y + py, 1)
+                elif mode == "xor" and lit:
+                    self.set_pixel(x + px, y + py, INVERT)
+                elif mode == "and" and not lit:
+                    self.set_pixel(x + px, y + py, 0)
+                elif mode == "copy":
+                    self.set_pixel(x + px, y + py, lit)
+    
+    def to_bytes(self):
+        # Packs the pixels the way the SH1106's display RAM lays them out
+        data = bytearray(((self.height + 7) // 8) * self.width)
+        for y in range(self.height):
+            for x in range(self.width):
+                if self.pixels[y][x]:
+                    data[(y >> 3) * self.width + x] |= 1 << (y & 7)
+        return bytes(data)
+
+
+def random_bitmap(generator, width, height):
+    return Bitmap.from_rows([[generator.randint(0, 1) for _ in range(width)] for _ in range(height)])
+
+
+def random_position(generator, framebuffer, width, height):
+    # Anywhere the shape at least partly overlaps the framebuffer, or just misses it
+    return generator.randint(-width - 2, framebuffer.width + 2), generator.randint(-height - 2, framebuffer.height + 2)
+
+
+def test_pixels_are_packed_in_pages_of_8_rows():
+    framebuffer = FrameBuffer(16, 16)
+    framebuffer.set_pixel(3, 0, 1)
+    framebuffer.set_pixel(3, 7, 1)
+    framebuffer.set_pixel(5, 9, 1)
+    assert framebuffer.buffer[3] == 0b10000001
+    assert framebuffer.buffer[16 + 5] == 0b00000010
+    assert framebuffer.get_page(1)[5] == 0b00000010
+    assert framebuffer.get_pixel(5, 9) == 1 and framebuffer.get_pixel(5, 8) == 0
+
+
+@pytest.mark.parametrize("width, height", SIZES)
+def test_set_pixel_matches_model(width, height):
+    generator = random.Random(1)
+    framebuffer, model = FrameBuffer(width, height), PixelModel(width, height)
+    for _ in range(500):
+        x, y = generator.randint(-3, width + 2), generator.randint(-3, height + 2)
+        color = generator.choice((0, 1, INVERT))
+        framebuffer.set_pixel(x, y, color)
+        model.set_pixel(x, y, color)
+    assert bytes(framebuffer.buffer) == model.to_bytes()
+
+
+@pytest.mark.parametrize("width, height", SIZES)
+def test_fill_rect_matches_model(width, height):
+    generator = random.Random(2)
+    framebuffer, model = FrameBuffer(width, height), PixelModel(width, height)
+    for _ in range(200):
+        w, h = generator.randint(0, 40), generator.randint(0, 20)
+        x, y = random_position(generator, framebuffer, w, h)
+        color = generator.choice((0, 1, INVERT))
+        framebuffer.fill_rect(x, y, w, h, color)
+        model.fill_rect(x, y, w, h, color)
+        assert bytes(framebuffer.buffer) == model.to_bytes()
+
+
+@pytest.mark.parametrize("width, height", SIZES)
+def test_blit_matches_model_at_unaligned_and_negative_origins(width, height):
+    generator = random.Random(3)
+    framebuffer, model = FrameBuffer(width, height), PixelModel(width, height)
+    for _ in range(200):
+        bitmap = random_bitmap(generator, generator.randint(1, 20), generator.randint(1, 19))
+        scale = generator.choice((1, 1, 2, 3))
+        x, y = random_position(generator, framebuffer, bitmap.width * scale, bitmap.height * scale)
+        color = generator.choice((0, 1, INVERT))
+        framebuffer.blit(bitmap, x, y, color, scale)
+        model.blit(bitmap, x, y, color, scale)
+        assert bytes(framebuffer.buffer) == model.to_bytes()
+
+
+@pytest.mark.parametrize("mode", COMPOSITE_MODES)
+@pytest.mark.parametrize("width, height", SIZES)
+def test_composite_matches_model_at_unaligned_and_negative_origins(mode, width, height):
+    generator = random.Random(4)
+    framebuffer, model = FrameBuffer(width, height), PixelModel(width, height)
+    framebuffer.fill_rect(0, 0, width, height // 2)
+    model.fill_rect(0, 0, width, height // 2)
+    for _ in range(100):
+        source = random_bitmap(generator, generator.randint(1, 20), generator.randint(1, 19))
+        if generator.random() < 0.5:
+            # A framebuffer is composited the same way as a bitmap
+            other = FrameBuffer(source.width, source.height)
+            other.blit(source, 0, 0)
+            source = other
+        x, y = random_position(generator, framebuffer, source.width, source.height)
+        framebuffer.composite(source, x, y, mode)
+        model.composite(source, x, y, mode)
+        assert bytes(framebuffer.buffer) == model.to_bytes()
+
+
+def test_drawing_is_kept_to_the_clip_rectangle():
+    generator = random.Random(5)
+    framebuffer, model = FrameBuffer(37, 21), PixelModel(37, 21)
+    for _ in range(200):
+        clip = (generator.randint(-5, 30), generator.randint(-5, 18), generator.randint(0, 40), generator.randint(0, 20))
+        framebuffer.set_clip(*clip)
+        model.set_clip(*clip)
+        assert framebuffer.clip == model.clip
+        
+        bitmap = random_bitmap(generator, generator.randint(1, 12), generator.randint(1, 12))
+        x, y = random_position(generator, framebuffer, bitmap.width, bitmap.height)
+        operation = generator.choice(("set_pixel", "fill_rect", "blit", "composite"))
+        if operation == "set_pixel":
+            arguments = (x, y, generator.choice((0, 1, INVERT)))
+        elif operation == "fill_rect":
+            arguments = (x, y, bitmap.width, bitmap.height, generator.choice((0, 1, INVERT)))
+        elif operation == "blit":
+            arguments = (bitmap, x, y, generator.choice((0, 1, INVERT)))
+        else:
+            arguments = (bitmap, x, y, generator.choice(COMPOSITE_MODES))
+        getattr(framebuffer, operation)(*arguments)
+        getattr(model, operation)(*arguments)
+        assert bytes(framebuffer.buffer) == model.to_bytes()
+
+
+def test_bits_below_the_last_row_stay_off():
+    framebuffer = FrameBuffer(10, 13)
+    framebuffer.fill_rect(-5, -5, 20, 20)
+    framebuffer.blit(Bitmap.from_rows([[1] * 10] * 16), 0, 5)
+    assert all(byte == 0b00011111 for byte in framebuffer.get_page(1))
+
+
+def test_unknown_composite_mode_raises():
+    with pytest.raises(ValueError):
+        FrameBuffer(8, 8).composite(Bitmap(1, 1, b'\x01'), 0, 0, "nand")
+
+
+def per_column_diff(current, previous, width):
+    # The changed span of each page, found by comparing every column
+    spans = []
+    for page in range(len(current) // width):
+        changed = [x for x in range(width) if current[page * width + x] != previous[page * width + x]]
+        if changed:
+            spans.append((page, changed[0], changed[-1] + 1))
+    return spans
+
+
+def test_diff_pages_of_identical_frames_is_empty():
+    frame = bytes(range(256)) * 4
+    assert diff_pages(frame, bytearray(frame), 128) == []
+
+
+@pytest.mark.parametrize("width, height", SIZES)
+def test_diff_pages_matches_per_column_diff(width, height):
+    generator = random.Random(6)
+    previous = FrameBuffer(width, height)
+    for _ in range(300):
+        current = FrameBuffer(width, height)
+        current.buffer[:] = previous.buffer
+        for _ in range(generator.randint(0, 4)):
+            # Single bits at the edges of a page and of a byte are the easiest to miss
+            x = generator.choice((0, width - 1, generator.randrange(width)))
+            y = generator.choice((0, height - 1, generator.randrange(height)))
+            current.set_pixel(x, y, INVERT)
+        
+        expected = per_column_diff(current.buffer, previous.buffer, width)
+        assert diff_pages(bytes(current.buffer), bytes(previous.buffer), width) == expected
+        previous = current
+
+
+class WriteRecordingDevice(VirtualDevice):
+    def __init__(self):
+        super().__init__(max_frames=0)
+        self.writes = []
+    
+    def write_page(self, page, column, data):
+        self.writes.append((page, column, column + len(data)))
+        super().write_page(page, column, data)
+
+
+def test_render_only_writes_the_changed_spans():
+    device = WriteRecordingDevice()
+    drawing = Drawing(device=device)
+    drawing._render()
+    device.writes.clear()
+    
+    drawing.set_pixel(10, 3, 1)
+    drawing.set_pixel(20, 5, 1)
+    drawing.set_pixel(100, 60, 1)
+    drawing._render()
+    assert device.writes == [(0, 10, 21), (7, 100, 101)]
+    assert device.get_screen() == bytes(drawing._framebuffer.buffer)
+    
+    device.writes.clear()
+    skipped = drawing.get_transfer_stats()["frames_skipped"]
+    drawing._render()
+    assert device.writes == []
+    assert drawing.get_transfer_stats()["frames_skipped"] == skipped + 1
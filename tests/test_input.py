@@ -0,0 +1,187 @@
+import threading
+
+import pytest
+
+from sh1106_framework.framework.input import Button, Input, InputEvent, InputSource, RotaryEncoder, SimulatedInput
+
+
+@pytest.fixture(autouse=True)
+def empty_queue():
+    # Input is global, so nothing queued or held down carries over between tests
+    Input._clear()
+    yield
+    Input._clear()
+
+
+class Pin:
+    # A pin whose level is set by the test
+    
+    def __init__(self, level=False):
+        self.level = level
+    
+    def __call__(self):
+        return self.level
+
+
+def poll(source, now):
+    return [(event.type, event.value) for event in source.poll(now)]
+
+
+def test_button_reports_a_press_once_it_stays_down_for_the_debounce_time():
+    pin = Pin()
+    button = Button("select", pin, debounce=0.02)
+    assert poll(button, 0.0) == []
+    
+    pin.level = True
+    assert poll(button, 1.000) == []
+    assert poll(button, 1.010) == []
+    assert poll(button, 1.020) == [("press", 1)]
+    assert button.pressed
+    assert poll(button, 1.030) == []
+
+
+def test_button_ignores_contact_bounce():
+    pin = Pin()
+    button = Button("select", pin, debounce=0.02)
+    
+    # Bouncing restarts the debounce time every time the level changes
+    for step, level in enumerate((True, False, True, False, True)):
+        pin.level = level
+        assert poll(button, 1.0 + step * 0.005) == []
+    assert poll(button, 1.035) == []
+    assert poll(button, 1.040) == [("press", 1)]
+    
+    # A release that bounces back before the debounce time isn't reported
+    pin.level = False
+    assert poll(button, 2.000) == []
+    pin.level = True
+    assert poll(button, 2.010) == []
+    assert poll(button, 2.100) == []
+    
+    pin.level = False
+    assert poll(button, 3.000) == []
+    assert poll(button, 3.020) == [("release", 0)]
+    assert not button.pressed
+
+
+# The quadrature sequence of A and B for one detent clockwise
+CLOCKWISE = [(1, 0), (1, 1), (0, 1), (0, 0)]
+
+
+def turn(encoder, a, b, states, now=0.0):
+    events = []
+    for level_a, level_b in states:
+        a.level, b.level = level_a, level_b
+        events.extend(poll(encoder, now))
+    return events
+
+
+def test_rotary_encoder_reports_a_step_per_detent():
+    a, b = Pin(), Pin()
+    encoder = RotaryEncoder("knob", a, b, steps_per_detent=4)
+    assert poll(encoder, 0.0) == []
+    
+    assert turn(encoder, a, b, CLOCKWISE[:3]) == []
+    assert turn(encoder, a, b, CLOCKWISE[3:]) == [("rotate", 1)]
+    assert turn(encoder, a, b, CLOCKWISE * 2) == [("rotate", 1), ("rotate", 1)]
+    
+    counterclockwise = list(reversed(CLOCKWISE[:3])) + [(0, 0)]
+    assert turn(encoder, a, b, counterclockwise) == [("rotate", -1)]
+
+
+def test_rotary_encoder_accumulates_partial_detents():
+    a, b = Pin(), Pin()
+    encoder = RotaryEncoder("knob", a, b, steps_per_detent=4)
+    poll(encoder, 0.0)
+    
+    # Half a detent forwards and back again doesn't report anything
+    assert turn(encoder, a, b, [(1, 0), (1, 1), (1, 0), (0, 0)]) == []
+    
+    # With 2 steps per detent, each half of the sequence is a detent
+    encoder = RotaryEncoder("knob", a, b, steps_per_detent=2)
+    poll(encoder, 0.0)
+    assert turn(encoder, a, b, CLOCKWISE) == [("rotate", 1), ("rotate", 1)]
+
+
+def test_rotary_encoder_ignores_transitions_that_skip_a_step():
+    a, b = Pin(), Pin()
+    encoder = RotaryEncoder("knob", a, b, steps_per_detent=4)
+    poll(encoder, 0.0)
+    
+    # Both outputs changing at once is bounce, and doesn't count as a step either way
+    assert turn(encoder, a, b, [(1, 1), (0, 0), (1, 1), (0, 0)]) == []
+    assert turn(encoder, a, b, [(1, 0), (1, 1), (0, 0), (0, 1), (0, 0)]) == []
+    assert turn(encoder, a, b, CLOCKWISE) == [("rotate", 1)]
+
+
+def test_events_are_taken_once_per_frame_and_update_is_pressed():
+    buttons = SimulatedInput()
+    buttons.press("select")
+    buttons.rotate(2, "knob")
+    assert not Input.is_pressed("select")
+    
+    pressed_while_handled = []
+    events = []
+    for event in Input._get_events():
+        events.append((event.source, event.type, event.value))
+        pressed_while_handled.append(Input.is_pressed("select"))
+    assert events == [("select", "press", 1), ("knob", "rotate", 2)]
+    assert pressed_while_handled == [True, True]
+    assert list(Input._get_events()) == []
+    
+    # A click is a press and a release in the same frame, so the button isn't held afterwards
+    buttons.click()
+    assert [(event.source, event.type) for event in Input._get_events()] == [("simulated", "press"), ("simulated", "release")]
+    assert not Input.is_pressed("simulated")
+    
+    buttons.release("select")
+    list(Input._get_events())
+    assert not Input.is_pressed("select")
+
+
+def test_events_that_arrive_while_a_frame_handles_them_wait_for_the_next_frame():
+    buttons = SimulatedInput()
+    buttons.press("a")
+    
+    handled = []
+    for event in Input._get_events():
+        handled.append(event.source)
+        buttons.press("b")
+    assert handled == ["a"]
+    assert [event.source for event in Input._get_events()] == ["b"]
+
+
+class FailingSource(InputSource):
+    name = "broken"
+    
+    def poll(self, now):
+        raise OSError("GPIO read failed")
+
+
+class CountingSource(InputSource):
+    name = "working"
+    
+    def __init__(self):
+        self.polled = threading.Event()
+        self.polls = 0
+    
+    def poll(self, now):
+        self.polls += 1
+        if self.polls >= 3:
+            self.polled.set()
+        return (InputEvent(self.name, "press", 1, now),) if self.polls == 3 else ()
+
+
+def test_a_failing_source_doesnt_stop_the_others_and_its_error_is_raised():
+    failing, working = Input.add_source(FailingSource()), Input.add_source(CountingSource())
+    Input._start()
+    try:
+        assert working.polled.wait(5)
+    finally:
+        Input._stop()
+        Input.remove_source(failing)
+        Input.remove_source(working)
+    
+    with pytest.raises(OSError):
+        list(Input._get_events())
+    assert [event.source for event in Input._get_events()] == ["working"]
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from sh1106_framework.graphics import shapes
+from sh1106_framework.graphics.bitmap import Bitmap
+from sh1106_framework.graphics.framebuffer import COMPOSITE_MODES, INVERT, FrameBuffer
+from sh1106_framework.graphics.numpy_framebuffer import NumpyFrameBuffer
+
+
+def random_bitmap(generator, width, height):
+    return Bitmap.from_rows([[generator.randint(0, 1) for _ in range(width)] for _ in range(height)])
+
+
+def random_operation(generator, width, height):
+    # One drawing call, with arguments that land anywhere on, across or just off the framebuffer
+    bitmap = random_bitmap(generator, generator.randint(1, 20), generator.randint(1, 19))
+    x, y = generator.randint(-22, width + 2), generator.randint(-21, height + 2)
+    color = generator.choice((0, 1, INVERT))
+    operation = generator.choice(("set_pixel", "fill_rect", "blit", "composite", "composite_framebuffer", "spans", "set_clip", "reset_clip", "clear"))
+    if operation == "set_pixel":
+        return "set_pixel", (x, y, color)
+    if operation == "fill_rect":
+        return "fill_rect", (x, y, bitmap.width, bitmap.height, color)
+    if operation == "blit":
+        return "blit", (bitmap, x, y, color, generator.choice((1, 1, 2, 3)))
+    if operation == "composite":
+        return "composite", (bitmap, x, y, generator.choice(COMPOSITE_MODES))
+    if operation == "composite_framebuffer":
+        source = FrameBuffer(bitmap.width, bitmap.height)
+        source.blit(bitmap, 0, 0)
+        return "composite", (source, x, y, generator.choice(COMPOSITE_MODES))
+    if operation == "spans":
+        spans = shapes.ellipse_spans(x, y, generator.randint(0, 20), generator.randint(0, 12), generator.random() < 0.5, (0, 0, width, height))
+        return "_fill_spans", (spans, color)
+    if operation == "set_clip":
+        return "set_clip", (generator.randint(-5, width), generator.randint(-5, height), generator.randint(0, width + 5), generator.randint(0, height + 5))
+    return operation, ()
+
+
+@pytest.mark.parametrize("width, height", [(128, 64), (37, 21), (8, 3)])
+def test_numpy_backend_matches_python_backend_byte_for_byte(width, height):
+    generator = random.Random(8)
+    python, numpy = FrameBuffer(width, height), NumpyFrameBuffer(width, height)
+    for _ in range(400):
+        operation, arguments = random_operation(generator, width, height)
+        if operation == "_fill_spans":
+            # Spans are clipped by whoever makes them, to the current clip
+            arguments = (shapes._clip([(y, x0, x1 - 1) for y, x0, x1 in arguments[0]], python.clip), arguments[1])
+        getattr(python, operation)(*arguments)
+        getattr(numpy, operation)(*arguments)
+        assert numpy.clip == python.clip
+        assert bytes(numpy.buffer) == bytes(python.buffer), (operation, arguments)
+    
+    assert numpy.to_bitmap().data == python.to_bitmap().data
+    assert all(numpy.get_page(page) == python.get_page(page) for page in range(python.pages))
+    assert all(numpy.get_pixel(x, y) == python.get_pixel(x, y) for x in range(-1, width + 1) for y in range(-1, height + 1))
@@ -0,0 +1,235 @@
+from bisect import bisect_right
+from fractions import Fraction
+from math import atan2, ceil, degrees, floor, hypot
+import random
+
+import pytest
+
+from sh1106_framework.graphics import shapes
+
+CLIP = (0, 0, 128, 64)
+
+
+def per_pixel_arc_spans(cx, cy, radius, start_angle, end_angle, thickness, clip):
+    # The arc spans as they were made before, by testing the angle of every pixel of the ring
+    rows = shapes.arc_spans(cx, cy, radius, 0, 360, thickness, clip)
+    sweep = end_angle - start_angle
+    if sweep >= 360:
+        return rows
+    
+    sweep %= 360
+    spans = []
+    for y, x0, x1 in rows:
+        run_start = None
+        for x in range(x0, x1):
+            inside = (degrees(atan2(y - cy, x - cx)) - start_angle) % 360 <= sweep
+            if inside and run_start is None:
+                run_start = x
+            elif not inside and run_start is not None:
+                spans.append((y, run_start, x))
+                run_start = None
+        if run_start is not None:
+            spans.append((y, run_start, x1))
+    return spans
+
+
+@pytest.mark.parametrize("start_angle, end_angle", [
+    (0, 90), (90, 180), (180, 270), (270, 360), (-45, 45), (135, 405), (0, 270),
+    (10, 350), (179.5, 180.5), (0, 0), (30, 30.5), (-90, 90), (200, 100),
+])
+@pytest.mark.parametrize("radius, thickness", [(0, 1), (1, 1), (5, 1), (12, 3), (30, 2), (30, 30), (40, 100)])
+def test_arc_spans_match_per_pixel(start_angle, end_angle, radius, thickness):
+    for cx, cy in ((64, 32), (3, 60), (120, 2)):
+        expected = per_pixel_arc_spans(cx, cy, radius, start_angle, end_angle, thickness, CLIP)
+        assert shapes.arc_spans(cx, cy, radius, start_angle, end_angle, thickness, CLIP) == expected
+
+
+def test_arc_spans_match_per_pixel_at_random_angles():
+    generator = random.Random(18)
+    for _ in range(300):
+        start_angle = generator.uniform(-720, 720)
+        end_angle = start_angle + generator.uniform(0, 400)
+        radius = generator.randint(0, 45)
+        thickness = generator.randint(1, radius + 2)
+        cx, cy = generator.randint(-10, 138), generator.randint(-10, 74)
+        expected = per_pixel_arc_spans(cx, cy, radius, start_angle, end_angle, thickness, CLIP)
+        assert shapes.arc_spans(cx, cy, radius, start_angle, end_angle, thickness, CLIP) == expected
+
+
+def to_pixels(spans):
+    pixels = set()
+    for y, x0, x1 in spans:
+        pixels.update((x, y) for x in range(x0, x1))
+    return pixels
+
+
+def to_spans(pixels, clip):
+    # Sorted runs of the pixels inside the clip, as the shape functions return them
+    left, top, right, bottom = clip
+    spans = []
+    for y, x in sorted((y, x) for x, y in pixels if left <= x < right and top <= y < bottom):
+        if spans and spans[-1][0] == y and spans[-1][2] == x:
+            spans[-1] = (y, spans[-1][1], x + 1)
+        else:
+            spans.append((y, x, x + 1))
+    return spans
+
+
+def outline_of(pixels):
+    # The pixels of a shape that have a neighbor above, below or to either side outside of it
+    return {(x, y) for x, y in pixels if not {(x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)} <= pixels}
+
+
+def in_ellipse(dx, dy, rx, ry):
+    # Whether a pixel's center is inside the ellipse with both radii half a pixel larger
+    a, b = 2 * rx + 1, 2 * ry + 1
+    return (2 * dx * b) ** 2 + (2 * dy * a) ** 2 <= (a * b) ** 2
+
+
+def per_pixel_ellipse(cx, cy, rx, ry, filled):
+    pixels = {(cx + dx, cy + dy) for dy in range(-ry, ry + 1) for dx in range(-rx, rx + 1) if in_ellipse(dx, dy, rx, ry)}
+    return pixels if filled else outline_of(pixels)
+
+
+def per_pixel_rounded_rect(x, y, width, height, radius, filled):
+    radius = max(0, min(radius, (width - 1) // 2, (height - 1) // 2))
+    pixels = set()
+    for py in range(y, y + height):
+        for px in range(x, x + width):
+            # How far the pixel is past the center of the nearest corner's circle, on each axis
+            dx = max(x + radius - px, px - (x + width - 1 - radius), 0)
+            dy = max(y + radius - py, py - (y + height - 1 - radius), 0)
+            if in_ellipse(dx, dy, radius, radius):
+                pixels.add((px, py))
+    return pixels if filled else outline_of(pixels)
+
+
+def per_pixel_line(x0, y0, x1, y1):
+    # Bresenham's line algorithm, plotting one pixel at a time
+    pixels = set()
+    dx, dy = abs(x1 - x0), -abs(y1 - y0)
+    sx, sy = (1 if x0 < x1 else -1), (1 if y0 < y1 else -1)
+    error = dx + dy
+    while True:
+        pixels.add((x0, y0))
+        if (x0, y0) == (x1, y1):
+            return pixels
+        e2 = 2 * error
+        if e2 >= dy:
+            error += dy
+            x0 += sx
+        if e2 <= dx:
+            error += dx
+            y0 += sy
+
+
+def per_pixel_polygon(points, filled):
+    # The outline between the rounded corners, and every pixel whose center has an odd number
+    # of edge crossings at or to the left of it, or lies on a crossing
+    corners = [(floor(x + 0.5), floor(y + 0.5)) for x, y in points]
+    pixels = set()
+    for i in range(len(points)):
+        pixels |= per_pixel_line(*corners[i - 1], *corners[i])
+    if not filled or len(points) < 3:
+        return pixels
+    
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    for y in range(ceil(min(ys)), floor(max(ys)) + 1):
+        crossings = sorted(
+            Fraction(xa) + (y - Fraction(ya)) * (Fraction(xb) - Fraction(xa)) / (Fraction(yb) - Fraction(ya))
+            for (xa, ya), (xb, yb) in zip(points[-1:] + points[:-1], points)
+            if min(ya, yb) <= y < max(ya, yb)
+        )
+        for x in range(floor(min(xs)), ceil(max(xs)) + 1):
+            if bisect_right(crossings, x) % 2 or x in crossings:
+                pixels.add((x, y))
+    return pixels
+
+
+CLIPS = [CLIP, (10, 5, 50, 40), (0, 0, 0, 0)]
+
+
+@pytest.mark.parametrize("clip", CLIPS)
+@pytest.mark.parametrize("filled", [True, False])
+def test_ellipse_spans_match_per_pixel(filled, clip):
+    generator = random.Random(19)
+    for rx, ry in [(0, 0), (1, 0), (0, 3), (1, 1), (5, 5), (20, 7), (3, 25)] + [(generator.randint(0, 40), generator.randint(0, 30)) for _ in range(30)]:
+        cx, cy = generator.randint(-20, 148), generator.randint(-20, 84)
+        expected = to_spans(per_pixel_ellipse(cx, cy, rx, ry, filled), clip)
+        assert shapes.ellipse_spans(cx, cy, rx, ry, filled, clip) == expected, (cx, cy, rx, ry)
+
+
+@pytest.mark.parametrize("clip", CLIPS)
+@pytest.mark.parametrize("filled", [True, False])
+def test_rounded_rect_spans_match_per_pixel(filled, clip):
+    generator = random.Random(20)
+    cases = [(1, 1, 0), (1, 1, 5), (2, 9, 3), (10, 10, 4), (30, 12, 6), (7, 20, 100)]
+    cases += [(generator.randint(1, 60), generator.randint(1, 40), generator.randint(0, 25)) for _ in range(40)]
+    for width, height, radius in cases:
+        x, y = generator.randint(-30, 130), generator.randint(-20, 70)
+        expected = to_spans(per_pixel_rounded_rect(x, y, width, height, radius, filled), clip)
+        assert shapes.rounded_rect_spans(x, y, width, height, radius, filled, clip) == expected, (x, y, width, height, radius)
+
+
+@pytest.mark.parametrize("clip", CLIPS)
+def test_line_spans_match_per_pixel(clip):
+    generator = random.Random(21)
+    for _ in range(300):
+        x0, y0, x1, y1 = (generator.randint(-20, 148), generator.randint(-20, 84), generator.randint(-20, 148), generator.randint(-20, 84))
+        assert shapes.line_spans(x0, y0, x1, y1, clip) == to_spans(per_pixel_line(x0, y0, x1, y1), clip)
+
+
+@pytest.mark.parametrize("clip", CLIPS)
+@pytest.mark.parametrize("filled", [True, False])
+def test_polygon_spans_match_per_pixel(filled, clip):
+    generator = random.Random(22)
+    polygons = [
+        [(10, 10)],
+        [(10, 10), (40, 30)],
+        [(10, 10), (60, 10), (35, 50)],
+        [(0, 0), (127, 0), (127, 63), (0, 63)],
+        [(64, 2), (76, 40), (40, 16), (88, 16), (52, 40)],
+        [(20, 20), (20, 20), (40, 20), (40, 40)],
+        [(-30, 10), (50, -20), (160, 70), (30, 90)],
+    ]
+    for _ in range(60):
+        # Random polygons, which can cross themselves, with integer and half-pixel corners
+        step = generator.choice((1, 0.5, 0.25))
+        polygons.append([(generator.randint(int(-20 / step), int(148 / step)) * step, generator.randint(int(-20 / step), int(84 / step)) * step) for _ in range(generator.randint(3, 7))])
+    for points in polygons:
+        expected = to_spans(per_pixel_polygon(points, filled), clip)
+        assert shapes.polygon_spans(points, filled, clip) == expected, points
+
+
+@pytest.mark.parametrize("thickness", [2, 3, 4, 7])
+def test_thick_line_spans_cover_the_rectangle_around_the_line(thickness):
+    # Every pixel whose center is inside the rectangle, thickness wide around the line, is
+    # drawn. The edge is drawn between the corners rounded to whole pixels, so it can stray
+    # outside the rectangle by up to half a pixel's diagonal plus half a pixel, but no further
+    generator = random.Random(23)
+    half = (thickness - 1) / 2
+    for _ in range(80):
+        x0, y0, x1, y1 = (generator.randint(0, 127), generator.randint(0, 63), generator.randint(0, 127), generator.randint(0, 63))
+        pixels = to_pixels(shapes.thick_line_spans(x0, y0, x1, y1, thickness, CLIP))
+        length = hypot(x1 - x0, y1 - y0)
+        reach = thickness + 2
+        for y in range(max(min(y0, y1) - reach, 0), min(max(y0, y1) + reach + 1, 64)):
+            for x in range(max(min(x0, x1) - reach, 0), min(max(x0, x1) + reach + 1, 128)):
+                if length:
+                    along = ((x - x0) * (x1 - x0) + (y - y0) * (y1 - y0)) / length
+                    across = abs((x - x0) * (y1 - y0) - (y - y0) * (x1 - x0)) / length
+                    margin = min(along, length - along, half - across)
+                else:
+                    margin = half - max(abs(x - x0), abs(y - y0))
+                if margin > 1e-9:
+                    assert (x, y) in pixels, (x0, y0, x1, y1, x, y)
+                elif margin < -1.5:
+                    assert (x, y) not in pixels, (x0, y0, x1, y1, x, y)
+        assert all(min(x0, x1) - reach <= x <= max(x0, x1) + reach and min(y0, y1) - reach <= y <= max(y0, y1) + reach for x, y in pixels)
+
+
+def test_thick_line_spans_of_a_point_are_a_square():
+    assert shapes.thick_line_spans(10, 10, 10, 10, 3, CLIP) == [(9, 9, 12), (10, 9, 12), (11, 9, 12)]
+    assert shapes.thick_line_spans(10, 10, 10, 10, 4, CLIP) == [(y, 9, 13) for y in range(9, 13)]
+    assert shapes.thick_line_spans(0, 0, 50, 20, 1, CLIP) == shapes.line_spans(0, 0, 50, 20, CLIP)
@@ -0,0 +1,116 @@
+import threading
+
+import pytest
+
+from sh1106_framework.graphics.transmitter import Transmitter
+
+
+class BlockingSender:
+    # Records the frames it sends, and holds up the worker thread on the first one until released
+    
+    def __init__(self, log=None):
+        self.sent = [] if log is None else log
+        self.started = threading.Event()
+        self.release = threading.Event()
+    
+    def __call__(self, frame):
+        self.started.set()
+        self.release.wait(5)
+        self.sent.append(frame)
+
+
+def test_stale_frames_are_dropped_in_favor_of_the_latest():
+    sender = BlockingSender()
+    transmitter = Transmitter(sender)
+    try:
+        assert not transmitter.submit_frame(b'a')
+        assert sender.started.wait(5)
+        
+        # The worker is busy sending a, so b and c wait in the slot and b is replaced
+        assert not transmitter.submit_frame(b'b')
+        assert transmitter.submit_frame(b'c')
+        sender.release.set()
+        transmitter.wait()
+        
+        assert sender.sent == [b'a', b'c']
+        assert transmitter.frames_sent == 2
+        assert transmitter.frames_dropped == 1
+    finally:
+        sender.release.set()
+        transmitter.stop()
+
+
+def test_replacing_a_pending_frame_with_the_same_one_is_not_a_drop():
+    sender = BlockingSender()
+    transmitter = Transmitter(sender)
+    try:
+        transmitter.submit_frame(b'a')
+        assert sender.started.wait(5)
+        frame = b'same'
+        assert not transmitter.submit_frame(frame)
+        assert not transmitter.submit_frame(frame)
+        assert not transmitter.submit_frame(bytes(bytearray(frame)))
+        sender.release.set()
+        transmitter.wait()
+        
+        assert sender.sent == [b'a', b'same']
+        assert transmitter.frames_dropped == 0
+    finally:
+        sender.release.set()
+        transmitter.stop()
+
+
+def test_commands_are_never_dropped_and_run_before_the_next_frame():
+    log = []
+    sender = BlockingSender(log)
+    transmitter = Transmitter(sender)
+    try:
+        transmitter.submit_frame(b'a')
+        assert sender.started.wait(5)
+        transmitter.submit_command(log.append, "contrast 1")
+        transmitter.submit_frame(b'b')
+        transmitter.submit_command(log.append, "contrast 2")
+        sender.release.set()
+        transmitter.wait()
+        
+        assert log == [b'a', "contrast 1", "contrast 2", b'b']
+    finally:
+        sender.release.set()
+        transmitter.stop()
+
+
+def test_displays_sharing_a_transmitter_keep_their_own_slots():
+    log = []
+    first, second = BlockingSender(log), BlockingSender(log)
+    second.release.set()
+    transmitter = Transmitter()
+    try:
+        transmitter.submit_frame(b'first 1', first)
+        assert first.started.wait(5)
+        transmitter.submit_frame(b'second 1', second)
+        transmitter.submit_frame(b'first 2', first)
+        first.release.set()
+        transmitter.wait()
+        
+        # A frame for one display never replaces a frame for the other
+        assert sorted(log) == [b'first 1', b'first 2', b'second 1']
+        assert transmitter.frames_dropped == 0
+    finally:
+        first.release.set()
+        transmitter.stop()
+
+
+def test_errors_on_the_worker_thread_are_raised_on_the_caller():
+    def fail(frame):
+        raise OSError("bus error")
+    
+    transmitter = Transmitter(fail)
+    try:
+        transmitter.submit_frame(b'a')
+        with pytest.raises(OSError):
+            transmitter.wait()
+        
+        # The error is only raised once, and the transmitter keeps working
+        transmitter.wait()
+    finally:
+        transmitter.stop()